@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark the bank statement parsers on synthetic statements.
+
+Generates Monzo PDF and Lloyds/Barclays CSV statements at each size with
+generate_test_statements.py, then reports rows/sec and peak Python memory for
+every parser. The statement cache is bypassed so each run is a real parse.
+
+Usage:
+    python benchmark_parsers.py [sizes...]
+    python benchmark_parsers.py 10 100 1000 10000 100000
+"""
+
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import statement_parser
+from generate_test_statements import generate_corpus
+
+PARSERS = {
+    'Monzo PDF': statement_parser.parse_monzo_statement,
+    'Lloyds CSV': statement_parser.parse_lloyds_statement,
+    'Barclays CSV': statement_parser.parse_barclays_statement,
+}
+
+
+def measure(parser, file_content):
+    """Time one parse, then repeat it under tracemalloc for the peak allocation."""
+    gc.collect()
+    start = time.perf_counter()
+    df = parser(file_content)
+    elapsed = time.perf_counter() - start
+
+    # Tracing slows Python down, so memory gets its own run
+    gc.collect()
+    tracemalloc.start()
+    parser(file_content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return df, elapsed, peak
+
+
+def run_benchmark(sizes, pdf_workers=1):
+    """Parse every synthetic statement at every size and collect the results."""
+    # Keep PDF extraction in-process so tracemalloc sees all of it
+    statement_parser.PDF_EXTRACTION_WORKERS = pdf_workers
+    results = []
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        for size in sizes:
+            paths = generate_corpus(corpus_dir, size)
+
+            for name, parser in PARSERS.items():
+                with open(paths[name], 'rb') as f:
+                    file_content = f.read()
+
+                df, elapsed, peak = measure(parser, file_content)
+                rows = len(df) if df is not None else 0
+                results.append({
+                    'Parser': name,
+                    'Transactions': size,
+                    'Rows Parsed': rows,
+                    'Seconds': round(elapsed, 3),
+                    'Rows/sec': round(rows / elapsed) if elapsed > 0 else 0,
+                    'Peak MB': round(peak / (1024 * 1024), 2),
+                })
+                print(f"{name:12} | {size:>7} transactions | {rows:>7} rows | "
+                      f"{elapsed:8.3f}s | {results[-1]['Rows/sec']:>9} rows/sec | {results[-1]['Peak MB']:>8} MB")
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or [10, 100, 1000, 10000]
+    report = run_benchmark(sizes)
+    print("\n=== PARSER BENCHMARK ===")
+    print(report.to_string(index=False))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Compare the PDF text-extraction backends on the same Monzo statement.
+
+Runs every backend in statement_parser.PDF_TEXT_BACKENDS (plus the pdfminer layout
+parser) over one statement and reports pages/sec alongside how many
+transactions the Monzo parser got out of that backend's text, so the fastest
+backend that still parses our statements correctly can be picked. Without a
+path, a synthetic statement is generated with generate_test_statements.py.
+
+Usage:
+    python benchmark_pdf_backends.py [statement.pdf] [--transactions N] [--repeat N]
+"""
+
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+import statement_parser
+from generate_test_statements import generate_transactions, write_monzo_pdf
+
+
+def time_backend(file_content, backend, repeat=1):
+    """Best-of-`repeat` time to extract every page, plus the parsed transaction count."""
+    layout = backend == 'layout'
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = list(statement_parser.iter_pdf_page_texts(file_content, workers=1, layout=layout,
+                                                   backend=None if layout else backend))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    if layout:
+        transactions = list(statement_parser.iter_monzo_layout_transactions(file_content, workers=1))
+    else:
+        transactions = list(statement_parser.iter_monzo_transactions(file_content, workers=1, backend=backend))
+    with_balance = sum(1 for t in transactions if t['Balance'] is not None)
+    return len(pages), best, len(transactions), with_balance
+
+
+def run_benchmark(file_content, backends=None, repeat=1):
+    """Time each backend on the statement and collect the results."""
+    results = []
+    for backend in backends or list(statement_parser.PDF_TEXT_BACKENDS) + ['layout']:
+        try:
+            pages, elapsed, rows, with_balance = time_backend(file_content, backend, repeat)
+        except (ImportError, RuntimeError) as e:
+            print(f"{backend:10} | skipped: {e}")
+            results.append({'Backend': backend, 'Status': 'unavailable'})
+            continue
+
+        results.append({
+            'Backend': backend,
+            'Pages': pages,
+            'Seconds': round(elapsed, 3),
+            'Pages/sec': round(pages / elapsed, 1) if elapsed > 0 else 0,
+            'Transactions': rows,
+            'With Balance': with_balance,
+            'Status': 'ok',
+        })
+        print(f"{backend:10} | {pages:>4} pages | {elapsed:8.3f}s | {results[-1]['Pages/sec']:>8} pages/sec | "
+              f"{rows:>6} transactions ({with_balance} with balance)")
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', help="Monzo PDF statement (default: a synthetic one)")
+    parser.add_argument('--transactions', type=int, default=2000,
+                        help="Size of the synthetic statement when no path is given")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per backend (best is kept)")
+    parser.add_argument('--backend', action='append', help="Only run these backends")
+    args = parser.parse_args()
+
+    if args.path:
+        with open(args.path, 'rb') as f:
+            file_content = f.read()
+        expected = None
+    else:
+        transactions = generate_transactions(args.transactions)
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as f:
+            write_monzo_pdf(transactions, f.name)
+            file_content = f.read()
+        expected = len(transactions)
+
+    print(f"Statement: {args.path or 'synthetic'} ({statement_parser.count_pdf_pages(file_content)} pages)")
+    report = run_benchmark(file_content, args.backend, args.repeat)
+    print("\n=== PDF BACKEND BENCHMARK ===")
+    print(report.to_string(index=False))
+    if expected is not None:
+        print(f"\nExpected transactions: {expected}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Report which categorization rules fire on real statements, and what they cost.
+
+Parses the given statements (bank auto-detected unless --bank is passed), or
+the saved ledger with --ledger, and re-runs categorization with rule
+instrumentation on. Prints per-rule hit counts and cumulative match time in
+priority order, plus the merchants no rule matched, so the rule order in
+categorization_rules.json can be tuned for real traffic.
+
+Usage:
+    python category_rule_report.py statement.csv [more statements...] [--top N]
+    python category_rule_report.py --ledger
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+import statement_parser
+
+
+def load_descriptions(paths, bank=None):
+    """Parse each statement and collect its descriptions."""
+    descriptions = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            file_content = f.read()
+
+        file_bank = bank or statement_parser.detect_statement_bank(file_content)
+        if file_bank is None:
+            print(f"{path}: couldn't detect the bank, skipping (pass --bank)")
+            continue
+
+        df = statement_parser.BANK_PARSERS[file_bank](file_content)
+        if df is None:
+            print(f"{path}: failed to parse as {file_bank}, skipping")
+            continue
+        print(f"{path}: {len(df)} {file_bank} transactions")
+        descriptions.append(df['Description'])
+
+    return pd.concat(descriptions, ignore_index=True) if descriptions else pd.Series([], dtype=object)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*', help="Statement files to categorize")
+    parser.add_argument('--bank', choices=list(statement_parser.BANK_PARSERS), help="Bank of every statement")
+    parser.add_argument('--ledger', action='store_true', help="Use the saved ledger instead of statements")
+    parser.add_argument('--top', type=int, default=20, help="How many unmatched merchants to list")
+    args = parser.parse_args()
+
+    if args.ledger:
+        ledger = statement_parser.load_ledger()
+        descriptions = ledger['Description'] if ledger is not None else pd.Series([], dtype=object)
+    else:
+        descriptions = load_descriptions(args.paths, args.bank)
+
+    if descriptions.empty:
+        print("No transactions to categorize")
+        sys.exit(1)
+
+    with statement_parser.category_instrumentation() as stats:
+        statement_parser.categorize_series(descriptions)
+    rule_stats, unmatched = statement_parser.category_stats_report(stats, top=args.top)
+
+    print(f"\n=== CATEGORY RULE HITS ({stats['rows']} transactions, "
+          f"{len(descriptions.unique())} distinct descriptions, {stats['elapsed'] * 1000:.1f} ms) ===")
+    print(rule_stats.to_string(index=False))
+    print(f"\n=== TOP {args.top} UNMATCHED MERCHANTS ===")
+    print(unmatched.to_string(index=False) if not unmatched.empty else "(none)")
@@ -1,25 +1,27 @@
 #!/usr/bin/env python3
 
-import PyPDF2
 import re
+import sys
 import datetime
 
-def debug_monzo_pdf(file_path):
+from statement_parser import PDF_TEXT_BACKEND, iter_pdf_page_texts
+
+def debug_monzo_pdf(file_path, workers=None, backend=None):
     """Debug Monzo PDF parsing to see exactly what's extracted"""
-    print(f"=== DEBUGGING MONZO PDF: {file_path} ===")
+    print(f"=== DEBUGGING MONZO PDF: {file_path} ({backend or PDF_TEXT_BACKEND}) ===")
     
     try:
         # Read PDF
         with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
             text = ""
+            page_count = 0
             
-            # Extract text from all pages
-            for page_num, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
+            # Extract text from all pages (in parallel for long statements)
+            for page_num, page_text in enumerate(iter_pdf_page_texts(file, workers=workers, backend=backend)):
                 text += f"\n--- PAGE {page_num + 1} ---\n{page_text}\n"
+                page_count += 1
             
-            print(f"Total pages: {len(pdf_reader.pages)}")
+            print(f"Total pages: {page_count}")
             print(f"Total extracted text length: {len(text)} characters")
             
             # Show first 2000 characters of extracted text
@@ -138,4 +140,10 @@ def debug_monzo_pdf(file_path):
 if __name__ == "__main__":
     # Test with your Monzo statement
     pdf_path = "/Users/anthonygathukia/Desktop/Me/Finance Folder's/Finance Budget Script/Test Site/Monzo_bank_statement_2025-11-01-2025-11-30_722.pdf"
-    transactions = debug_monzo_pdf(pdf_path)
+    if len(sys.argv) > 1:
+        pdf_path = sys.argv[1]
+    # Optional second argument: number of extraction worker processes
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    # Optional third argument: text backend (pypdf2, pypdf, pdfminer, pdftotext)
+    backend = sys.argv[3] if len(sys.argv) > 3 else None
+    transactions = debug_monzo_pdf(pdf_path, workers, backend)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Generate synthetic bank statements for parser testing and benchmarks.
+
+Writes a Monzo-style PDF and Lloyds/Barclays-style CSVs with the same
+deterministic stream of merchants, salary payments, pot transfers and running
+balances, so the parsers can be measured without real statements.
+
+Usage:
+    python generate_test_statements.py [output_dir] [transactions...]
+"""
+
+import csv
+import datetime
+import os
+import random
+import sys
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+# (description, low, high) - amounts are negative spending unless noted
+MERCHANTS = [
+    ("TESCO STORES 2231", 4, 85),
+    ("Sainsbury's Local", 3, 40),
+    ("Deliveroo", 12, 35),
+    ("Pret A Manger", 3, 12),
+    ("Uber Trip", 6, 28),
+    ("TfL Travel Charge", 2, 9),
+    ("Amazon Marketplace", 5, 120),
+    ("Spotify Premium", 11, 11),
+    ("Netflix.com", 11, 11),
+    ("PureGym Ltd", 25, 25),
+    ("Boots Pharmacy", 3, 30),
+    ("The Crown Pub", 6, 45),
+    ("Shell Petrol Station", 30, 70),
+    ("Council Tax DD", 120, 120),
+    ("Octopus Energy Bill", 60, 95),
+    ("Primark Oxford St", 8, 60),
+    ("Vue Cinema", 9, 24),
+    ("Apple Services", 1, 10),
+]
+POT_NAMES = ["Savings", "Bills", "Holiday"]
+
+PDF_COLUMNS = {'date': 40, 'description': 110, 'amount': 400, 'balance': 480}
+ROWS_PER_PAGE = 40
+
+
+def generate_transactions(count, seed=2025, start_date=datetime.date(2025, 1, 1), opening_balance=1500.0):
+    """Build a deterministic list of transactions with running balances."""
+    rng = random.Random(seed)
+    transactions = []
+    balance = opening_balance
+    day = start_date
+
+    for i in range(count):
+        # A few transactions a day on average
+        if i and rng.random() < 0.3:
+            day += datetime.timedelta(days=1)
+
+        roll = rng.random()
+        if day.day == 25 and not any(t['date'] == day and t['description'].startswith('Salary') for t in transactions[-5:]):
+            description, amount = "Salary ACME Ltd", 2450.00
+        elif roll < 0.08:
+            pot = rng.choice(POT_NAMES)
+            if rng.random() < 0.6:
+                description, amount = f"Transfer to pot {pot}", -round(rng.uniform(10, 150), 2)
+            else:
+                description, amount = f"Transfer from pot {pot}", round(rng.uniform(10, 150), 2)
+        elif roll < 0.11:
+            description, amount = f"Payment to {rng.choice(['J Smith', 'A Patel', 'M Jones'])}", -round(rng.uniform(5, 60), 2)
+        elif roll < 0.13:
+            description, amount = "Refund Amazon Marketplace", round(rng.uniform(5, 40), 2)
+        else:
+            name, low, high = rng.choice(MERCHANTS)
+            description, amount = name, -round(rng.uniform(low, high), 2)
+
+        balance = round(balance + amount, 2)
+        transactions.append({'date': day, 'description': description, 'amount': amount, 'balance': balance})
+
+    return transactions
+
+
+def write_monzo_pdf(transactions, path):
+    """Write a Monzo-style PDF statement with a balance summary header."""
+    pdf = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+
+    outgoings = sum(-t['amount'] for t in transactions if t['amount'] < 0)
+    deposits = sum(t['amount'] for t in transactions if t['amount'] > 0)
+    closing = transactions[-1]['balance'] if transactions else 0.0
+
+    def draw_table_header(y):
+        header = pdf.beginText()
+        header.setFont("Helvetica-Bold", 9)
+        for column, label in [('date', 'Date'), ('description', 'Description'),
+                              ('amount', '(GBP) Amount'), ('balance', '(GBP) Balance')]:
+            header.setTextOrigin(PDF_COLUMNS[column], y)
+            header.textOut(label)
+        pdf.drawText(header)
+
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawString(40, height - 50, "Personal Account statement")
+    pdf.setFont("Helvetica", 9)
+    pdf.drawString(40, height - 70, f"Total balance(Including all Pots and Cashback)£{closing + 500:,.2f}")
+    pdf.drawString(40, height - 85, f"Personal Account balance(Excluding all Pots)£{closing:,.2f}")
+    pdf.drawString(40, height - 100, f"Total outgoings+£{outgoings:,.2f}")
+    pdf.drawString(40, height - 115, f"Total deposits£{deposits:,.2f}")
+
+    y = height - 150
+    draw_table_header(y)
+    y -= 18
+    rows_on_page = 0
+
+    for t in transactions:
+        if rows_on_page == ROWS_PER_PAGE:
+            pdf.showPage()
+            y = height - 60
+            draw_table_header(y)
+            y -= 18
+            rows_on_page = 0
+
+        # One text object per row keeps the fields on a single extracted line
+        row = pdf.beginText()
+        row.setFont("Helvetica", 9)
+        for column, value in [('date', t['date'].strftime('%d/%m/%Y')),
+                              ('description', t['description']),
+                              ('amount', f"{t['amount']:.2f}"),
+                              ('balance', f"{t['balance']:.2f}")]:
+            row.setTextOrigin(PDF_COLUMNS[column], y)
+            row.textOut(value)
+        pdf.drawText(row)
+
+        y -= 16
+        rows_on_page += 1
+
+    pdf.save()
+
+
+def write_lloyds_csv(transactions, path):
+    """Write a Lloyds-style CSV export (newest first, separate debit/credit columns)."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Transaction Date', 'Transaction Type', 'Sort Code', 'Account Number',
+                         'Transaction Description', 'Debit Amount', 'Credit Amount', 'Balance'])
+        for t in reversed(transactions):
+            writer.writerow([
+                t['date'].strftime('%d/%m/%Y'),
+                'DEB' if t['amount'] < 0 else 'FPI',
+                "'30-94-12",
+                '12345678',
+                t['description'].upper(),
+                f"{-t['amount']:.2f}" if t['amount'] < 0 else '',
+                f"{t['amount']:.2f}" if t['amount'] > 0 else '',
+                f"{t['balance']:.2f}"
+            ])
+
+
+def write_barclays_csv(transactions, path):
+    """Write a Barclays-style CSV export (signed Amount, description in Memo)."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Number', 'Date', 'Account', 'Amount', 'Subcategory', 'Memo'])
+        for t in transactions:
+            writer.writerow([
+                '',
+                t['date'].strftime('%d/%m/%Y'),
+                '20-32-06 13152170',
+                f"{t['amount']:.2f}",
+                'PAYMENT' if t['amount'] < 0 else 'CREDIT',
+                f"{t['description']}\tON {t['date'].strftime('%d %b').upper()}"
+            ])
+
+
+def generate_corpus(output_dir, count, seed=2025):
+    """Write one statement of each kind with `count` transactions.
+
+    Returns:
+        dict: Bank/format name -> file path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    transactions = generate_transactions(count, seed=seed)
+
+    paths = {
+        'Monzo PDF': os.path.join(output_dir, f"monzo_{count}.pdf"),
+        'Lloyds CSV': os.path.join(output_dir, f"lloyds_{count}.csv"),
+        'Barclays CSV': os.path.join(output_dir, f"barclays_{count}.csv"),
+    }
+    write_monzo_pdf(transactions, paths['Monzo PDF'])
+    write_lloyds_csv(transactions, paths['Lloyds CSV'])
+    write_barclays_csv(transactions, paths['Barclays CSV'])
+    return paths
+
+
+if __name__ == "__main__":
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "synthetic_statements"
+    sizes = [int(size) for size in sys.argv[2:]] or [10, 100, 1000, 10000]
+
+    for size in sizes:
+        paths = generate_corpus(output_dir, size)
+        for name, path in paths.items():
+            print(f"{size:>7} transactions | {name:12} | {path}")
@@ -21,21 +21,25 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 import os
-import re
 import json
 from io import BytesIO, StringIO
 import subprocess
 import sys
-from PIL import Image
 import plotly.graph_objects as go
 import plotly.express as px
 from fpdf import FPDF
 import base64
-import io
 from pathlib import Path
-import re
 import ollama
 
+from statement_parser import (
+    BANK_PARSERS, categorize_series, category_instrumentation, category_stats_report,
+    import_category_overrides, ingest_into_ledger, ingest_statements,
+    parse_statement_cached, resolve_statement_bank, save_category_model,
+    train_category_model,
+)
+from workbook_reader import read_workbook_sheets, worksheet_to_dataframe
+
 # Set page config
 st.set_page_config(
     page_title="Life & Budget Dashboard",
@@ -160,81 +164,6 @@ def create_welcome_guide(sheet):
     footer_cell.alignment = Alignment(horizontal='center')
 
 
-def worksheet_to_dataframe(sheet):
-    """Converts an openpyxl worksheet to a pandas DataFrame.
-    
-    This function is designed to be robust and work with various Excel formats.
-    It will:
-    1. Find the first row that looks like a header
-    2. Read all subsequent rows as data
-    3. Clean up empty rows and columns
-    4. Preserve all data (no aggressive filtering)
-    """
-    try:
-        # Get all rows with values
-        all_rows = list(sheet.iter_rows(values_only=True))
-        if not all_rows:
-            return pd.DataFrame()
-
-        # 1. Find the header row by looking for common header keywords
-        header_row_index = -1
-        for i, row in enumerate(all_rows):
-            if not any(cell is None for cell in row[:5]):  # First 5 columns shouldn't be empty in a header
-                header_candidates = [str(cell).lower() for cell in row if cell is not None]
-                header_keywords = ['date', 'amount', 'source', 'description', 'category', 'type', 'name', 'item']
-                if any(any(kw in str(cell).lower() for kw in header_keywords) for cell in row if cell):
-                    header_row_index = i
-                    break
-        
-        # If no header found, try to use the first non-empty row as header
-        if header_row_index == -1:
-            for i, row in enumerate(all_rows):
-                if any(cell is not None for cell in row):
-                    header_row_index = i
-                    break
-            
-            if header_row_index == -1:
-                return pd.DataFrame()  # No data found
-
-        # 2. Get header and data
-        header = [str(cell) if cell is not None else f'Column_{i+1}' 
-                 for i, cell in enumerate(all_rows[header_row_index])]
-        data = all_rows[header_row_index + 1:]
-
-        # 3. Create DataFrame with proper handling of empty cells
-        df = pd.DataFrame(data, columns=header)
-        
-        # 4. Clean the DataFrame
-        # Drop completely empty rows and columns
-        df = df.dropna(how='all')
-        df = df.dropna(how='all', axis=1)
-        
-        # Convert all columns to string and strip whitespace
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].astype(str).str.strip()
-        
-        # Remove completely empty rows again after type conversion
-        df = df[df.astype(str).ne('None').any(axis=1)]
-        df = df[df.astype(str).ne('').any(axis=1)]
-        
-        # Reset index after all filtering
-        df.reset_index(drop=True, inplace=True)
-        
-        return df
-        
-    except Exception as e:
-        print(f"Error processing sheet {sheet.title}: {str(e)}")
-        return pd.DataFrame()
-
-def is_merged_cell(sheet, row, col):
-    """Check if a cell is part of a merged range."""
-    for merged_range in sheet.merged_cells.ranges:
-        if (merged_range.min_row <= row <= merged_range.max_row and 
-            merged_range.min_col <= col <= merged_range.max_col):
-            return True
-    return False
-
 def create_pdf_report(month=None, sections=None):
     """Create a professional PDF report with charts and financial analysis."""
     try:
@@ -2123,16 +2052,22 @@ def create_excel_template(month=None, sections=None):
     
     return wb
 
-def read_excel_data_optimized(file_path, selected_categories=None, for_ai_conversion=False):
-    """Optimized function to read Excel data using openpyxl for better accuracy.
+def read_excel_data_optimized(file_path, selected_categories=None, for_ai_conversion=False, engine=None):
+    """Read a tracker workbook's sheets into DataFrames, optionally filtered by category.
+    
+    Sheets come from read_workbook_sheets (the direct .xlsx reader unless
+    another EXCEL_READ_ENGINE is chosen), so asking for different categories
+    of the same workbook only slices the cached sheets.
     
     Args:
-        file_path (str): Path to the Excel file
+        file_path (str or bytes): Path to the Excel file, or its raw bytes
         selected_categories (list, optional): Categories to include. Defaults to None (all).
         for_ai_conversion (bool): If True, prepares data for AI-friendly conversion.
+        engine (str, optional): Key of EXCEL_READ_ENGINES to read with.
+            Defaults to EXCEL_READ_ENGINE.
     """
     try:
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        workbook_sheets = read_workbook_sheets(file_path, engine)
         data = {}
 
         # Map categories to sheet names
@@ -2160,14 +2095,13 @@ def read_excel_data_optimized(file_path, selected_categories=None, for_ai_conver
         else:
             # Exclude non-data sheets
             excluded_sheets = ['Welcome Guide', 'Dashboard', 'Charts', 'AI Insights', 'Summary']
-            sheets_to_process = [sheet.title for sheet in wb.worksheets 
-                               if sheet.title not in excluded_sheets]
+            sheets_to_process = [sheet_name for sheet_name in workbook_sheets
+                               if sheet_name not in excluded_sheets]
 
         # Process each sheet
         for sheet_name in sheets_to_process:
-            if sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                df = worksheet_to_dataframe(sheet)
+            if sheet_name in workbook_sheets:
+                df = workbook_sheets[sheet_name]
                 
                 if not df.empty:
                     # Clean the data
@@ -2263,19 +2197,23 @@ def create_ai_friendly_template(output_path="ai_finance_template.xlsx"):
     wb.save(output_path)
     return output_path
 
-def convert_to_ai_friendly(input_file, output_file):
+def convert_to_ai_friendly(input_file, output_file, engine=None, source_name=None):
     """Convert an existing Excel file to AI-friendly format.
     
     Args:
-        input_file (str): Path to the input Excel file
+        input_file (str or bytes): Path to the input Excel file, or its raw bytes
         output_file (str): Path to save the converted file
+        engine (str, optional): Key of EXCEL_READ_ENGINES to read with.
+            Defaults to EXCEL_READ_ENGINE.
+        source_name (str, optional): File name recorded in the metadata sheet.
+            Defaults to the input path's base name; pass it for raw bytes.
         
     Returns:
         tuple: (success: bool, message: str)
     """
     try:
-        # Read the input file
-        wb_in = openpyxl.load_workbook(input_file, data_only=True)
+        # Read the input file (or reuse the sheets from an earlier read)
+        sheets = read_workbook_sheets(input_file, engine)
         wb_out = openpyxl.Workbook()
         
         # Remove default sheet
@@ -2300,13 +2238,10 @@ def convert_to_ai_friendly(input_file, output_file):
             ws_instructions[f'A{i}'] = instruction
         
         # Process each sheet
-        for sheet_name in wb_in.sheetnames:
+        for sheet_name, df in sheets.items():
             # Skip non-data sheets
             if sheet_name in ['Welcome Guide', 'Charts', 'AI Insights', 'Dashboard', '_metadata']:
                 continue
-                
-            ws_in = wb_in[sheet_name]
-            df = worksheet_to_dataframe(ws_in)
             
             if not df.empty:
                 # Clean the data
@@ -2324,6 +2259,9 @@ def convert_to_ai_friendly(input_file, output_file):
                         except:
                             pass
                     
+                    # Missing values are written as empty cells rather than NaN
+                    df = df.astype(object).where(df.notna(), None)
+                    
                     # Create new sheet in output workbook
                     safe_sheet_name = re.sub(r'[\[\]\:*?/\\]', '_', sheet_name)[:31]  # Excel sheet name limit
                     ws_out = wb_out.create_sheet(safe_sheet_name)
@@ -2360,8 +2298,11 @@ def convert_to_ai_friendly(input_file, output_file):
         ws_meta['B2'] = "1.1"  # Bump version for Monthly Purchases addition
         ws_meta['A2'].font = Font(bold=True)
         
+        if source_name is None:
+            source_name = os.path.basename(input_file) if isinstance(input_file, (str, os.PathLike)) else "Uploaded workbook"
+        
         meta_data = [
-            ("Original file:", os.path.basename(input_file)),
+            ("Original file:", source_name),
             ("Converted on:", datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
             ("Conversion notes:", "This file has been optimized for AI analysis."),
             ("", ""),
@@ -2391,7 +2332,7 @@ def generate_ai_insights(file_path, selected_categories=None):
     Generate AI insights from the uploaded Excel file using Ollama.
     
     Args:
-        file_path (str): Path to the Excel file
+        file_path (str or bytes): Path to the Excel file, or its raw bytes
         selected_categories (list): List of categories to analyze
         
     Returns:
@@ -2629,412 +2570,6 @@ Note: Be specific with numbers and percentages where possible. Use emojis for be
     except Exception as e:
         return "", f"❌ Error: {str(e)}"
 
-def parse_monzo_statement(file_content):
-    """Parse Monzo bank statement from CSV or PDF"""
-    try:
-        # First try to detect if it's a PDF
-        if file_content.startswith(b'%PDF'):
-            return parse_monzo_pdf_statement(file_content)
-        
-        # Try to parse as CSV
-        df = pd.read_csv(StringIO(file_content.decode('utf-8')))
-        
-        # Debug: Show the columns we found
-        print(f"Monzo statement columns found: {list(df.columns)}")
-        print(f"First few rows:\n{df.head()}")
-        
-        # Standardize Monzo columns - be more flexible with column names
-        # Common Monzo column variations
-        column_mapping = {
-            'date': 'Date',
-            'time': 'Time',
-            'type': 'Type',
-            'description': 'Description',
-            'category': 'Category',
-            'amount': 'Amount',
-            'balance': 'Balance',
-            'transaction_type': 'Transaction Type'
-        }
-        
-        # Try to find the correct columns
-        date_col = None
-        desc_col = None
-        amount_col = None
-        category_col = None
-        
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if col_lower in ['date', 'transaction date', 'posted date']:
-                date_col = col
-            elif col_lower in ['description', 'details', 'transaction description', 'memo', 'notes']:
-                desc_col = col
-            elif col_lower in ['amount', 'value', 'debit', 'credit', 'transaction amount']:
-                amount_col = col
-            elif col_lower in ['category', 'type', 'transaction type']:
-                category_col = col
-        
-        if date_col and desc_col and amount_col:
-            # Rename columns to standard names
-            df = df.rename(columns={
-                date_col: 'Date',
-                desc_col: 'Description',
-                amount_col: 'Amount'
-            })
-            
-            # Ensure Amount is numeric
-            df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-            
-            # Add bank and transaction type
-            df['Bank'] = 'Monzo'
-            df['Transaction Type'] = df['Amount'].apply(lambda x: 'Income' if x > 0 else 'Expense')
-            
-            # Handle Monzo categories - if they exist, use them; otherwise categorize by description
-            if category_col and category_col in df.columns:
-                # Check if Monzo already has pot transfer categories
-                df['Category'] = df[category_col].apply(lambda x: 
-                    'Pot Transfer' if 'pot' in str(x).lower() else categorize_transaction(x)
-                )
-                # Drop the original category column to avoid confusion
-                df = df.drop(columns=[category_col])
-            else:
-                df['Category'] = df['Description'].apply(categorize_transaction)
-            
-            return df
-        else:
-            print(f"Could not find required columns. Date: {date_col}, Description: {desc_col}, Amount: {amount_col}")
-            return None
-    except Exception as e:
-        print(f"Error parsing Monzo statement: {str(e)}")
-        return None
-
-def extract_monzo_balance_summary(text):
-    """Extract balance summary information from Monzo PDF header"""
-    balance_info = {}
-    
-    try:
-        # Extract Total balance (Including all Pots and Cashback)
-        total_balance_match = re.search(r'Total balance\(Including all Pots and Cashback\)£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
-        if total_balance_match:
-            balance_info['total_balance_including_pots'] = float(total_balance_match.group(1).replace(',', ''))
-        
-        # Extract Personal Account balance (Excluding all Pots)
-        personal_balance_match = re.search(r'Personal Account balance\(Excluding all Pots\)£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
-        if personal_balance_match:
-            balance_info['personal_account_balance'] = float(personal_balance_match.group(1).replace(',', ''))
-        
-        # Extract Balance in Pots
-        pots_balance_match = re.search(r'Balance in Pots\(This includes both Regular Pots with Monzo and SavingsPots with external providers\)£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
-        if pots_balance_match:
-            balance_info['balance_in_pots'] = float(pots_balance_match.group(1).replace(',', ''))
-        
-        # Extract Cashback Balance
-        cashback_balance_match = re.search(r'Cashback Balance-£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
-        if cashback_balance_match:
-            balance_info['cashback_balance'] = float(cashback_balance_match.group(1).replace(',', ''))
-        
-        # Extract Total outgoings
-        outgoings_match = re.search(r'Total outgoings\+£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
-        if outgoings_match:
-            balance_info['total_outgoings'] = float(outgoings_match.group(1).replace(',', ''))
-        
-        # Extract Total deposits
-        deposits_match = re.search(r'Total deposits£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
-        if deposits_match:
-            balance_info['total_deposits'] = float(deposits_match.group(1).replace(',', ''))
-            
-    except Exception as e:
-        print(f"Error extracting balance summary: {str(e)}")
-    
-    return balance_info
-
-def parse_monzo_pdf_statement(file_content):
-    """Parse Monzo PDF statement by extracting text with improved parsing for concatenated format"""
-    try:
-        import PyPDF2
-        import io
-        import re
-        
-        # Read PDF
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        text = ""
-        
-        # Extract text from all pages
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
-        print(f"Extracted PDF text (first 1000 chars):\n{text[:1000]}")
-        
-        # Extract balance summary from header
-        balance_info = extract_monzo_balance_summary(text)
-        
-        # Parse Monzo PDF format - handle concatenated transaction format
-        all_transactions = []
-        
-        # Use regex to find all transaction patterns in the concatenated text
-        # Pattern: DD/MM/YYYYDescriptionAmountBalanceAmount
-        transaction_pattern = r'(\d{2}/\d{2}/\d{4})([A-Za-z0-9\s\.\-\(\)\/]+?)(-?\d+\.\d{2})(-?\d+\.\d{2})'
-        
-        matches = re.findall(transaction_pattern, text)
-        print(f"Found {len(matches)} transaction matches using regex")
-        
-        for match in matches:
-            date_str, description, amount_str, balance_str = match
-            
-            try:
-                amount = float(amount_str)
-                balance = float(balance_str)
-                
-                # Clean up description
-                description = description.strip()
-                
-                # Skip obvious invalid transactions but keep pot transfers
-                if (len(description) < 2 or 
-                    description.isdigit() or
-                    any(keyword in description.lower() for keyword in [
-                        'balance', 'total', 'account', 'statement', 'anthony', 'kinyua', 'gathukia',
-                        'flat', 'room', 'house', 'court', 'road', 'nottingham', 'ng7', 'united', 'kingdom'
-                    ])):
-                    continue
-                
-                # Only consider reasonable transaction amounts
-                if abs(amount) < 0.01 or abs(amount) > 10000:
-                    continue
-                
-                all_transactions.append({
-                    'Date': datetime.datetime.strptime(date_str, '%d/%m/%Y').strftime('%Y-%m-%d'),
-                    'Description': description,
-                    'Amount': amount,
-                    'Balance': balance,
-                    'Bank': 'Monzo',
-                    'Transaction Type': 'Income' if amount > 0 else 'Expense',
-                    'Category': categorize_transaction(description)
-                })
-                
-            except (ValueError, IndexError) as e:
-                print(f"Error parsing transaction: {match}, Error: {e}")
-                continue
-        
-        # If regex didn't work well, try alternative approach
-        if len(all_transactions) < 10:
-            print("Regex approach found few transactions, trying alternative parsing...")
-            
-            # Alternative: split by date pattern
-            date_pattern = r'(\d{2}/\d{2}/\d{4})'
-            parts = re.split(date_pattern, text)
-            
-            current_date = None
-            for i in range(1, len(parts), 2):  # Skip the first empty part
-                if i + 1 < len(parts):
-                    date_str = parts[i]
-                    content = parts[i + 1]
-                    
-                    try:
-                        current_date = datetime.datetime.strptime(date_str, '%d/%m/%Y').strftime('%Y-%m-%d')
-                        
-                        # Find all amounts in this section
-                        amount_matches = re.findall(r'(-?\d+\.\d{2})', content)
-                        
-                        if len(amount_matches) >= 2:  # Need at least amount and balance
-                            amount = float(amount_matches[0])
-                            
-                            # Extract description (text between date and first amount)
-                            description = content[:content.find(amount_matches[0])].strip()
-                            
-                            # Skip invalid transactions but keep pot transfers
-                            if (len(description) >= 2 and 
-                                not description.isdigit() and
-                                abs(amount) >= 0.01 and abs(amount) <= 10000 and
-                                not any(keyword in description.lower() for keyword in [
-                                    'balance', 'total', 'account', 'statement'
-                                ])):
-                                
-                                all_transactions.append({
-                                    'Date': current_date,
-                                    'Description': description,
-                                    'Amount': amount,
-                                    'Bank': 'Monzo',
-                                    'Transaction Type': 'Income' if amount > 0 else 'Expense',
-                                    'Category': categorize_transaction(description)
-                                })
-                    
-                    except (ValueError, IndexError):
-                        continue
-        
-        # Filter and keep ALL valid transactions (including duplicates)
-        valid_transactions = []
-        
-        for trans in all_transactions:
-            desc = trans['Description'].strip()
-            desc_lower = desc.lower()
-            
-            # Skip obvious invalid transactions but keep pot transfers
-            if (len(desc) < 2 or 
-                desc.isdigit() or
-                any(keyword in desc_lower for keyword in [
-                    'balance', 'total', 'account', 'statement', 'anthony', 'kinyua', 'gathukia',
-                    'flat', 'room', 'house', 'court', 'road', 'nottingham', 'ng7', 'united', 'kingdom'
-                ])):
-                continue
-            
-            # Keep ALL valid transactions, no deduplication
-            valid_transactions.append(trans)
-        
-        if valid_transactions:
-            df = pd.DataFrame(valid_transactions)
-            print(f"Successfully parsed {len(valid_transactions)} transactions from PDF (from {len(all_transactions)} raw matches)")
-            print(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
-            
-            # Add balance summary information to the dataframe
-            if balance_info:
-                for key, value in balance_info.items():
-                    df.attrs[key] = value
-            
-            return df
-        else:
-            print("No transactions found in PDF")
-            return None
-            
-    except ImportError:
-        print("PyPDF2 not installed. Install with: pip install PyPDF2")
-        return None
-    except Exception as e:
-        print(f"Error parsing Monzo PDF: {str(e)}")
-        return None
-
-def parse_lloyds_statement(file_content):
-    """Parse Lloyds bank statement"""
-    try:
-        # Try CSV format
-        df = pd.read_csv(StringIO(file_content.decode('utf-8')))
-        
-        # Standardize Lloyds columns
-        if 'Transaction Date' in df.columns or 'Date' in df.columns:
-            date_col = 'Transaction Date' if 'Transaction Date' in df.columns else 'Date'
-            df = df.rename(columns={date_col: 'Date'})
-            
-            if 'Description' not in df.columns and 'Transaction Details' in df.columns:
-                df = df.rename(columns={'Transaction Details': 'Description'})
-                
-            if 'Amount' not in df.columns and 'Debit Amount' in df.columns:
-                df['Amount'] = df['Debit Amount'].fillna(0) - df['Credit Amount'].fillna(0)
-            
-            df['Bank'] = 'Lloyds'
-            df['Transaction Type'] = df['Amount'].apply(lambda x: 'Income' if x > 0 else 'Expense')
-            df['Category'] = df['Description'].apply(categorize_transaction)
-            return df
-        else:
-            return None
-    except:
-        return None
-
-def parse_barclays_statement(file_content):
-    """Parse Barclays bank statement"""
-    try:
-        # Try CSV format
-        df = pd.read_csv(StringIO(file_content.decode('utf-8')))
-        
-        # Standardize Barclays columns
-        if 'Transaction Date' in df.columns or 'Date' in df.columns:
-            date_col = 'Transaction Date' if 'Transaction Date' in df.columns else 'Date'
-            df = df.rename(columns={date_col: 'Date'})
-            
-            if 'Description' not in df.columns and 'Transaction Description' in df.columns:
-                df = df.rename(columns={'Transaction Description': 'Description'})
-                
-            df['Bank'] = 'Barclays'
-            df['Transaction Type'] = df['Amount'].apply(lambda x: 'Income' if x > 0 else 'Expense')
-            df['Category'] = df['Description'].apply(categorize_transaction)
-            return df
-        else:
-            return None
-    except:
-        return None
-
-def categorize_transaction(description):
-    """Categorize transactions based on description"""
-    description = str(description).lower().strip()
-    
-    # Pot transfers - handle these first as they're special
-    if any(keyword in description for keyword in [
-        'transfer from pot', 'transfer to pot', 'pot transfer', 'pot to pot', 'between pots', 
-        'move to pot', 'pot withdrawal', 'monzo pot', 'pot deposit', 'pot withdrawal', 
-        'savings pot', 'bills pot', 'expenses pot', 'shared pot', 'monzo plus pot'
-    ]):
-        return 'Pot Transfer'
-    
-    # P2P payments - handle before general categories
-    if any(keyword in description for keyword in ['p2p payment', 'payment to', 'paid to']):
-        return 'Transfers & Payments'
-    
-    # Income categories
-    if any(keyword in description for keyword in ['salary', 'wages', 'pay', 'income']):
-        return 'Income'
-    elif any(keyword in description for keyword in ['refund', 'return', 'cashback']):
-        return 'Refund'
-    
-    # Housing & Utilities
-    elif any(keyword in description for keyword in ['rent', 'mortgage', 'property', 'council tax']):
-        return 'Housing'
-    elif any(keyword in description for keyword in ['electric', 'gas', 'water', 'bill', 'utility', 'broadband', 'internet']):
-        return 'Utilities'
-    
-    # Food & Dining
-    elif any(keyword in description for keyword in ['tesco', 'sainsbury', 'asda', 'morrisons', 'grocery', 'food', 'supermarket']):
-        return 'Groceries'
-    elif any(keyword in description for keyword in ['restaurant', 'cafe', 'coffee', 'dining', 'eat', 'takeaway', 'deliveroo', 'just eat']):
-        return 'Dining Out'
-    elif any(keyword in description for keyword in ['pub', 'bar', 'wine', 'beer']):
-        return 'Alcohol & Social'
-    
-    # Transportation
-    elif any(keyword in description for keyword in ['uber', 'taxi', 'bus', 'train', 'tube', 'transport', 'tfl', 'national rail']):
-        return 'Transportation'
-    elif any(keyword in description for keyword in ['petrol', 'gas', 'fuel', 'parking']):
-        return 'Car Expenses'
-    
-    # Shopping
-    elif any(keyword in description for keyword in ['amazon', 'ebay', 'shop', 'store', 'purchase', 'retail']):
-        return 'Shopping'
-    elif any(keyword in description for keyword in ['clothing', 'fashion', 'h&m', 'zara', 'primark']):
-        return 'Clothing'
-    elif any(keyword in description for keyword in ['pharmacy', 'boots', 'superdrug', 'medicine']):
-        return 'Health & Pharmacy'
-    
-    # Entertainment & Subscriptions
-    elif any(keyword in description for keyword in ['netflix', 'spotify', 'subscription', 'prime', 'disney+']):
-        return 'Subscriptions'
-    elif any(keyword in description for keyword in ['cinema', 'movie', 'entertainment', 'theatre', 'concert']):
-        return 'Entertainment'
-    elif any(keyword in description for keyword in ['gym', 'fitness', 'health', 'exercise']):
-        return 'Health & Fitness'
-    
-    # Financial Services (exclude pot transfers which are handled above)
-    elif any(keyword in description for keyword in ['bank', 'interest', 'fee', 'charge', 'payment']):
-        return 'Banking & Fees'
-    
-    # Personal Care
-    elif any(keyword in description for keyword in ['hair', 'beauty', 'salon', 'barber']):
-        return 'Personal Care'
-    
-    # Technology
-    elif any(keyword in description for keyword in ['apple', 'google', 'microsoft', 'app', 'software']):
-        return 'Technology'
-    
-    # Travel
-    elif any(keyword in description for keyword in ['hotel', 'flight', 'holiday', 'travel', 'airbnb', 'booking']):
-        return 'Travel'
-    
-    # Education
-    elif any(keyword in description for keyword in ['course', 'education', 'book', 'university']):
-        return 'Education'
-    
-    # Charity
-    elif any(keyword in description for keyword in ['charity', 'donation', 'fund']):
-        return 'Charity & Donations'
-    
-    else:
-        return 'Other'
-
 def analyze_financial_performance(df):
     """Analyze financial performance using Ollama"""
     try:
@@ -3104,6 +2639,199 @@ def analyze_financial_performance(df):
     except Exception as e:
         return f"❌ Error preparing analysis: {str(e)}"
 
+def display_statement_analysis(df, bank_label):
+    """Show the summary metrics, charts, AI analysis and CSV export for a parsed statement."""
+    # Display Monzo balance summary if available
+    if hasattr(df, 'attrs') and df.attrs:
+        st.subheader("🏦 Monzo Balance Summary")
+        balance_cols = st.columns(3)
+        
+        with balance_cols[0]:
+            if 'total_balance_including_pots' in df.attrs:
+                st.metric("Total Balance (Inc. Pots)", f"£{df.attrs['total_balance_including_pots']:,.2f}")
+            if 'personal_account_balance' in df.attrs:
+                st.metric("Personal Account Balance", f"£{df.attrs['personal_account_balance']:,.2f}")
+        
+        with balance_cols[1]:
+            if 'balance_in_pots' in df.attrs:
+                st.metric("Balance in Pots", f"£{df.attrs['balance_in_pots']:,.2f}")
+            if 'cashback_balance' in df.attrs:
+                st.metric("Cashback Balance", f"£{df.attrs['cashback_balance']:,.2f}")
+        
+        with balance_cols[2]:
+            if 'total_outgoings' in df.attrs:
+                st.metric("Total Outgoings", f"£{df.attrs['total_outgoings']:,.2f}")
+            if 'total_deposits' in df.attrs:
+                st.metric("Total Deposits", f"£{df.attrs['total_deposits']:,.2f}")
+    
+    # Show summary statistics with pot transfer handling
+    st.subheader("📊 Transaction Summary")
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    
+    # Separate pot transfers from regular transactions
+    pot_transfers = df[df['Category'] == 'Pot Transfer']
+    regular_transactions = df[df['Category'] != 'Pot Transfer']
+    
+    with col1:
+        total_income = regular_transactions[regular_transactions['Amount'] > 0]['Amount'].sum()
+        st.metric("Total Income", f"£{total_income:,.2f}")
+    
+    with col2:
+        total_expenses = abs(regular_transactions[regular_transactions['Amount'] < 0]['Amount'].sum())
+        st.metric("Total Expenses", f"£{total_expenses:,.2f}")
+    
+    with col3:
+        net_savings = total_income - total_expenses
+        st.metric("Net Savings", f"£{net_savings:,.2f}")
+    
+    with col4:
+        pot_in = pot_transfers[pot_transfers['Amount'] > 0]['Amount'].sum() if not pot_transfers.empty else 0
+        st.metric("Pot Money In", f"£{pot_in:,.2f}")
+    
+    with col5:
+        pot_out = abs(pot_transfers[pot_transfers['Amount'] < 0]['Amount'].sum() if not pot_transfers.empty else 0)
+        st.metric("Pot Money Out", f"£{pot_out:,.2f}")
+    
+    with col6:
+        # Calculate balance left (income - expenses, excluding pot transfers)
+        balance_left = total_income - total_expenses
+        st.metric("Balance Left", f"£{balance_left:,.2f}")
+    
+    # Show pot transfer details if any exist
+    if not pot_transfers.empty:
+        st.subheader("🔄 Pot Transfer Transactions")
+        st.dataframe(pot_transfers, width='stretch')
+        
+        # Pot transfer summary
+        pot_in = pot_transfers[pot_transfers['Amount'] > 0]['Amount'].sum()
+        pot_out = abs(pot_transfers[pot_transfers['Amount'] < 0]['Amount'].sum())
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Pot Money In", f"${pot_in:,.2f}")
+        with col2:
+            st.metric("Pot Money Out", f"${pot_out:,.2f}")
+        with col3:
+            st.metric("Net Pot Movement", f"${pot_in - pot_out:,.2f}")
+    
+    # Show transaction preview
+    st.subheader("📋 Recent Transactions")
+    st.dataframe(df.head(10), width='stretch')
+    
+    # Category breakdown (exclude pot transfers from expenses)
+    st.subheader("📈 Spending by Category")
+    expense_df = regular_transactions[regular_transactions['Amount'] < 0]
+    if not expense_df.empty:
+        category_summary = expense_df.groupby('Category')['Amount'].sum().abs().sort_values(ascending=False)
+        
+        # Create pie chart
+        fig = px.pie(
+            values=category_summary.values,
+            names=category_summary.index,
+            title="Expense Breakdown (Excluding Pot Transfers)"
+        )
+        st.plotly_chart(fig, width='stretch')
+    
+    # Transaction count summary
+    st.subheader("📊 Transaction Summary")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        regular_count = len(regular_transactions)
+        st.metric("Regular Transactions", regular_count)
+    
+    with col2:
+        pot_count = len(pot_transfers)
+        st.metric("Pot Transfer Transactions", pot_count)
+    
+    with col3:
+        total_count = len(df)
+        st.metric("Total Transactions", total_count)
+    
+    # AI Analysis button
+    if st.button(f"🤖 Analyze with Ollama", type="primary"):
+        with st.spinner("Analyzing your financial performance with AI..."):
+            analysis = analyze_financial_performance(df)
+            
+            st.subheader("🧠 AI Financial Analysis")
+            if analysis.startswith("⚠️") or analysis.startswith("❌"):
+                st.error(analysis)
+                
+                # Show basic analysis even if AI fails
+                st.subheader("📊 Basic Analysis")
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write("**Financial Summary:**")
+                    st.write(f"- Total Income: £{total_income:,.2f}")
+                    st.write(f"- Total Expenses: £{total_expenses:,.2f}")
+                    st.write(f"- Net Savings: £{net_savings:,.2f}")
+                    st.write(f"- Balance Left: £{balance_left:,.2f}")
+                    savings_rate = (net_savings/total_income*100) if total_income > 0 else 0
+                    st.write(f"- Savings Rate: {savings_rate:.1f}%")
+                    
+                    st.write("**Pot Transfer Summary:**")
+                    st.write(f"- Pot Money In: £{pot_in:,.2f}")
+                    st.write(f"- Pot Money Out: £{pot_out:,.2f}")
+                    st.write(f"- Net Pot Movement: £{pot_in - pot_out:,.2f}")
+                
+                with col2:
+                    st.write("**Top Spending Categories:**")
+                    if not expense_df.empty:
+                        category_summary = expense_df.groupby('Category')['Amount'].sum().abs().sort_values(ascending=False)
+                        for cat, amount in category_summary.head(3).items():
+                            st.write(f"- {cat}: £{abs(amount):,.2f}")
+                
+                # Basic recommendations
+                st.subheader("💡 Quick Recommendations")
+                if net_savings < 0:
+                    st.warning("⚠️ You're spending more than you earn. Consider reviewing expenses.")
+                elif net_savings < total_income * 0.1:  # Less than 10% savings
+                    st.info("💰 Try to increase savings to at least 10% of income.")
+                else:
+                    st.success("✅ Good savings rate! Keep tracking expenses.")
+                    
+                # Pot transfer insights
+                if pot_in > 0 or pot_out > 0:
+                    st.info(f"🔄 You moved £{pot_out:,.2f} out of pots and £{pot_in:,.2f} into pots. Net pot movement: £{pot_in - pot_out:,.2f}")
+            else:
+                st.markdown(analysis)
+                
+                # Show analysis confidence
+                st.info("🤖 Analysis powered by Ollama Llama2")
+            
+            # Download analysis
+            analysis_bytes = analysis.encode('utf-8')
+            st.download_button(
+                label="📥 Download Analysis",
+                data=analysis_bytes,
+                file_name=f"financial_analysis_{bank_label}_{datetime.datetime.now().strftime('%Y%m%d')}.txt",
+                mime="text/plain"
+            )
+    
+    # Which categorization rules fire on this statement and what they cost
+    with st.expander("🔬 Categorizer Rule Stats"):
+        if st.checkbox("Record rule hits and timings", key=f"rule_stats_{bank_label}"):
+            with category_instrumentation() as stats:
+                categorize_series(df['Description'])
+            rule_stats, unmatched = category_stats_report(stats)
+            st.caption(f"{stats['rows']} transactions categorized in {stats['elapsed'] * 1000:,.1f} ms "
+                       f"(rules checked one at a time, so slower than normal)")
+            st.dataframe(rule_stats, width='stretch', hide_index=True)
+            if not unmatched.empty:
+                st.write("**Top merchants no rule matched:**")
+                st.dataframe(unmatched, width='stretch', hide_index=True)
+    
+    # Export processed data
+    st.subheader("💾 Export Processed Data")
+    csv = df.to_csv(index=False)
+    st.download_button(
+        label="📊 Download CSV",
+        data=csv,
+        file_name=f"processed_{bank_label}_statement.csv",
+        mime="text/csv"
+    )
+
 def main():
     st.title("📊 Life & Budget Dashboard")
     st.markdown("### Your All-in-One Financial and Personal Management Tool")
@@ -3297,18 +3025,14 @@ def main():
         
         if uploaded_file is not None:
             with st.spinner("Converting your file..."):
-                # Create a temporary file for the uploaded file
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_in:
-                    tmp_in.write(uploaded_file.getvalue())
-                    input_path = tmp_in.name
-                
                 # Create a temporary output file
                 with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_out:
                     output_path = tmp_out.name
                 
                 try:
                     # Convert the file
-                    success, message = convert_to_ai_friendly(input_path, output_path)
+                    success, message = convert_to_ai_friendly(uploaded_file.getvalue(), output_path,
+                                                             source_name=uploaded_file.name)
                     
                     if success:
                         st.success("File converted successfully!")
@@ -3341,12 +3065,11 @@ def main():
                     
                 finally:
                     # Clean up temporary files
-                    for path in [input_path, output_path]:
-                        try:
-                            if os.path.exists(path):
-                                os.unlink(path)
-                        except:
-                            pass
+                    try:
+                        if os.path.exists(output_path):
+                            os.unlink(output_path)
+                    except:
+                        pass
     
     elif page == "AI Insights":
         st.header("📊 Upload Your Data for AI Insights")
@@ -3374,49 +3097,41 @@ def main():
         if uploaded_file is not None:
             if st.button("🤖 Generate AI Insights", key="ai_insights_btn"):
                 with st.spinner("Analyzing your data with AI..."):
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-                        tmp.write(uploaded_file.getvalue())
-                        tmp_path = tmp.name
+                    excel_data_str, insights = generate_ai_insights(uploaded_file.getvalue(), selected_categories)
                     
-                    try:
-                        excel_data_str, insights = generate_ai_insights(tmp_path, selected_categories)
+                    # --- DEBUG: Show the data sent to the AI --- #
+                    with st.expander("View Data Sent to AI (for debugging)"):
+                        st.text(excel_data_str)
+                    # --- END DEBUG --- #
+
+                    if not insights.startswith(('❌', '⚠️')):
+                        st.success("AI Analysis Complete!")
+                        st.markdown("### 🎯 Your Personalized Insights")
                         
-                        # --- DEBUG: Show the data sent to the AI --- #
-                        with st.expander("View Data Sent to AI (for debugging)"):
-                            st.text(excel_data_str)
-                        # --- END DEBUG --- #
-
-                        if not insights.startswith(('❌', '⚠️')):
-                            st.success("AI Analysis Complete!")
-                            st.markdown("### 🎯 Your Personalized Insights")
-                            
-                            with st.expander("View Insights", expanded=True):
-                                st.markdown(insights)
-                            
-                            # Download buttons
-                            col1, col2 = st.columns(2)
-                            with col1:
+                        with st.expander("View Insights", expanded=True):
+                            st.markdown(insights)
+                        
+                        # Download buttons
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.download_button(
+                                label="📝 Download as Text",
+                                data=insights,
+                                file_name="financial_insights.txt",
+                                mime="text/plain"
+                            )
+                        with col2:
+                            pdf_path = generate_pdf(insights)
+                            with open(pdf_path, "rb") as f:
                                 st.download_button(
-                                    label="📝 Download as Text",
-                                    data=insights,
-                                    file_name="financial_insights.txt",
-                                    mime="text/plain"
+                                    label="📄 Download as PDF",
+                                    data=f,
+                                    file_name="financial_insights.pdf",
+                                    mime="application/pdf"
                                 )
-                            with col2:
-                                pdf_path = generate_pdf(insights)
-                                with open(pdf_path, "rb") as f:
-                                    st.download_button(
-                                        label="📄 Download as PDF",
-                                        data=f,
-                                        file_name="financial_insights.pdf",
-                                        mime="application/pdf"
-                                    )
-                                os.unlink(pdf_path)
-                        else:
-                            st.error(insights)
-                    finally:
-                        if os.path.exists(tmp_path):
-                            os.unlink(tmp_path)
+                            os.unlink(pdf_path)
+                    else:
+                        st.error(insights)
     
     elif page == "Bank Statement Analysis":
         st.header("🏦 Bank Statement Analysis")
@@ -3424,211 +3139,117 @@ def main():
         
         # Bank selection
         st.subheader("Select Your Bank")
-        bank_options = ["Monzo", "Lloyds", "Barclays"]
+        bank_options = ["Auto-detect"] + list(BANK_PARSERS)
         selected_bank = st.selectbox("Choose your bank:", bank_options)
         
-        # File upload
-        st.subheader(f"Upload {selected_bank} Statement")
-        uploaded_file = st.file_uploader(
-            f"Choose your {selected_bank} statement file",
-            type=["csv", "pdf", "xlsx", "xls"],
-            key="bank_statement"
+        upload_mode = st.radio(
+            "Upload mode:",
+            ["Single statement", "Batch (multiple statements)"],
+            horizontal=True
         )
         
+        # Corrected exports become per-merchant overrides and train the model
+        # that fills in rows the rules call 'Other'
+        with st.expander("🧠 Teach the categorizer from a corrected CSV"):
+            st.write("Download a processed statement below, fix the **Category** column, then upload it here. "
+                     "Saved corrections apply to that merchant on every future upload, and the model learns "
+                     "from them to categorize transactions the rules leave as 'Other'.")
+            labels_file = st.file_uploader("Corrected CSV", type=["csv"], key="category_training_csv")
+            save_col, train_col = st.columns(2)
+            if labels_file is not None and save_col.button("Save my corrections", key="save_category_overrides"):
+                try:
+                    saved = import_category_overrides(labels_file.getvalue())
+                    st.success(f"✅ Saved corrections for {saved} merchants." if saved
+                               else "ℹ️ No new corrections found in this file.")
+                except KeyError:
+                    st.error("❌ The CSV needs 'Description' and 'Category' columns.")
+                except Exception as e:
+                    st.error(f"❌ Could not save corrections: {str(e)}")
+            if labels_file is not None and train_col.button("Train category model", key="train_category_model"):
+                try:
+                    labelled = pd.read_csv(io.BytesIO(labels_file.getvalue()), dtype=str)
+                    model = train_category_model(labelled['Description'], labelled['Category'])
+                    if model is None:
+                        st.warning("⚠️ Need corrections in at least two categories other than 'Other' to train.")
+                    else:
+                        save_category_model(model)
+                        st.success(f"✅ Trained on {len(labelled)} rows covering {len(model['classes'])} categories.")
+                except KeyError:
+                    st.error("❌ The CSV needs 'Description' and 'Category' columns.")
+                except Exception as e:
+                    st.error(f"❌ Could not train the category model: {str(e)}")
+        
+        if upload_mode == "Batch (multiple statements)":
+            st.subheader("Upload Statements")
+            uploaded_files = st.file_uploader(
+                "Choose your statement files (any mix of banks and months)",
+                type=["csv", "pdf"],
+                accept_multiple_files=True,
+                key="bank_statements_batch"
+            )
+            uploaded_file = None
+            
+            if uploaded_files:
+                # Each file's bank is sniffed from its first few KB; the choice above is the fallback
+                file_bank = None if selected_bank == "Auto-detect" else selected_bank
+                batch_files = [(batch_file.name, batch_file.getvalue(), file_bank) for batch_file in uploaded_files]
+                
+                with st.spinner(f"Parsing {len(batch_files)} statements..."):
+                    ledger, ingest_report = ingest_statements(batch_files)
+                
+                st.subheader("📥 Ingestion Report")
+                st.dataframe(ingest_report, width='stretch')
+                
+                if ledger is not None:
+                    st.success(f"✅ Combined {len(ledger)} transactions from {ingest_report['Rows'].gt(0).sum()} statements!")
+                    display_statement_analysis(ledger, "combined")
+                else:
+                    st.error("❌ None of the statements could be parsed.")
+        else:
+            # File upload
+            statement_label = "Bank" if selected_bank == "Auto-detect" else selected_bank
+            st.subheader(f"Upload {statement_label} Statement")
+            uploaded_file = st.file_uploader(
+                f"Choose your {statement_label} statement file",
+                type=["csv", "pdf"],
+                key="bank_statement"
+            )
+        
         if uploaded_file is not None:
+            file_content = uploaded_file.getvalue()
+            chosen_bank = None if selected_bank == "Auto-detect" else selected_bank
+            selected_bank, detected_bank = resolve_statement_bank(file_content, chosen_bank)
+            
+            if chosen_bank is None:
+                if selected_bank:
+                    st.info(f"🔎 Detected a {selected_bank} statement")
+            elif detected_bank and detected_bank != chosen_bank:
+                st.warning(f"⚠️ This looks like a {detected_bank} statement rather than {chosen_bank}, "
+                           f"so it will be read as {detected_bank}.")
+        
+        if uploaded_file is not None and selected_bank is None:
+            st.error("❌ Couldn't work out which bank this statement is from. Please choose your bank above.")
+        elif uploaded_file is not None:
             st.success(f"✅ {selected_bank} statement uploaded successfully!")
             
             # Parse the statement based on bank
             with st.spinner(f"Parsing {selected_bank} statement..."):
-                file_content = uploaded_file.getvalue()
-                
-                if selected_bank == "Monzo":
-                    df = parse_monzo_statement(file_content)
-                elif selected_bank == "Lloyds":
-                    df = parse_lloyds_statement(file_content)
-                elif selected_bank == "Barclays":
-                    df = parse_barclays_statement(file_content)
+                df = parse_statement_cached(file_content, selected_bank)
                 
                 if df is not None:
                     st.success("✅ Statement parsed successfully!")
                     
-                    # Display Monzo balance summary if available
-                    if hasattr(df, 'attrs') and df.attrs:
-                        st.subheader("🏦 Monzo Balance Summary")
-                        balance_cols = st.columns(3)
-                        
-                        with balance_cols[0]:
-                            if 'total_balance_including_pots' in df.attrs:
-                                st.metric("Total Balance (Inc. Pots)", f"£{df.attrs['total_balance_including_pots']:,.2f}")
-                            if 'personal_account_balance' in df.attrs:
-                                st.metric("Personal Account Balance", f"£{df.attrs['personal_account_balance']:,.2f}")
-                        
-                        with balance_cols[1]:
-                            if 'balance_in_pots' in df.attrs:
-                                st.metric("Balance in Pots", f"£{df.attrs['balance_in_pots']:,.2f}")
-                            if 'cashback_balance' in df.attrs:
-                                st.metric("Cashback Balance", f"£{df.attrs['cashback_balance']:,.2f}")
-                        
-                        with balance_cols[2]:
-                            if 'total_outgoings' in df.attrs:
-                                st.metric("Total Outgoings", f"£{df.attrs['total_outgoings']:,.2f}")
-                            if 'total_deposits' in df.attrs:
-                                st.metric("Total Deposits", f"£{df.attrs['total_deposits']:,.2f}")
-                    
-                    # Show summary statistics with pot transfer handling
-                    st.subheader("📊 Transaction Summary")
-                    col1, col2, col3, col4, col5, col6 = st.columns(6)
-                    
-                    # Separate pot transfers from regular transactions
-                    pot_transfers = df[df['Category'] == 'Pot Transfer']
-                    regular_transactions = df[df['Category'] != 'Pot Transfer']
-                    
-                    with col1:
-                        total_income = regular_transactions[regular_transactions['Amount'] > 0]['Amount'].sum()
-                        st.metric("Total Income", f"£{total_income:,.2f}")
-                    
-                    with col2:
-                        total_expenses = abs(regular_transactions[regular_transactions['Amount'] < 0]['Amount'].sum())
-                        st.metric("Total Expenses", f"£{total_expenses:,.2f}")
-                    
-                    with col3:
-                        net_savings = total_income - total_expenses
-                        st.metric("Net Savings", f"£{net_savings:,.2f}")
-                    
-                    with col4:
-                        pot_in = pot_transfers[pot_transfers['Amount'] > 0]['Amount'].sum() if not pot_transfers.empty else 0
-                        st.metric("Pot Money In", f"£{pot_in:,.2f}")
-                    
-                    with col5:
-                        pot_out = abs(pot_transfers[pot_transfers['Amount'] < 0]['Amount'].sum() if not pot_transfers.empty else 0)
-                        st.metric("Pot Money Out", f"£{pot_out:,.2f}")
-                    
-                    with col6:
-                        # Calculate balance left (income - expenses, excluding pot transfers)
-                        balance_left = total_income - total_expenses
-                        st.metric("Balance Left", f"£{balance_left:,.2f}")
-                    
-                    # Show pot transfer details if any exist
-                    if not pot_transfers.empty:
-                        st.subheader("🔄 Pot Transfer Transactions")
-                        st.dataframe(pot_transfers, width='stretch')
-                        
-                        # Pot transfer summary
-                        pot_in = pot_transfers[pot_transfers['Amount'] > 0]['Amount'].sum()
-                        pot_out = abs(pot_transfers[pot_transfers['Amount'] < 0]['Amount'].sum())
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Pot Money In", f"${pot_in:,.2f}")
-                        with col2:
-                            st.metric("Pot Money Out", f"${pot_out:,.2f}")
-                        with col3:
-                            st.metric("Net Pot Movement", f"${pot_in - pot_out:,.2f}")
-                    
-                    # Show transaction preview
-                    st.subheader("📋 Recent Transactions")
-                    st.dataframe(df.head(10), width='stretch')
-                    
-                    # Category breakdown (exclude pot transfers from expenses)
-                    st.subheader("📈 Spending by Category")
-                    expense_df = regular_transactions[regular_transactions['Amount'] < 0]
-                    if not expense_df.empty:
-                        category_summary = expense_df.groupby('Category')['Amount'].sum().abs().sort_values(ascending=False)
-                        
-                        # Create pie chart
-                        fig = px.pie(
-                            values=category_summary.values,
-                            names=category_summary.index,
-                            title="Expense Breakdown (Excluding Pot Transfers)"
-                        )
-                        st.plotly_chart(fig, width='stretch')
-                    
-                    # Transaction count summary
-                    st.subheader("📊 Transaction Summary")
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        regular_count = len(regular_transactions)
-                        st.metric("Regular Transactions", regular_count)
-                    
-                    with col2:
-                        pot_count = len(pot_transfers)
-                        st.metric("Pot Transfer Transactions", pot_count)
-                    
-                    with col3:
-                        total_count = len(df)
-                        st.metric("Total Transactions", total_count)
-                    
-                    # AI Analysis button
-                    if st.button(f"🤖 Analyze with Ollama", type="primary"):
-                        with st.spinner("Analyzing your financial performance with AI..."):
-                            analysis = analyze_financial_performance(df)
-                            
-                            st.subheader("🧠 AI Financial Analysis")
-                            if analysis.startswith("⚠️") or analysis.startswith("❌"):
-                                st.error(analysis)
-                                
-                                # Show basic analysis even if AI fails
-                                st.subheader("📊 Basic Analysis")
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write("**Financial Summary:**")
-                                    st.write(f"- Total Income: £{total_income:,.2f}")
-                                    st.write(f"- Total Expenses: £{total_expenses:,.2f}")
-                                    st.write(f"- Net Savings: £{net_savings:,.2f}")
-                                    st.write(f"- Balance Left: £{balance_left:,.2f}")
-                                    savings_rate = (net_savings/total_income*100) if total_income > 0 else 0
-                                    st.write(f"- Savings Rate: {savings_rate:.1f}%")
-                                    
-                                    st.write("**Pot Transfer Summary:**")
-                                    st.write(f"- Pot Money In: £{pot_in:,.2f}")
-                                    st.write(f"- Pot Money Out: £{pot_out:,.2f}")
-                                    st.write(f"- Net Pot Movement: £{pot_in - pot_out:,.2f}")
-                                
-                                with col2:
-                                    st.write("**Top Spending Categories:**")
-                                    if not expense_df.empty:
-                                        category_summary = expense_df.groupby('Category')['Amount'].sum().abs().sort_values(ascending=False)
-                                        for cat, amount in category_summary.head(3).items():
-                                            st.write(f"- {cat}: £{abs(amount):,.2f}")
-                                
-                                # Basic recommendations
-                                st.subheader("💡 Quick Recommendations")
-                                if net_savings < 0:
-                                    st.warning("⚠️ You're spending more than you earn. Consider reviewing expenses.")
-                                elif net_savings < total_income * 0.1:  # Less than 10% savings
-                                    st.info("💰 Try to increase savings to at least 10% of income.")
-                                else:
-                                    st.success("✅ Good savings rate! Keep tracking expenses.")
-                                    
-                                # Pot transfer insights
-                                if pot_in > 0 or pot_out > 0:
-                                    st.info(f"🔄 You moved £{pot_out:,.2f} out of pots and £{pot_in:,.2f} into pots. Net pot movement: £{pot_in - pot_out:,.2f}")
-                            else:
-                                st.markdown(analysis)
-                                
-                                # Show analysis confidence
-                                st.info("🤖 Analysis powered by Ollama Llama2")
-                            
-                            # Download analysis
-                            analysis_bytes = analysis.encode('utf-8')
-                            st.download_button(
-                                label="📥 Download Analysis",
-                                data=analysis_bytes,
-                                file_name=f"financial_analysis_{selected_bank}_{datetime.datetime.now().strftime('%Y%m%d')}.txt",
-                                mime="text/plain"
-                            )
+                    # Grow the saved ledger with just the rows it hasn't seen
+                    if st.button("📚 Add new transactions to my saved ledger", key="ledger_append"):
+                        ledger, ledger_report = ingest_into_ledger(df, selected_bank)
+                        if ledger_report['status'] == 'appended':
+                            st.success(f"✅ {ledger_report['message']} Ledger now holds {len(ledger)} transactions.")
+                        elif ledger_report['status'] == 'up_to_date':
+                            st.info(f"ℹ️ {ledger_report['message']}")
+                        else:
+                            st.error(f"❌ {ledger_report['message']}")
                     
-                    # Export processed data
-                    st.subheader("💾 Export Processed Data")
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="📊 Download CSV",
-                        data=csv,
-                        file_name=f"processed_{selected_bank}_statement.csv",
-                        mime="text/csv"
-                    )
+                    display_statement_analysis(df, selected_bank)
                     
                 else:
                     st.error(f"❌ Failed to parse {selected_bank} statement.")
@@ -3646,8 +3267,7 @@ def main():
                         
                         **Supported File Types:**
                         - CSV (.csv)
-                        - Excel (.xlsx, .xls)
-                        - PDF (limited support)
+                        - PDF (Monzo)
                         
                         **Common Column Name Variations:**
                         - Date: 'date', 'transaction date', 'posted date'
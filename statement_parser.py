@@ -0,0 +1,1938 @@
+"""Bank statement parsing, categorization and the transaction ledger.
+
+Everything the statement pages of generator.py need that does not touch
+Streamlit lives here: the per-bank parsers and PDF text backends, the
+categorization rules and model, the on-disk caches, batch ingestion and the
+ledger. Scripts, benchmarks and the worker processes of the parsing pools
+import this module instead of generator.py, so they never run the app's page
+setup.
+"""
+
+import bisect
+import collections
+import contextlib
+import contextvars
+import csv
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import subprocess
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Every parser feeds its raw columns through normalize_transactions so all banks
+# come out with the same columns and dtypes. The work is columnar: dates are
+# parsed with an explicit format, amounts with one regex pass, and each
+# distinct description is categorized once.
+TRANSACTION_COLUMNS = ['Date', 'Description', 'Amount', 'Balance', 'Bank', 'Transaction Type', 'Category']
+STATEMENT_DATE_FORMAT = '%d/%m/%Y'
+
+def _find_column(df, candidates):
+    """Return the first column of df matching one of the candidate names (case-insensitive)."""
+    columns = {str(col).lower().strip(): col for col in df.columns}
+    for candidate in candidates:
+        if candidate.lower() in columns:
+            return columns[candidate.lower()]
+    return None
+
+def parse_currency_series(values):
+    """Vectorized parse of money strings like '£1,234.56', '(12.50)', '12.50 DR' or '40.00CR' to floats.
+    
+    Parentheses and a DR suffix mean a negative amount; a CR suffix is positive.
+    Anything that still isn't a number becomes NaN.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    
+    text = values.astype('string').str.strip()
+    upper = text.str.upper()
+    is_negative = (text.str.startswith('(') & text.str.endswith(')')) | upper.str.endswith('DR')
+    
+    cleaned = upper.str.replace(r'[£$€,\s()]|CR$|DR$', '', regex=True)
+    amounts = pd.to_numeric(cleaned, errors='coerce').astype(float)
+    return amounts.where(~is_negative.fillna(False), -amounts.abs())
+
+def parse_date_series(values, date_format=STATEMENT_DATE_FORMAT):
+    """Vectorized date parse with an explicit format, falling back to day-first inference for stragglers."""
+    dates = pd.to_datetime(values, format=date_format, errors='coerce')
+    
+    unparsed = dates.isna() & values.notna()
+    if unparsed.any():
+        dates[unparsed] = pd.to_datetime(values[unparsed], dayfirst=True, format='mixed', errors='coerce')
+    return dates
+
+def normalize_transactions(df, bank, date_col, description_col, amount_col=None,
+                           debit_col=None, credit_col=None, balance_col=None,
+                           category_col=None, date_format=STATEMENT_DATE_FORMAT):
+    """Map a bank's raw columns onto the shared TRANSACTION_COLUMNS schema.
+    
+    Args:
+        df (pd.DataFrame): Raw transactions as read from the statement
+        bank (str): Bank name for the Bank column
+        date_col, description_col (str): Source columns for Date and Description
+        amount_col (str, optional): Signed amount column. If missing, Amount is
+            built as credit_col minus debit_col.
+        balance_col (str, optional): Running balance column
+        category_col (str, optional): The bank's own category column. Anything it
+            marks as a pot becomes 'Pot Transfer' and the rest is categorized from it.
+        date_format (str): strptime format of date_col
+        
+    Returns:
+        pd.DataFrame: Transactions with exactly the TRANSACTION_COLUMNS columns
+    """
+    out = pd.DataFrame(index=df.index)
+    out['Date'] = parse_date_series(df[date_col], date_format)
+    out['Description'] = df[description_col].fillna('').astype(str).str.strip()
+    
+    if amount_col is not None:
+        out['Amount'] = parse_currency_series(df[amount_col])
+    else:
+        credit = parse_currency_series(df[credit_col]).fillna(0) if credit_col else 0.0
+        debit = parse_currency_series(df[debit_col]).abs().fillna(0) if debit_col else 0.0
+        out['Amount'] = credit - debit
+    
+    out['Balance'] = parse_currency_series(df[balance_col]) if balance_col else np.nan
+    out['Bank'] = bank
+    out['Transaction Type'] = np.where(out['Amount'] > 0, 'Income', 'Expense')
+    
+    # Saved corrections win, then the rules, then the model for rows still 'Other'.
+    # Each distinct description is categorized once and broadcast back.
+    category_source = df[category_col] if category_col else out['Description']
+    categories = lookup_category_overrides(out['Description'])
+    needs_rules = categories.isna().to_numpy()
+    if needs_rules.any():
+        rule_source = category_source[needs_rules].astype(str)
+        ruled = categorize_series_parallel(rule_source).astype(object)
+        if category_col:
+            ruled[rule_source.str.contains('pot', case=False, na=False)] = 'Pot Transfer'
+        categories[needs_rules] = apply_category_model(out['Description'][needs_rules], ruled).to_numpy()
+    out['Category'] = categories
+    
+    return out[TRANSACTION_COLUMNS].reset_index(drop=True)
+
+# CSV exports are read in chunks straight from the binary buffer (pandas decodes
+# incrementally), with every column read as text so all chunks get the same
+# dtypes. Each chunk is normalized and categorized before it is handed on, so
+# multi-year exports never need the whole file in memory at once.
+STATEMENT_CSV_CHUNKSIZE = 50000
+
+def _normalize_monzo_csv_chunk(df):
+    """Standardize one chunk of a Monzo CSV export. Returns None if required columns are missing."""
+    # Be flexible with column names - Monzo exports have changed over time
+    date_col = _find_column(df, ['date', 'transaction date', 'posted date'])
+    desc_col = _find_column(df, ['description', 'details', 'transaction description', 'memo', 'notes'])
+    amount_col = _find_column(df, ['amount', 'value', 'debit', 'credit', 'transaction amount'])
+    category_col = _find_column(df, ['category', 'type', 'transaction type'])
+    
+    if not (date_col and desc_col and amount_col):
+        print(f"Could not find required columns. Date: {date_col}, Description: {desc_col}, Amount: {amount_col}")
+        return None
+    
+    # Use Monzo's own categories when the export has them
+    return normalize_transactions(df, 'Monzo', date_col, desc_col, amount_col=amount_col,
+                                  balance_col=_find_column(df, ['balance']),
+                                  category_col=category_col)
+
+def _normalize_lloyds_chunk(df):
+    """Standardize one chunk of a Lloyds CSV export. Returns None if it isn't a Lloyds layout."""
+    date_col = _find_column(df, ['Transaction Date', 'Date'])
+    desc_col = _find_column(df, ['Description', 'Transaction Description', 'Transaction Details'])
+    amount_col = _find_column(df, ['Amount'])
+    debit_col = _find_column(df, ['Debit Amount'])
+    credit_col = _find_column(df, ['Credit Amount'])
+    if not (date_col and desc_col and (amount_col or debit_col or credit_col)):
+        return None
+    
+    # Lloyds splits money out and money in into Debit/Credit columns
+    return normalize_transactions(df, 'Lloyds', date_col, desc_col, amount_col=amount_col,
+                                  debit_col=debit_col, credit_col=credit_col,
+                                  balance_col=_find_column(df, ['Balance']))
+
+def _normalize_barclays_chunk(df):
+    """Standardize one chunk of a Barclays CSV export. Returns None if it isn't a Barclays layout."""
+    date_col = _find_column(df, ['Transaction Date', 'Date'])
+    desc_col = _find_column(df, ['Description', 'Transaction Description', 'Memo'])
+    amount_col = _find_column(df, ['Amount'])
+    if not (date_col and desc_col and amount_col):
+        return None
+    
+    return normalize_transactions(df, 'Barclays', date_col, desc_col, amount_col=amount_col,
+                                  balance_col=_find_column(df, ['Balance']))
+
+CSV_CHUNK_NORMALIZERS = {
+    'Monzo': _normalize_monzo_csv_chunk,
+    'Lloyds': _normalize_lloyds_chunk,
+    'Barclays': _normalize_barclays_chunk
+}
+
+def iter_csv_statement_chunks(source, bank, chunksize=None):
+    """Stream a CSV bank export as normalized, categorized DataFrame chunks.
+    
+    Args:
+        source: CSV bytes, a file path or a binary file object
+        bank (str): Which bank's layout to normalize ('Monzo', 'Lloyds' or 'Barclays')
+        chunksize (int, optional): Rows per chunk. Defaults to STATEMENT_CSV_CHUNKSIZE.
+    
+    Yields:
+        pd.DataFrame: One normalized chunk at a time
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    normalize = CSV_CHUNK_NORMALIZERS[bank]
+    
+    reader = pd.read_csv(
+        source,
+        chunksize=chunksize or STATEMENT_CSV_CHUNKSIZE,
+        dtype=str,
+        encoding='utf-8'
+    )
+    with reader:
+        for chunk_num, chunk in enumerate(reader):
+            if chunk_num == 0:
+                print(f"{bank} statement columns found: {list(chunk.columns)}")
+            
+            normalized = normalize(chunk)
+            if normalized is None:
+                raise ValueError(f"Not a {bank} CSV layout")
+            yield normalized
+
+def _read_csv_statement(file_content, bank):
+    """Read a whole CSV statement through iter_csv_statement_chunks."""
+    chunks = list(iter_csv_statement_chunks(file_content, bank))
+    if not chunks:
+        return None
+    return pd.concat(chunks, ignore_index=True)
+
+def parse_monzo_statement(file_content):
+    """Parse Monzo bank statement from CSV or PDF"""
+    try:
+        # First try to detect if it's a PDF
+        if file_content.startswith(b'%PDF'):
+            return parse_monzo_pdf_statement(file_content)
+        
+        # Try to parse as CSV
+        return _read_csv_statement(file_content, 'Monzo')
+    except Exception as e:
+        print(f"Error parsing Monzo statement: {str(e)}")
+        return None
+
+def extract_monzo_balance_summary(text):
+    """Extract balance summary information from Monzo PDF header"""
+    balance_info = {}
+    
+    try:
+        # Extract Total balance (Including all Pots and Cashback)
+        total_balance_match = re.search(r'Total balance\(Including all Pots and Cashback\)£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
+        if total_balance_match:
+            balance_info['total_balance_including_pots'] = float(total_balance_match.group(1).replace(',', ''))
+        
+        # Extract Personal Account balance (Excluding all Pots)
+        personal_balance_match = re.search(r'Personal Account balance\(Excluding all Pots\)£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
+        if personal_balance_match:
+            balance_info['personal_account_balance'] = float(personal_balance_match.group(1).replace(',', ''))
+        
+        # Extract Balance in Pots
+        pots_balance_match = re.search(r'Balance in Pots\(This includes both Regular Pots with Monzo and SavingsPots with external providers\)£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
+        if pots_balance_match:
+            balance_info['balance_in_pots'] = float(pots_balance_match.group(1).replace(',', ''))
+        
+        # Extract Cashback Balance
+        cashback_balance_match = re.search(r'Cashback Balance-£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
+        if cashback_balance_match:
+            balance_info['cashback_balance'] = float(cashback_balance_match.group(1).replace(',', ''))
+        
+        # Extract Total outgoings
+        outgoings_match = re.search(r'Total outgoings\+£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
+        if outgoings_match:
+            balance_info['total_outgoings'] = float(outgoings_match.group(1).replace(',', ''))
+        
+        # Extract Total deposits
+        deposits_match = re.search(r'Total deposits£(\d{1,3}(?:,\d{3})*\.\d{2})', text)
+        if deposits_match:
+            balance_info['total_deposits'] = float(deposits_match.group(1).replace(',', ''))
+            
+    except Exception as e:
+        print(f"Error extracting balance summary: {str(e)}")
+    
+    return balance_info
+
+# Page text extraction is pure-Python work for most backends, so long
+# statements are split into page ranges and extracted in separate processes.
+# None means one worker per CPU core.
+PDF_EXTRACTION_WORKERS = None
+# Below this many pages the pool start-up costs more than it saves
+PDF_PARALLEL_MIN_PAGES = 8
+# Set in pool workers by _init_pdf_worker
+_pdf_worker_state = None
+
+# Text extraction backends. Each one takes PDF bytes or a file path plus an
+# optional page range and yields one string per page, so they can be swapped
+# per call (see benchmark_pdf_backends.py for how they compare).
+PDF_TEXT_BACKEND = 'pypdf2'
+PDF_TEXT_BACKEND_PACKAGES = {
+    'pypdf2': 'pip install PyPDF2',
+    'pypdf': 'pip install pypdf',
+    'pdfminer': 'pip install pdfminer.six',
+    'pdftotext': 'install poppler-utils (the pdftotext binary)',
+}
+
+def _pypdf2_page_texts(source, page_numbers=None):
+    """Yield page texts with PyPDF2."""
+    import PyPDF2
+    
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    pdf_reader = PyPDF2.PdfReader(source)
+    for i in (page_numbers if page_numbers is not None else range(len(pdf_reader.pages))):
+        yield pdf_reader.pages[i].extract_text() or ""
+
+def _pypdf_page_texts(source, page_numbers=None):
+    """Yield page texts with pypdf, the maintained successor to PyPDF2."""
+    import pypdf
+    
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    pdf_reader = pypdf.PdfReader(source)
+    for i in (page_numbers if page_numbers is not None else range(len(pdf_reader.pages))):
+        yield pdf_reader.pages[i].extract_text() or ""
+
+def _pdfminer_page_texts(source, page_numbers=None):
+    """Yield page texts with pdfminer.six, one line per row of positioned text.
+    
+    pdfminer's own extract_text groups text into column blocks, which splits
+    a transaction's fields apart, so rows are rebuilt from the layout instead.
+    """
+    for fragments in _iter_pdf_layout_pages(source, page_numbers):
+        yield "\n".join(" ".join(text for _, _, text in line['fragments'])
+                        for line in _group_layout_lines(fragments))
+
+def _pdftotext_page_texts(source, page_numbers=None):
+    """Yield page texts from poppler's pdftotext binary in -layout mode."""
+    page_args = []
+    if page_numbers is not None:
+        page_numbers = list(page_numbers)
+        if not page_numbers:
+            return
+        page_args = ['-f', str(min(page_numbers) + 1), '-l', str(max(page_numbers) + 1)]
+    
+    temp_path = None
+    if isinstance(source, (bytes, bytearray)):
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+            f.write(source)
+            temp_path = source = f.name
+    try:
+        result = subprocess.run(['pdftotext', '-layout', '-enc', 'UTF-8', *page_args, str(source), '-'],
+                                capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("pdftotext not found. Install poppler-utils to use the pdftotext backend")
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+    
+    # Pages are separated by form feeds, with one after the last page too
+    pages = result.stdout.decode('utf-8', errors='replace').split('\f')
+    if pages and not pages[-1].strip():
+        pages.pop()
+    yield from pages
+
+PDF_TEXT_BACKENDS = {
+    'pypdf2': _pypdf2_page_texts,
+    'pypdf': _pypdf_page_texts,
+    'pdfminer': _pdfminer_page_texts,
+    'pdftotext': _pdftotext_page_texts,
+}
+
+# Page counters, one per backend, so sharding a PDF across workers only needs
+# the package (or binary) the chosen backend already uses.
+def _pypdf2_page_count(source):
+    """Page count with PyPDF2."""
+    import PyPDF2
+    return len(PyPDF2.PdfReader(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source).pages)
+
+def _pypdf_page_count(source):
+    """Page count with pypdf."""
+    import pypdf
+    return len(pypdf.PdfReader(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source).pages)
+
+def _pdfminer_page_count(source):
+    """Page count from pdfminer.six's page tree, without laying the pages out."""
+    from pdfminer.pdfpage import PDFPage
+    
+    if isinstance(source, (bytes, bytearray)):
+        return sum(1 for _ in PDFPage.get_pages(io.BytesIO(source)))
+    with open(source, 'rb') as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+def _pdftotext_page_count(source):
+    """Page count from poppler's pdfinfo, which ships alongside pdftotext."""
+    temp_path = None
+    if isinstance(source, (bytes, bytearray)):
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+            f.write(source)
+            temp_path = source = f.name
+    try:
+        result = subprocess.run(['pdfinfo', str(source)], capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("pdfinfo not found. Install poppler-utils to use the pdftotext backend")
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+    
+    match = re.search(rb'^Pages:\s*(\d+)', result.stdout, re.MULTILINE)
+    if match is None:
+        raise RuntimeError("pdfinfo did not report a page count")
+    return int(match.group(1))
+
+PDF_PAGE_COUNTERS = {
+    'pypdf2': _pypdf2_page_count,
+    'pypdf': _pypdf_page_count,
+    'pdfminer': _pdfminer_page_count,
+    'pdftotext': _pdftotext_page_count,
+}
+
+def _iter_pdf_layout_pages(source, page_numbers=None):
+    """Yield each page as a list of positioned text fragments using pdfminer.six.
+    
+    pdfminer's layout analysis splits text into horizontal lines wherever the
+    gap between characters is wide, so each table cell comes out as its own
+    fragment. Fragments are (x0, x1, top, bottom, text) tuples in PDF points.
+    """
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer, LTTextLine
+    
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    
+    for page_layout in extract_pages(source, page_numbers=page_numbers):
+        fragments = []
+        for element in page_layout:
+            if not isinstance(element, LTTextContainer):
+                continue
+            for line in element:
+                if isinstance(line, LTTextLine):
+                    text = line.get_text().strip()
+                    if text:
+                        fragments.append((line.x0, line.x1, line.y1, line.y0, text))
+        yield fragments
+
+def _pdf_page_iterator(layout=False, backend=None):
+    """Pick the page iterator for a layout/backend choice."""
+    if layout:
+        return _iter_pdf_layout_pages
+    backend = backend or PDF_TEXT_BACKEND
+    if backend not in PDF_TEXT_BACKENDS:
+        raise ValueError(f"Unknown PDF text backend '{backend}'. Choose from: {', '.join(PDF_TEXT_BACKENDS)}")
+    return PDF_TEXT_BACKENDS[backend]
+
+def count_pdf_pages(source, layout=False, backend=None):
+    """Count a PDF's pages with the same package the layout/backend choice extracts with."""
+    if hasattr(source, 'read'):
+        source = source.read()
+    if isinstance(source, Path):
+        source = str(source)
+    _pdf_page_iterator(layout, backend)  # Rejects unknown backends
+    return PDF_PAGE_COUNTERS['pdfminer' if layout else backend or PDF_TEXT_BACKEND](source)
+
+def _init_pdf_worker(source, layout=False, backend=None):
+    """Keep the parent's PDF (bytes or path) and page iterator in an extraction worker."""
+    global _pdf_worker_state
+    _pdf_worker_state = (source, _pdf_page_iterator(layout, backend))
+
+def _extract_pdf_page_range(start, stop):
+    """Re-open the worker's PDF and extract pages [start, stop)."""
+    source, iter_pages = _pdf_worker_state
+    return list(iter_pages(source, range(start, stop)))
+
+def iter_pdf_page_texts(source, workers=None, min_pages=PDF_PARALLEL_MIN_PAGES, layout=False, backend=None):
+    """Yield the text of each PDF page in order.
+    
+    Statements with at least `min_pages` pages are sharded into page ranges that
+    are extracted concurrently in a ProcessPoolExecutor. Each worker gets the
+    PDF once, through the pool initializer, and re-opens it for every range it
+    is handed. Smaller files (or workers=1) are extracted serially.
+    
+    Args:
+        source: PDF bytes, a file path or a binary file object
+        workers (int, optional): Worker processes to use. Defaults to
+            PDF_EXTRACTION_WORKERS, or the CPU count if that is None.
+        min_pages (int): Page count below which extraction stays serial.
+        layout (bool): Yield each page as a list of positioned text fragments
+            from _iter_pdf_layout_pages instead of plain text.
+        backend (str, optional): Key of PDF_TEXT_BACKENDS to extract text with.
+            Defaults to PDF_TEXT_BACKEND.
+    """
+    iter_pages = _pdf_page_iterator(layout, backend)
+    if hasattr(source, 'read'):
+        source = source.read()
+    if isinstance(source, Path):
+        source = str(source)
+    
+    if workers is None:
+        workers = PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+    if workers <= 1:
+        # Serial extraction never needs the page count, so the PDF is only opened once
+        yield from iter_pages(source)
+        return
+    
+    page_count = count_pdf_pages(source, layout, backend)
+    workers = min(workers, page_count)
+    if workers <= 1 or page_count < min_pages:
+        yield from iter_pages(source)
+        return
+    
+    # A couple of shards per worker keeps the pool busy when pages vary in size
+    shard_size = max(1, -(-page_count // (workers * 2)))
+    starts = list(range(0, page_count, shard_size))
+    stops = [min(start + shard_size, page_count) for start in starts]
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker,
+                             initargs=(source, layout, backend)) as executor:
+        # map() hands shards back in page order as they finish
+        for page_texts in executor.map(_extract_pdf_page_range, starts, stops):
+            yield from page_texts
+
+# Monzo PDF statements come out of PyPDF2 as one long run of
+# "DD/MM/YYYYDescriptionAmountBalance" records (sometimes with line breaks
+# between the fields), so we tokenize on the date and parse whatever follows
+# it up to the next date.
+MONZO_DATE_PATTERN = re.compile(r'(\d{2}/\d{2}/\d{4})')
+MONZO_TRANSACTION_PATTERN = re.compile(r'([A-Za-z0-9\s\.\-\(\)\/]+?)(-?\d+\.\d{2})\s*(-?\d+\.\d{2})')
+MONZO_AMOUNT_PATTERN = re.compile(r'(-?\d+\.\d{2})')
+MONZO_SKIP_KEYWORDS = (
+    'balance', 'total', 'account', 'statement', 'anthony', 'kinyua', 'gathukia',
+    'flat', 'room', 'house', 'court', 'road', 'nottingham', 'ng7', 'united', 'kingdom'
+)
+
+def _parse_monzo_segment(date_str, content):
+    """Turn one date-delimited chunk of Monzo PDF text into a transaction dict (or None)."""
+    match = MONZO_TRANSACTION_PATTERN.match(content)
+    if match:
+        description, amount_str, balance_str = match.groups()
+        balance = float(balance_str)
+    else:
+        # Description has characters the strict pattern doesn't allow, so take
+        # the text up to the first amount and the next amount as the balance
+        amount_matches = MONZO_AMOUNT_PATTERN.findall(content)
+        if len(amount_matches) < 2:
+            return None
+        amount_str, balance_str = amount_matches[:2]
+        description = content[:content.find(amount_str)]
+        balance = float(balance_str)
+
+    return _monzo_transaction_record(date_str, description, float(amount_str), balance)
+
+def _monzo_transaction_record(date_str, description, amount, balance):
+    """Build a raw Monzo transaction dict, or None for header/address noise."""
+    description = description.strip()
+    desc_lower = description.lower()
+
+    # Skip obvious invalid transactions but keep pot transfers
+    if (len(description) < 2 or
+        description.isdigit() or
+        any(keyword in desc_lower for keyword in MONZO_SKIP_KEYWORDS)):
+        return None
+
+    # Only consider reasonable transaction amounts
+    if abs(amount) < 0.01 or abs(amount) > 10000:
+        return None
+
+    return {
+        'Date': date_str,
+        'Description': description,
+        'Amount': amount,
+        'Balance': balance
+    }
+
+# Layout mode reads the same statement from pdfminer's positioned text
+# instead: fragments are grouped into lines by y and into Date/Description/
+# Amount/Balance columns by x, taken from the table header. Each line is
+# looked at once, so there is no regex backtracking over long pages.
+# Needs pdfminer.six; set MONZO_PDF_LAYOUT = True to make it the default.
+MONZO_PDF_LAYOUT = False
+MONZO_LAYOUT_HEADERS = {'date': 'Date', 'description': 'Description', 'amount': 'Amount', 'balance': 'Balance'}
+MONZO_LAYOUT_AMOUNT_PATTERN = re.compile(r'[+-]?£?[+-]?[\d,]+\.\d{2}')
+
+def _group_layout_lines(fragments):
+    """Group positioned fragments into lines, top to bottom and left to right."""
+    lines = []
+    for x0, x1, top, bottom, text in sorted(fragments, key=lambda f: (-f[2], f[0])):
+        middle = (top + bottom) / 2
+        if lines and lines[-1]['bottom'] <= middle <= lines[-1]['top']:
+            lines[-1]['fragments'].append((x0, x1, text))
+        else:
+            lines.append({'top': top, 'bottom': bottom, 'fragments': [(x0, x1, text)]})
+    for line in lines:
+        line['fragments'].sort()
+    return lines
+
+def _layout_header_columns(line):
+    """Return (column centres, column names) if the line is the transaction table header."""
+    columns = {}
+    for x0, x1, text in line['fragments']:
+        text_lower = text.lower()
+        for column, label in MONZO_LAYOUT_HEADERS.items():
+            if column in text_lower and label not in columns:
+                columns[label] = (x0 + x1) / 2
+    if len(columns) < len(MONZO_LAYOUT_HEADERS):
+        return None
+    ordered = sorted(columns.items(), key=lambda item: item[1])
+    return [centre for _, centre in ordered], [label for label, _ in ordered]
+
+def _parse_layout_amount(text):
+    """Parse a '£1,234.56' / '-12.00' style cell, or None if it isn't an amount."""
+    text = text.replace(' ', '')
+    if not MONZO_LAYOUT_AMOUNT_PATTERN.fullmatch(text):
+        return None
+    value = float(text.replace('£', '').replace(',', '').lstrip('+-'))
+    return -value if text.count('-') == 1 else value
+
+def iter_monzo_layout_transactions(source, balance_info=None, workers=None):
+    """Stream transactions out of a Monzo PDF statement by text position.
+    
+    Columns come from the x positions of the Date/Description/Amount/Balance
+    table header and every fragment is put in the column whose centre is
+    nearest. A line with an amount starts a new transaction (reusing the last
+    date when the statement only prints it once per day), and a line holding
+    only description text directly beneath extends the one above it.
+    
+    Args:
+        source: PDF bytes, a file path or a binary file object
+        balance_info (dict, optional): Filled in with the balance summary from the
+            statement header as it is found.
+        workers (int, optional): Worker processes for page extraction, see
+            iter_pdf_page_texts.
+    
+    Yields:
+        dict: One raw transaction record (Date, Description, Amount, Balance),
+            ready for normalize_transactions
+    """
+    centres = labels = boundaries = None
+    current = None
+    last_date = None
+    
+    for fragments in iter_pdf_page_texts(source, workers=workers, layout=True):
+        lines = _group_layout_lines(fragments)
+        
+        if balance_info is not None:
+            page_text = "\n".join("".join(text for _, _, text in line['fragments']) for line in lines)
+            for key, value in extract_monzo_balance_summary(page_text).items():
+                balance_info.setdefault(key, value)
+        
+        previous_line = None
+        for line in lines:
+            header = _layout_header_columns(line)
+            if header:
+                centres, labels = header
+                boundaries = [(a + b) / 2 for a, b in zip(centres, centres[1:])]
+                previous_line = None
+                continue
+            if centres is None:
+                continue
+            
+            cells = {}
+            for x0, x1, text in line['fragments']:
+                label = labels[bisect.bisect(boundaries, (x0 + x1) / 2)]
+                cells[label] = f"{cells[label]} {text}" if label in cells else text
+            
+            amount = _parse_layout_amount(cells.get('Amount', ''))
+            date_text = cells.get('Date', '')
+            if MONZO_DATE_PATTERN.fullmatch(date_text):
+                last_date = date_text
+            
+            if amount is not None and last_date:
+                if current:
+                    record = _monzo_transaction_record(**current)
+                    if record:
+                        yield record
+                current = {
+                    'date_str': last_date,
+                    'description': cells.get('Description', ''),
+                    'amount': amount,
+                    'balance': _parse_layout_amount(cells.get('Balance', '')),
+                }
+            elif (current and previous_line is not None and set(cells) == {'Description'} and
+                  previous_line['bottom'] - line['top'] < previous_line['top'] - previous_line['bottom']):
+                # Wrapped description sitting directly under its transaction
+                current['description'] += f" {cells['Description']}"
+            elif current:
+                record = _monzo_transaction_record(**current)
+                if record:
+                    yield record
+                current = None
+            previous_line = line
+    
+    if current:
+        record = _monzo_transaction_record(**current)
+        if record:
+            yield record
+
+def iter_monzo_transactions(source, balance_info=None, workers=None, backend=None):
+    """Stream transactions out of a Monzo PDF statement one page at a time.
+    
+    Each page is tokenized on the transaction dates as soon as it is extracted,
+    so the whole statement is never held as one string and the text is only
+    scanned once. A transaction that runs over a page break is carried into
+    the next page before it is parsed.
+    
+    Args:
+        source: PDF bytes, a file path or a binary file object
+        balance_info (dict, optional): Filled in with the balance summary from the
+            statement header as it is found.
+        workers (int, optional): Worker processes for page extraction, see
+            iter_pdf_page_texts.
+        backend (str, optional): PDF_TEXT_BACKENDS key to extract the text with.
+    
+    Yields:
+        dict: One raw transaction record (Date, Description, Amount, Balance) per
+            match, ready for normalize_transactions
+    """
+    pending = ""
+    for page_text in iter_pdf_page_texts(source, workers=workers, backend=backend):
+        text = pending + page_text + "\n"
+        
+        if balance_info is not None:
+            for key, value in extract_monzo_balance_summary(text).items():
+                balance_info.setdefault(key, value)
+        
+        previous = None
+        for date_match in MONZO_DATE_PATTERN.finditer(text):
+            if previous is not None:
+                try:
+                    transaction = _parse_monzo_segment(previous.group(1), text[previous.end():date_match.start()])
+                except ValueError as e:
+                    print(f"Error parsing transaction at {previous.group(1)}, Error: {e}")
+                    transaction = None
+                if transaction:
+                    yield transaction
+            previous = date_match
+        
+        # The last record on the page may continue on the next one. A pending
+        # record starts with its date, so a page without any dates of its own
+        # still lands here and is carried along whole.
+        if previous is not None:
+            pending = text[previous.start():]
+    
+    if pending:
+        date_match = MONZO_DATE_PATTERN.match(pending)
+        if date_match:
+            try:
+                transaction = _parse_monzo_segment(date_match.group(1), pending[date_match.end():])
+            except ValueError as e:
+                print(f"Error parsing transaction at {date_match.group(1)}, Error: {e}")
+                transaction = None
+            if transaction:
+                yield transaction
+
+def parse_monzo_pdf_statement(file_content, workers=None, layout=None, backend=None):
+    """Parse Monzo PDF statement into a DataFrame using iter_monzo_transactions
+    (text from `backend`, default PDF_TEXT_BACKEND), or iter_monzo_layout_transactions
+    when layout (default MONZO_PDF_LAYOUT) is set"""
+    try:
+        balance_info = {}
+        if layout is None:
+            layout = MONZO_PDF_LAYOUT
+        if layout:
+            transactions = list(iter_monzo_layout_transactions(file_content, balance_info, workers=workers))
+        else:
+            transactions = list(iter_monzo_transactions(file_content, balance_info, workers=workers,
+                                                        backend=backend))
+        
+        if transactions:
+            df = normalize_transactions(pd.DataFrame(transactions), 'Monzo', 'Date', 'Description',
+                                        amount_col='Amount', balance_col='Balance')
+            print(f"Successfully parsed {len(transactions)} transactions from PDF")
+            print(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
+            
+            # Add balance summary information to the dataframe
+            if balance_info:
+                for key, value in balance_info.items():
+                    df.attrs[key] = value
+            
+            return df
+        else:
+            print("No transactions found in PDF")
+            return None
+            
+    except ImportError as e:
+        package = e.name or 'PyPDF2'
+        install = PDF_TEXT_BACKEND_PACKAGES.get(package.split('.')[0].lower(), 'pip install PyPDF2')
+        print(f"{package.split('.')[0]} not installed. Install with: {install}")
+        return None
+    except Exception as e:
+        print(f"Error parsing Monzo PDF: {str(e)}")
+        return None
+
+def parse_lloyds_statement(file_content):
+    """Parse Lloyds bank statement"""
+    try:
+        return _read_csv_statement(file_content, 'Lloyds')
+    except Exception as e:
+        print(f"Error parsing Lloyds statement: {str(e)}")
+        return None
+
+def parse_barclays_statement(file_content):
+    """Parse Barclays bank statement"""
+    try:
+        return _read_csv_statement(file_content, 'Barclays')
+    except Exception as e:
+        print(f"Error parsing Barclays statement: {str(e)}")
+        return None
+
+# Categorization rules in priority order: the first rule with a keyword found
+# anywhere in the lowercased description wins, so Pot Transfer has to stay
+# ahead of P2P payments, which stay ahead of Income and the general categories.
+# The live rules come from categorization_rules.json (see load_category_rules);
+# this built-in table is the fallback when that file is missing.
+CATEGORY_RULES = [
+    ('Pot Transfer', [
+        'transfer from pot', 'transfer to pot', 'pot transfer', 'pot to pot', 'between pots',
+        'move to pot', 'pot withdrawal', 'monzo pot', 'pot deposit',
+        'savings pot', 'bills pot', 'expenses pot', 'shared pot', 'monzo plus pot'
+    ]),
+    ('Transfers & Payments', ['p2p payment', 'payment to', 'paid to']),
+    ('Income', ['salary', 'wages', 'pay', 'income']),
+    ('Refund', ['refund', 'return', 'cashback']),
+    ('Housing', ['rent', 'mortgage', 'property', 'council tax']),
+    ('Utilities', ['electric', 'gas', 'water', 'bill', 'utility', 'broadband', 'internet']),
+    ('Groceries', ['tesco', 'sainsbury', 'asda', 'morrisons', 'grocery', 'food', 'supermarket']),
+    ('Dining Out', ['restaurant', 'cafe', 'coffee', 'dining', 'eat', 'takeaway', 'deliveroo', 'just eat']),
+    ('Alcohol & Social', ['pub', 'bar', 'wine', 'beer']),
+    ('Transportation', ['uber', 'taxi', 'bus', 'train', 'tube', 'transport', 'tfl', 'national rail']),
+    ('Car Expenses', ['petrol', 'gas', 'fuel', 'parking']),
+    ('Shopping', ['amazon', 'ebay', 'shop', 'store', 'purchase', 'retail']),
+    ('Clothing', ['clothing', 'fashion', 'h&m', 'zara', 'primark']),
+    ('Health & Pharmacy', ['pharmacy', 'boots', 'superdrug', 'medicine']),
+    ('Subscriptions', ['netflix', 'spotify', 'subscription', 'prime', 'disney+']),
+    ('Entertainment', ['cinema', 'movie', 'entertainment', 'theatre', 'concert']),
+    ('Health & Fitness', ['gym', 'fitness', 'health', 'exercise']),
+    # Pot transfers are already caught by the first rule
+    ('Banking & Fees', ['bank', 'interest', 'fee', 'charge', 'payment']),
+    ('Personal Care', ['hair', 'beauty', 'salon', 'barber']),
+    ('Technology', ['apple', 'google', 'microsoft', 'app', 'software']),
+    ('Travel', ['hotel', 'flight', 'holiday', 'travel', 'airbnb', 'booking']),
+    ('Education', ['course', 'education', 'book', 'university']),
+    ('Charity & Donations', ['charity', 'donation', 'fund']),
+]
+DEFAULT_CATEGORY = 'Other'
+
+def compile_category_rules(rules):
+    """Compile a rule table into one regex that returns the first matching rule.
+    
+    Each rule becomes a named lookahead `(?=.*?(?P<ruleN>kw1|kw2|...|regex))` and
+    the rules are joined as alternatives in priority order. The regex engine
+    tries them left to right and stops at the first that matches, so
+    match.lastgroup names the rule that fired.
+    
+    Args:
+        rules (list): (category, keywords, regex or None) tuples in priority order
+    
+    Returns:
+        tuple: (compiled pattern, list of category names by rule number)
+    """
+    alternatives = []
+    categories = []
+    for category, pattern in _category_rule_patterns(rules):
+        alternatives.append(f'(?=.*?(?P<rule{len(categories)}>{pattern}))')
+        categories.append(category)
+    return re.compile('|'.join(alternatives) or '(?!)', re.DOTALL | re.IGNORECASE), categories
+
+def _category_rule_patterns(rules):
+    """(category, regex source) for each rule that has something to match on."""
+    patterns = []
+    for category, keywords, regex in rules:
+        options = [re.escape(keyword) for keyword in keywords]
+        if regex:
+            options.append(f'(?:{regex})')
+        if options:
+            patterns.append((category, '|'.join(options)))
+    return patterns
+
+def compile_rule_matchers(rules):
+    """One compiled regex per rule, in priority order, for instrumented runs."""
+    return [re.compile(pattern, re.DOTALL | re.IGNORECASE) for _, pattern in _category_rule_patterns(rules)]
+
+CATEGORY_MATCHER, CATEGORY_MATCHER_LABELS = compile_category_rules(
+    [(category, keywords, None) for category, keywords in CATEGORY_RULES])
+CATEGORY_RULE_MATCHERS = compile_rule_matchers([(category, keywords, None) for category, keywords in CATEGORY_RULES])
+# Every category a description can get, in rule order, for Categorical output
+CATEGORY_LABELS = list(dict.fromkeys(CATEGORY_MATCHER_LABELS + [DEFAULT_CATEGORY, 'Pot Transfer']))
+
+# Bank descriptions repeat the same merchant with different card numbers,
+# store numbers, dates and references ("TESCO STORES 2231 ON 03 JAN"), so
+# they are reduced to a merchant key before categorizing and the result is
+# memoized per key in a bounded LRU cache.
+MONTH_NAMES = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)'
+MERCHANT_KEY_PATTERNS = [
+    # "on 03 jan", "03 jan 2025", "03jan25"
+    re.compile(r'\b(?:on\s+)?\d{1,2}\s*' + MONTH_NAMES + r'\b(?:\s*\d{2,4}\b)?'),
+    re.compile(r'\b\d{1,2}' + MONTH_NAMES + r'\d{2,4}\b'),
+    # "03/01/2025", "03-01-25", "03.01"
+    re.compile(r'\b\d{1,4}[/.-]\d{1,2}(?:[/.-]\d{2,4})?\b'),
+    # Card suffixes: "card 1234", "cd 1234", "****1234", "x1234"
+    re.compile(r'\b(?:card|crd|cd)\s*(?:no\.?\s*)?[x*]*\d{4}\b'),
+    re.compile(r'(?:[x*]{2,}|\bx)\d{4}\b'),
+    # Labelled references: "ref: ab12cd", "txn 998877", "auth 1234". Only codes
+    # with a digit go, so the word after "apple id" or "txn" stays
+    re.compile(r'\b(?:ref|reference|txn|auth|id)\b[\s:#.]*[a-z-]*\d[a-z0-9-]*'),
+    # Unlabelled reference codes that switch between digits and letters more
+    # than once ("4f8a9c2", "ab12cd34"); "p2p", "7eleven" and "24hr" stay
+    re.compile(r'\b(?=[a-z0-9-]{5,}\b)[a-z-]*\d[\d-]*[a-z][a-z-]*\d[a-z0-9-]*\b'),
+    # Store numbers glued to the merchant name: "tesco1234" -> "tesco"
+    re.compile(r'(?<=[a-z])\d{3,}\b'),
+    # Store numbers and any other bare numbers
+    re.compile(r'#?\b\d+\b'),
+]
+MERCHANT_KEY_STRIP = ' \t\r\n-*#.,:;/'
+CATEGORY_CACHE_SIZE = 4096
+
+def merchant_key(description):
+    """Normalize a bank description to a merchant key, e.g. 'TESCO STORES 2231 ON 03 JAN' -> 'tesco stores'."""
+    key = str(description).lower()
+    for pattern in MERCHANT_KEY_PATTERNS:
+        key = pattern.sub(' ', key)
+    return ' '.join(key.split()).strip(MERCHANT_KEY_STRIP)
+
+@functools.lru_cache(maxsize=CATEGORY_CACHE_SIZE)
+def categorize_merchant_key(key):
+    """Run the rule matcher on a merchant key, memoized in a bounded LRU cache."""
+    match = CATEGORY_MATCHER.match(key)
+    if match:
+        return CATEGORY_MATCHER_LABELS[int(match.lastgroup[4:])]
+    return DEFAULT_CATEGORY
+
+def category_cache_stats():
+    """Hit/miss counts and hit rate of the merchant category cache."""
+    info = categorize_merchant_key.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+# The rule file is recompiled whenever its mtime changes, so rules can be
+# edited while the app is running. CATEGORY_RULES_VERSION comes from the
+# file's version field plus a hash of its contents and is part of the
+# statement cache key, so cached statements are only re-categorized when the
+# rules really change.
+CATEGORY_RULES_PATH = Path(os.environ.get('FINANCE_CATEGORY_RULES',
+                                          Path(__file__).resolve().parent / 'categorization_rules.json'))
+CATEGORY_RULES_VERSION = "builtin"
+# (path, mtime) of the rules currently compiled into CATEGORY_MATCHER
+_category_rules_source = None
+
+def read_category_rules(path):
+    """Read and validate a categorization rule file.
+    
+    The file is JSON: {"version": 1, "rules": [{"category": ..., "priority": ...,
+    "keywords": [...], "regex": ...}, ...]}. Rules are sorted by priority (lowest
+    first, file order breaking ties) and need keywords, a regex or both.
+    
+    Returns:
+        tuple: (list of (category, keywords, regex) in priority order, version string)
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw)
+    
+    rules = []
+    for position, rule in enumerate(data['rules']):
+        category = rule.get('category')
+        keywords = [str(keyword).lower() for keyword in rule.get('keywords', [])]
+        regex = rule.get('regex')
+        if not category or not (keywords or regex):
+            raise ValueError(f"rule {position + 1} needs a category and keywords or a regex")
+        if regex:
+            re.compile(regex)
+        rules.append((float(rule.get('priority', position)), position, category, keywords, regex))
+    
+    rules.sort(key=lambda rule: rule[:2])
+    version = f"{data.get('version', 0)}-{hashlib.sha256(raw).hexdigest()[:12]}"
+    return [(category, keywords, regex) for _, _, category, keywords, regex in rules], version
+
+def load_category_rules(path=None, force=False):
+    """Recompile the categorizer from the rule file if it changed since the last load.
+    
+    Only a stat() when nothing changed, so it is cheap to call before every
+    batch. A missing file falls back to the built-in CATEGORY_RULES and an
+    invalid one keeps the current rules until the file changes again.
+    
+    Returns:
+        bool: True if new rules were compiled
+    """
+    global CATEGORY_MATCHER, CATEGORY_MATCHER_LABELS, CATEGORY_RULE_MATCHERS, CATEGORY_LABELS
+    global CATEGORY_RULES_VERSION, _category_rules_source
+    
+    path = Path(path or CATEGORY_RULES_PATH)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    source = (str(path), mtime)
+    if source == _category_rules_source and not force:
+        return False
+    
+    if mtime is None:
+        print(f"Category rule file {path} not found, using the built-in rules")
+        rules = [(category, keywords, None) for category, keywords in CATEGORY_RULES]
+        version = "builtin"
+    else:
+        try:
+            rules, version = read_category_rules(path)
+        except (OSError, KeyError, TypeError, ValueError, re.error) as e:
+            print(f"Error loading category rules from {path}: {str(e)}")
+            _category_rules_source = source
+            return False
+    
+    matcher, matcher_labels = compile_category_rules(rules)
+    # Swapped in one assignment so readers never see half-updated rules
+    CATEGORY_MATCHER, CATEGORY_MATCHER_LABELS, CATEGORY_RULE_MATCHERS, CATEGORY_LABELS = (
+        matcher, matcher_labels, compile_rule_matchers(rules),
+        list(dict.fromkeys(matcher_labels + [DEFAULT_CATEGORY, 'Pot Transfer'])))
+    CATEGORY_RULES_VERSION = version
+    _category_rules_source = source
+    categorize_merchant_key.cache_clear()
+    return True
+
+load_category_rules()
+
+def categorize_transaction(description):
+    """Categorize transactions based on description"""
+    return categorize_merchant_key(merchant_key(description))
+
+# Instrumentation: inside `with category_instrumentation() as stats:` every
+# categorize_series call also records which rule fired for how many rows, the
+# time spent testing each rule and the merchants nothing matched. It checks
+# the rules one at a time (and skips the LRU cache) to time them, so it is
+# slower than normal categorization and only meant for tuning rule order.
+# The stats live in a context variable, so Streamlit sessions (each on its own
+# thread) only ever record into their own block, and each block keeps the
+# rules it started with even if the rule file is reloaded partway through.
+_active_category_stats = contextvars.ContextVar('active_category_stats', default=None)
+
+@contextlib.contextmanager
+def category_instrumentation():
+    """Record rule hits and timings for the categorize_series calls in the block."""
+    load_category_rules()
+    matchers, matcher_labels, labels = CATEGORY_RULE_MATCHERS, CATEGORY_MATCHER_LABELS, CATEGORY_LABELS
+    stats = {
+        'labels': list(matcher_labels),
+        'matchers': list(matchers),
+        'category_labels': list(labels),
+        'hits': np.zeros(len(matcher_labels) + 1, dtype=np.int64),
+        'seconds': np.zeros(len(matcher_labels), dtype=np.float64),
+        'unmatched': collections.Counter(),
+        'rows': 0,
+        'elapsed': 0.0,
+    }
+    token = _active_category_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _active_category_stats.reset(token)
+
+def _categorize_key_instrumented(key, rows, stats):
+    """Test the block's rules one by one for a merchant key, charging the time to each rule."""
+    for position, matcher in enumerate(stats['matchers']):
+        start = time.perf_counter()
+        matched = matcher.search(key)
+        stats['seconds'][position] += time.perf_counter() - start
+        if matched:
+            stats['hits'][position] += rows
+            return stats['labels'][position]
+    
+    stats['hits'][-1] += rows
+    stats['unmatched'][key] += rows
+    return DEFAULT_CATEGORY
+
+def category_stats_report(stats, top=20):
+    """Turn instrumentation stats into DataFrames.
+    
+    Returns:
+        tuple: (per-rule DataFrame with hits and cumulative time in priority
+            order, DataFrame of the `top` unmatched merchant keys by row count)
+    """
+    labels = stats['labels'] + [f"{DEFAULT_CATEGORY} (no rule)"]
+    seconds = np.append(stats['seconds'], np.nan)
+    rows = max(stats['rows'], 1)
+    rules = pd.DataFrame({
+        'Priority': np.arange(1, len(labels) + 1),
+        'Category': labels,
+        'Hits': stats['hits'],
+        'Hit %': np.round(stats['hits'] / rows * 100, 2),
+        'Time (ms)': np.round(seconds * 1000, 3),
+    })
+    unmatched = pd.DataFrame(stats['unmatched'].most_common(top), columns=['Merchant', 'Rows'])
+    return rules, unmatched
+
+def categorize_series(descriptions):
+    """Categorize a whole Series of descriptions in one call.
+    
+    Each distinct description is matched once and the result is broadcast back
+    through pandas' factorize codes, so a million rows from a few thousand
+    merchants only costs a few thousand regex matches.
+    
+    Args:
+        descriptions (pd.Series or array-like): Transaction descriptions
+        
+    Returns:
+        pd.Series: Categorical 'Category' Series aligned with `descriptions`,
+            with CATEGORY_LABELS as its categories
+    """
+    if not isinstance(descriptions, pd.Series):
+        descriptions = pd.Series(descriptions)
+    load_category_rules()
+    
+    codes, uniques = pd.factorize(descriptions, use_na_sentinel=False)
+    return _categorize_factorized(codes, uniques, descriptions.index)
+
+def _categorize_factorized(codes, uniques, index):
+    """Categorize already factorized descriptions in-process, matching each distinct one once."""
+    stats = _active_category_stats.get()
+    if stats is None:
+        labels = CATEGORY_LABELS
+        label_codes = {label: code for code, label in enumerate(labels)}
+        unique_codes = np.array([label_codes[categorize_transaction(value)] for value in uniques], dtype=np.int16)
+    else:
+        labels = stats['category_labels']
+        label_codes = {label: code for code, label in enumerate(labels)}
+        start = time.perf_counter()
+        rows = np.bincount(codes, minlength=len(uniques))
+        unique_codes = np.array([label_codes[_categorize_key_instrumented(merchant_key(value), count, stats)]
+                                 for value, count in zip(uniques, rows)], dtype=np.int16)
+        stats['rows'] += len(codes)
+        stats['elapsed'] += time.perf_counter() - start
+    return _category_series(codes, unique_codes, index, labels)
+
+def _category_series(codes, unique_codes, index, labels=None):
+    """Broadcast per-unique label codes (into `labels`, default CATEGORY_LABELS) back to a Categorical 'Category' Series."""
+    categories = pd.Categorical.from_codes(unique_codes[codes] if len(codes) else codes.astype(np.int16),
+                                           categories=CATEGORY_LABELS if labels is None else labels)
+    return pd.Series(categories, index=index, name='Category')
+
+# Multi-million-row ledgers are categorized in a process pool. The distinct
+# descriptions are split into chunks and each worker is handed the compiled
+# matcher once, through the pool initializer, then returns label codes for
+# its chunks. Below the threshold the pool start-up costs more than it saves:
+# a description takes ~35us in-process, so 20k of them take ~0.7s, while a
+# pool starts in ~20ms with fork and ~0.6-1.2s with spawn (each worker
+# imports pandas). The threshold has to stay under STATEMENT_CSV_CHUNKSIZE,
+# since CSV statements are categorized one chunk at a time.
+# None means one worker per CPU core.
+CATEGORY_WORKERS = None
+CATEGORY_PARALLEL_MIN_UNIQUES = 20000
+CATEGORY_PARALLEL_CHUNKSIZE = 5000
+
+def _init_category_worker(matcher, matcher_labels, labels):
+    """Install the parent's compiled rules in a categorization worker."""
+    global CATEGORY_MATCHER, CATEGORY_MATCHER_LABELS, CATEGORY_LABELS
+    CATEGORY_MATCHER, CATEGORY_MATCHER_LABELS, CATEGORY_LABELS = matcher, matcher_labels, labels
+    categorize_merchant_key.cache_clear()
+
+def _categorize_chunk(values):
+    """Label codes (into CATEGORY_LABELS) for one chunk of distinct descriptions."""
+    label_codes = {label: code for code, label in enumerate(CATEGORY_LABELS)}
+    return np.array([label_codes[categorize_transaction(value)] for value in values], dtype=np.int16)
+
+def categorize_series_parallel(descriptions, workers=None, min_uniques=None, chunksize=None):
+    """Categorize a very large Series across a process pool.
+    
+    Descriptions are factorized in this process and only the distinct values
+    are shipped to the workers, in chunks of `chunksize`. With fewer than
+    `min_uniques` distinct descriptions, one worker, or instrumentation on,
+    it runs in-process like categorize_series.
+    
+    Args:
+        descriptions (pd.Series or array-like): Transaction descriptions
+        workers (int, optional): Worker processes. Defaults to CATEGORY_WORKERS,
+            or the CPU count if that is None.
+        min_uniques (int, optional): Distinct descriptions needed before a pool is
+            used. Defaults to CATEGORY_PARALLEL_MIN_UNIQUES.
+        chunksize (int, optional): Distinct descriptions per task. Defaults to
+            CATEGORY_PARALLEL_CHUNKSIZE.
+    
+    Returns:
+        pd.Series: Categorical 'Category' Series aligned with `descriptions`
+    """
+    if not isinstance(descriptions, pd.Series):
+        descriptions = pd.Series(descriptions)
+    if workers is None:
+        workers = CATEGORY_WORKERS or os.cpu_count() or 1
+    if min_uniques is None:
+        min_uniques = CATEGORY_PARALLEL_MIN_UNIQUES
+    chunksize = chunksize or CATEGORY_PARALLEL_CHUNKSIZE
+    load_category_rules()
+    
+    # Factorized once here; the in-process path reuses the codes rather than starting over
+    codes, uniques = pd.factorize(descriptions, use_na_sentinel=False)
+    if workers <= 1 or len(uniques) < min_uniques or _active_category_stats.get() is not None:
+        return _categorize_factorized(codes, uniques, descriptions.index)
+    
+    uniques = np.asarray(uniques, dtype=object)
+    chunks = [uniques[start:start + chunksize] for start in range(0, len(uniques), chunksize)]
+    matcher, matcher_labels, labels = CATEGORY_MATCHER, CATEGORY_MATCHER_LABELS, CATEGORY_LABELS
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_category_worker,
+                             initargs=(matcher, matcher_labels, labels)) as executor:
+        unique_codes = np.concatenate(list(executor.map(_categorize_chunk, chunks)))
+    
+    return _category_series(codes, unique_codes, descriptions.index, labels)
+
+# Parsed statements are cached on disk, keyed by the SHA-256 of the uploaded
+# bytes plus the parser and categorization rule versions, so Streamlit reruns
+# and re-uploads skip the parse. Bump the parser version whenever its output
+# changes (the rule version follows categorization_rules.json by itself).
+STATEMENT_PARSER_VERSION = "5"
+FINANCE_CACHE_DIR = Path(os.environ.get('FINANCE_CACHE_DIR', Path.home() / '.finance_assistant_cache'))
+STATEMENT_CACHE_DIR = FINANCE_CACHE_DIR / 'statements'
+STATEMENT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Each bank profile says which file formats its parser handles and which CSV
+# header columns give it away, so uploads can be routed from their first few KB.
+STATEMENT_SNIFF_BYTES = 4096
+
+BANK_PROFILES = [
+    {
+        'name': 'Monzo',
+        'parser': parse_monzo_statement,
+        'formats': ['pdf', 'csv'],
+        'csv_columns': {'transaction id', 'emoji', 'local amount', 'local currency',
+                        'notes and #tags', 'money out', 'money in', 'category split', 'receipt'}
+    },
+    {
+        'name': 'Lloyds',
+        'parser': parse_lloyds_statement,
+        'formats': ['csv'],
+        'csv_columns': {'sort code', 'account number', 'transaction details',
+                        'transaction description', 'debit amount', 'credit amount'}
+    },
+    {
+        'name': 'Barclays',
+        'parser': parse_barclays_statement,
+        'formats': ['csv'],
+        'csv_columns': {'number', 'account', 'subcategory', 'memo'}
+    }
+]
+
+BANK_PARSERS = {profile['name']: profile['parser'] for profile in BANK_PROFILES}
+
+def sniff_statement_format(file_content):
+    """Work out a statement's file format from its first few KB.
+    
+    Returns:
+        tuple: (file_format, csv_columns) - 'pdf', 'xlsx', 'xls' or 'csv', and the
+            lowercased CSV header columns (None for non-CSV files).
+    """
+    head = bytes(file_content[:STATEMENT_SNIFF_BYTES])
+    
+    if head.startswith(b'%PDF'):
+        return 'pdf', None
+    if head.startswith(b'PK\x03\x04'):
+        return 'xlsx', None
+    if head.startswith(b'\xd0\xcf\x11\xe0'):
+        return 'xls', None
+    
+    text = head.decode('utf-8-sig', errors='ignore')
+    lines = text.splitlines()
+    header = next(csv.reader(lines[:1]), [])
+    return 'csv', [str(col).strip().lower() for col in header]
+
+def detect_statement_bank(file_content):
+    """Pick the bank whose profile best matches a statement, without parsing it.
+    
+    Returns:
+        str: The bank name, or None if no profile matches
+    """
+    file_format, csv_columns = sniff_statement_format(file_content)
+    candidates = [profile for profile in BANK_PROFILES if file_format in profile['formats']]
+    
+    if file_format != 'csv':
+        # Only one parser handles PDFs, so the format alone decides it
+        return candidates[0]['name'] if len(candidates) == 1 else None
+    
+    best_name, best_score = None, 0
+    for profile in candidates:
+        score = len(profile['csv_columns'].intersection(csv_columns))
+        if score > best_score:
+            best_name, best_score = profile['name'], score
+    return best_name
+
+def resolve_statement_bank(file_content, bank=None):
+    """Choose the bank to parse a statement as.
+    
+    A detected profile wins over the bank the user picked, since running
+    another bank's parser over the file only produces garbage rows. The
+    picked bank is used when detection finds nothing.
+    
+    Returns:
+        tuple: (bank to parse as or None, detected bank or None)
+    """
+    detected = detect_statement_bank(file_content)
+    return detected or bank, detected
+
+def statement_cache_key(file_content, bank):
+    """Content-addressed cache key for a statement upload."""
+    digest = hashlib.sha256(file_content).hexdigest()
+    load_category_rules()
+    # The PDF text backend and layout mode change what a PDF parses to
+    extraction = f"{PDF_TEXT_BACKEND}:{MONZO_PDF_LAYOUT}"
+    categories = (f"{CATEGORY_RULES_VERSION}:{category_model_version()}:{CATEGORY_MODEL_THRESHOLD}:"
+                  f"{category_overrides_version()}")
+    key_source = f"{digest}:{bank}:{STATEMENT_PARSER_VERSION}:{categories}:{extraction}"
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+def load_cached_statement(key):
+    """Return the cached DataFrame (with its attrs) for `key`, or None on a miss."""
+    data_path = STATEMENT_CACHE_DIR / f"{key}.parquet"
+    attrs_path = STATEMENT_CACHE_DIR / f"{key}.json"
+    
+    if not data_path.exists():
+        return None
+    
+    try:
+        df = pd.read_parquet(data_path)
+        if attrs_path.exists():
+            with open(attrs_path, 'r') as f:
+                df.attrs.update(json.load(f))
+        
+        # Touch the entry so eviction treats it as recently used
+        os.utime(data_path, None)
+        return df
+    except Exception as e:
+        print(f"Could not read cached statement {key}: {str(e)}")
+        return None
+
+def store_cached_statement(key, df):
+    """Write a parsed statement to the cache and evict old entries past the size cap."""
+    try:
+        STATEMENT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        data_path = STATEMENT_CACHE_DIR / f"{key}.parquet"
+        attrs_path = STATEMENT_CACHE_DIR / f"{key}.json"
+        
+        # Write to temp names first so a crash never leaves a half-written entry
+        tmp_data_path = data_path.with_suffix('.parquet.tmp')
+        tmp_attrs_path = attrs_path.with_suffix('.json.tmp')
+        df.to_parquet(tmp_data_path, index=False)
+        with open(tmp_attrs_path, 'w') as f:
+            json.dump(dict(df.attrs), f)
+        os.replace(tmp_attrs_path, attrs_path)
+        os.replace(tmp_data_path, data_path)
+        
+        evict_statement_cache()
+    except ImportError:
+        print("pyarrow not installed, statement cache disabled. Install with: pip install pyarrow")
+    except Exception as e:
+        print(f"Could not cache statement {key}: {str(e)}")
+
+def evict_statement_cache(max_bytes=None, cache_dir=None, pattern='*.parquet'):
+    """Delete least recently used cache entries until the cache fits in max_bytes.
+    
+    Also used for the sheet sidecar cache, by passing its directory and file pattern.
+    """
+    if max_bytes is None:
+        max_bytes = STATEMENT_CACHE_MAX_BYTES
+    cache_dir = cache_dir or STATEMENT_CACHE_DIR
+    if not cache_dir.exists():
+        return
+    
+    entries = []
+    total_size = 0
+    for data_path in cache_dir.glob(pattern):
+        attrs_path = data_path.with_suffix('.json')
+        try:
+            data_stat = data_path.stat()
+            size = data_stat.st_size + (attrs_path.stat().st_size if attrs_path.exists() else 0)
+        except FileNotFoundError:
+            # Another process evicted it while we were looking
+            continue
+        entries.append((data_stat.st_mtime, size, data_path, attrs_path))
+        total_size += size
+    
+    for _, size, data_path, attrs_path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        for path in (data_path, attrs_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        total_size -= size
+
+def parse_statement_cached(file_content, bank):
+    """Parse a bank statement, reusing the on-disk cache when the same file was seen before."""
+    key = statement_cache_key(file_content, bank)
+    
+    df = load_cached_statement(key)
+    if df is not None:
+        print(f"Loaded {bank} statement from cache ({len(df)} transactions)")
+        return df
+    
+    df = BANK_PARSERS[bank](file_content)
+    if df is not None:
+        store_cached_statement(key, df)
+    return df
+
+# Rows the rules leave as 'Other' get a second opinion from a small naive
+# Bayes model trained on the user's own corrected categories. Descriptions
+# are reduced to merchant keys and hashed into a fixed number of character
+# n-gram buckets, so the model is a pair of NumPy arrays saved next to the
+# statement cache and loaded (not retrained) on startup.
+CATEGORY_MODEL_PATH = FINANCE_CACHE_DIR / 'category_model.npz'
+CATEGORY_MODEL_BUCKETS = 2 ** 16
+CATEGORY_MODEL_NGRAMS = (2, 3, 4)
+CATEGORY_MODEL_ALPHA = 0.1
+# Predictions below this probability leave the row as 'Other'
+CATEGORY_MODEL_THRESHOLD = 0.8
+# (path, mtime, model) of the model last loaded from disk
+_category_model_cache = None
+
+def category_model_features(text, buckets=CATEGORY_MODEL_BUCKETS):
+    """Hashed character n-gram bucket indices for one description."""
+    padded = f" {merchant_key(text)} "
+    grams = {padded[i:i + n] for n in CATEGORY_MODEL_NGRAMS for i in range(len(padded) - n + 1)}
+    # crc32 rather than hash() so bucket numbers are stable between runs
+    return np.array([zlib.crc32(gram.encode('utf-8')) % buckets for gram in grams] or [0], dtype=np.int64)
+
+def _category_feature_matrix(texts, buckets):
+    """Concatenated feature indices for many texts plus each text's start offset."""
+    features = [category_model_features(text, buckets) for text in texts]
+    lengths = np.array([len(f) for f in features], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(features) else np.array([], dtype=np.int64)
+    indices = np.concatenate(features) if features else np.array([], dtype=np.int64)
+    return indices, starts, lengths
+
+def train_category_model(descriptions, categories, buckets=CATEGORY_MODEL_BUCKETS, alpha=CATEGORY_MODEL_ALPHA):
+    """Fit a multinomial naive Bayes model on corrected (description, category) pairs.
+    
+    'Other' and blank labels are skipped, since the model only exists to find
+    something better than 'Other'.
+    
+    Returns:
+        dict: Model arrays (classes, log_prior, log_prob, seen buckets) plus
+            buckets and a version hash, or None if there are fewer than two
+            categories to learn
+    """
+    labels = pd.Series(categories, dtype=object).fillna('').astype(str).str.strip()
+    texts = pd.Series(descriptions, dtype=object).fillna('').astype(str)
+    keep = ((labels != '') & (labels != DEFAULT_CATEGORY)).to_numpy()
+    labels, texts = labels[keep], texts[keep]
+    
+    class_codes, classes = pd.factorize(labels)
+    if len(classes) < 2:
+        return None
+    
+    indices, _, lengths = _category_feature_matrix(texts, buckets)
+    counts = np.zeros((len(classes), buckets), dtype=np.float64)
+    np.add.at(counts, (np.repeat(class_codes, lengths), indices), 1)
+    seen = counts.sum(axis=0) > 0
+    
+    counts += alpha
+    log_prob = np.log(counts) - np.log(counts.sum(axis=1, keepdims=True))
+    log_prior = np.log(np.bincount(class_codes, minlength=len(classes)) / len(class_codes))
+    
+    version = hashlib.sha256(pd.util.hash_pandas_object(pd.DataFrame({'text': texts, 'label': labels}),
+                                                         index=False).to_numpy().tobytes()).hexdigest()[:12]
+    return {
+        'classes': np.asarray(classes, dtype=str),
+        'log_prior': log_prior.astype(np.float32),
+        'log_prob': log_prob.astype(np.float32),
+        'seen': seen,
+        'buckets': buckets,
+        'version': version,
+    }
+
+def save_category_model(model, path=None):
+    """Write a trained model to disk as a compressed .npz."""
+    global _category_model_cache
+    
+    path = Path(path or CATEGORY_MODEL_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp.npz')
+    np.savez_compressed(tmp_path, classes=model['classes'], log_prior=model['log_prior'],
+                        log_prob=model['log_prob'], seen=model['seen'], buckets=np.array(model['buckets']),
+                        version=np.array(model['version']))
+    os.replace(tmp_path, path)
+    # Two saves can land within the filesystem's mtime resolution
+    _category_model_cache = None
+
+def load_category_model(path=None):
+    """Load the saved model, reusing the in-memory copy until the file changes.
+    
+    Returns:
+        dict: The model, or None if no model has been trained yet
+    """
+    global _category_model_cache
+    
+    path = Path(path or CATEGORY_MODEL_PATH)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _category_model_cache and _category_model_cache[:2] == (str(path), mtime):
+        return _category_model_cache[2]
+    
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            model = {
+                'classes': data['classes'],
+                'log_prior': data['log_prior'],
+                'log_prob': data['log_prob'],
+                'seen': data['seen'],
+                'buckets': int(data['buckets']),
+                'version': str(data['version']),
+            }
+    except Exception as e:
+        print(f"Could not load category model {path}: {str(e)}")
+        model = None
+    _category_model_cache = (str(path), mtime, model)
+    return model
+
+def category_model_version():
+    """Version of the saved category model, for cache keys ('none' without one)."""
+    model = load_category_model()
+    return model['version'] if model else 'none'
+
+def predict_categories(descriptions, model=None):
+    """Batch-predict categories for a Series of descriptions.
+    
+    N-grams never seen in training carry no evidence, so they are left out of
+    the scores and the confidence is the class probability scaled by the share
+    of a description's n-grams the model has seen. A merchant it knows nothing
+    about gets a confidence of 0 rather than whichever class has the most
+    smoothing mass.
+    
+    Returns:
+        tuple: (np.ndarray of predicted categories, np.ndarray of confidences),
+            or (None, None) without a model
+    """
+    model = model or load_category_model()
+    if model is None:
+        return None, None
+    
+    texts = pd.Series(descriptions, dtype=object).fillna('').astype(str)
+    if texts.empty:
+        return np.array([], dtype=object), np.array([], dtype=np.float64)
+    
+    indices, starts, lengths = _category_feature_matrix(texts, model['buckets'])
+    seen = model['seen'][indices]
+    # Sum each text's n-gram log probabilities per class in one reduceat
+    scores = np.add.reduceat(model['log_prob'][:, indices] * seen, starts, axis=1) + model['log_prior'][:, None]
+    scores -= scores.max(axis=0, keepdims=True)
+    probabilities = np.exp(scores)
+    probabilities /= probabilities.sum(axis=0, keepdims=True)
+    coverage = np.add.reduceat(seen.astype(np.float64), starts) / lengths
+    
+    best = probabilities.argmax(axis=0)
+    return model['classes'].astype(object)[best], probabilities[best, np.arange(len(best))] * coverage
+
+def apply_category_model(descriptions, categories, threshold=None):
+    """Replace 'Other' categories with confident model predictions.
+    
+    Only the distinct descriptions of 'Other' rows are sent to the model.
+    
+    Returns:
+        pd.Series: `categories` with confident predictions filled in
+    """
+    if threshold is None:
+        threshold = CATEGORY_MODEL_THRESHOLD
+    categories = pd.Series(categories, dtype=object)
+    is_other = (categories == DEFAULT_CATEGORY).to_numpy()
+    if not is_other.any():
+        return categories
+    
+    model = load_category_model()
+    if model is None:
+        return categories
+    
+    codes, uniques = pd.factorize(pd.Series(descriptions, dtype=object)[is_other].fillna('').astype(str))
+    predicted, confidence = predict_categories(uniques, model)
+    predicted = np.where(confidence >= threshold, predicted, DEFAULT_CATEGORY)
+    
+    categories = categories.copy()
+    categories[is_other] = predicted[codes]
+    return categories
+
+# Categories the user corrected by hand are kept in a JSON-lines file keyed by
+# override key and always win over the rules and the model, so a fix made in
+# an exported CSV sticks for every future upload of that merchant.
+CATEGORY_OVERRIDES_PATH = FINANCE_CACHE_DIR / 'category_overrides.jsonl'
+# (path, mtime, overrides dict, version) of the file last loaded
+_category_overrides_cache = None
+
+def override_key(description):
+    """Key a description's override is stored under.
+    
+    The merchant key, so store numbers, dates and references don't matter, as
+    long as it still names a merchant. A description that is nothing but codes
+    keeps its whole (lowercased) text instead, so it never shares an override
+    with other unnamed ones.
+    """
+    key = merchant_key(description)
+    if re.search(r'[^\W\d_]', key):
+        return key
+    return ' '.join(str(description).lower().split())
+
+def load_category_overrides(path=None):
+    """Load the override key -> category overrides, reusing them until the file changes.
+    
+    Returns:
+        dict: Overrides (empty if none have been saved)
+    """
+    global _category_overrides_cache
+    
+    path = Path(path or CATEGORY_OVERRIDES_PATH)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if _category_overrides_cache and _category_overrides_cache[:2] == (str(path), mtime):
+        return _category_overrides_cache[2]
+    
+    overrides = {}
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for line in f:
+                digest.update(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    overrides[entry['merchant']] = entry['category']
+                except (ValueError, KeyError, TypeError):
+                    print(f"Skipping bad category override line: {line[:80]!r}")
+    except OSError as e:
+        print(f"Could not read category overrides {path}: {str(e)}")
+        return {}
+    
+    _category_overrides_cache = (str(path), mtime, overrides, digest.hexdigest()[:12])
+    return overrides
+
+def category_overrides_version():
+    """Version of the saved overrides, for cache keys ('none' without any)."""
+    if not load_category_overrides():
+        return 'none'
+    return _category_overrides_cache[3]
+
+def save_category_overrides(overrides, path=None):
+    """Rewrite the overrides file from an override key -> category dict."""
+    global _category_overrides_cache
+    
+    path = Path(path or CATEGORY_OVERRIDES_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for merchant, category in overrides.items():
+            f.write(json.dumps({'merchant': merchant, 'category': category}) + '\n')
+    os.replace(tmp_path, path)
+    # Two saves can land within the filesystem's mtime resolution
+    _category_overrides_cache = None
+
+def lookup_category_overrides(descriptions, overrides=None):
+    """Override category for each description, or NaN where there is none.
+    
+    Override keys are worked out once per distinct description and matched
+    against the overrides dict with a single Series.map.
+    
+    Returns:
+        pd.Series: Object Series aligned with `descriptions`
+    """
+    descriptions = pd.Series(descriptions, dtype=object)
+    if overrides is None:
+        overrides = load_category_overrides()
+    if not overrides or descriptions.empty:
+        return pd.Series(np.nan, index=descriptions.index, dtype=object)
+    
+    codes, uniques = pd.factorize(descriptions.fillna('').astype(str))
+    matched = pd.Series([override_key(value) for value in uniques], dtype=object).map(overrides).to_numpy()
+    return pd.Series(matched[codes], index=descriptions.index, dtype=object)
+
+def import_category_overrides(corrected, path=None):
+    """Save the categories a user changed in an exported CSV as overrides.
+    
+    Each row's category is compared with what the rules and model would give
+    its description today, so only real corrections are stored. A merchant put
+    back to its automatic category has its override removed. When several
+    rows correct the same merchant, the last one wins.
+    
+    Args:
+        corrected: Bytes of a CSV, or a DataFrame, with Description and Category columns
+        path (optional): Overrides file to update. Defaults to CATEGORY_OVERRIDES_PATH.
+    
+    Returns:
+        int: Number of merchants whose override was added, changed or removed
+    """
+    if not isinstance(corrected, pd.DataFrame):
+        corrected = pd.read_csv(io.BytesIO(corrected), dtype=str)
+    
+    descriptions = corrected['Description'].fillna('').astype(str)
+    categories = corrected['Category'].fillna('').astype(str).str.strip()
+    
+    automatic = apply_category_model(descriptions, categorize_series(descriptions).astype(object)).to_numpy()
+    codes, uniques = pd.factorize(descriptions)
+    keys = np.array([override_key(value) for value in uniques], dtype=object)[codes]
+    
+    overrides = dict(load_category_overrides(path))
+    existing = pd.Series(keys, dtype=object).map(overrides).to_numpy()
+    categories = categories.to_numpy()
+    usable = (categories != '') & (keys != '')
+    corrected_rows = usable & (categories != automatic)
+    # Putting a merchant back to its automatic category drops its override,
+    # unless another row in the file corrects that merchant
+    reverted_rows = usable & ~corrected_rows & pd.notna(existing) & (categories != existing)
+    
+    updates = dict.fromkeys(keys[reverted_rows])
+    updates.update(zip(keys[corrected_rows], categories[corrected_rows]))
+    updates = {key: category for key, category in updates.items() if overrides.get(key) != category}
+    if updates:
+        for key, category in updates.items():
+            if category is None:
+                overrides.pop(key, None)
+            else:
+                overrides[key] = category
+        save_category_overrides(overrides, path)
+    return len(updates)
+
+# Batch uploads are parsed in a process pool, one statement per task.
+# None means one worker per CPU core.
+STATEMENT_INGEST_WORKERS = None
+
+def _init_statement_worker():
+    """Keep PDF extraction and categorization serial inside ingestion workers so pools don't nest."""
+    global PDF_EXTRACTION_WORKERS, CATEGORY_WORKERS
+    PDF_EXTRACTION_WORKERS = 1
+    CATEGORY_WORKERS = 1
+
+def _ingest_statement_file(file_name, file_content, bank):
+    """Parse one statement of a batch and time it, with the bank from resolve_statement_bank."""
+    start = time.perf_counter()
+    try:
+        bank, _ = resolve_statement_bank(file_content, bank)
+        if bank is None:
+            df = None
+            error = "Could not detect bank"
+        else:
+            df = parse_statement_cached(file_content, bank)
+            error = None if df is not None else "Could not parse statement"
+    except Exception as e:
+        df = None
+        error = str(e)
+    return bank, df, time.perf_counter() - start, error
+
+def ingest_statements(files, workers=None):
+    """Parse many statements concurrently and merge them into one ledger.
+    
+    Args:
+        files (list): (file_name, file_content, bank) tuples. The bank is only
+            used when it can't be detected from the file itself.
+        workers (int, optional): Worker processes to use. Defaults to
+            STATEMENT_INGEST_WORKERS, or the CPU count if that is None.
+        
+    Returns:
+        tuple: (ledger, report) - The combined transactions with Bank and
+            SourceFile columns (None if nothing parsed), and a per-file report
+            of row counts and parse times.
+    """
+    if workers is None:
+        workers = STATEMENT_INGEST_WORKERS or os.cpu_count() or 1
+    workers = max(1, min(workers, len(files)))
+    
+    file_names = [file_name for file_name, _, _ in files]
+    contents = [file_content for _, file_content, _ in files]
+    banks = [bank for _, _, bank in files]
+    
+    if workers == 1:
+        results = list(map(_ingest_statement_file, file_names, contents, banks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_statement_worker) as executor:
+            results = list(executor.map(_ingest_statement_file, file_names, contents, banks))
+    
+    frames = []
+    report_rows = []
+    for file_name, (bank, df, elapsed, error) in zip(file_names, results):
+        if df is not None:
+            df = df.copy()
+            df['Bank'] = bank
+            df['SourceFile'] = file_name
+            frames.append(df)
+        
+        report_rows.append({
+            'File': file_name,
+            'Bank': bank or 'Unknown',
+            'Rows': len(df) if df is not None else 0,
+            'Parse Time (s)': round(elapsed, 3),
+            'Status': '✅ Parsed' if error is None else f'❌ {error}'
+        })
+    
+    report = pd.DataFrame(report_rows)
+    if not frames:
+        return None, report
+    
+    ledger = pd.concat(frames, ignore_index=True)
+    print(f"Ingested {len(ledger)} transactions from {len(frames)} of {len(files)} statements")
+    return ledger, report
+
+# The saved ledger grows one statement at a time. Each bank's last known
+# (date, balance) row is the anchor: only rows after it in a new statement are
+# appended, and their running balance must follow on from it.
+LEDGER_PATH = FINANCE_CACHE_DIR / 'ledger.parquet'
+LEDGER_BALANCE_TOLERANCE = 0.005
+
+def load_ledger(ledger_path=None):
+    """Load the saved transaction ledger, or None if there isn't one yet."""
+    ledger_path = Path(ledger_path or LEDGER_PATH)
+    if not ledger_path.exists():
+        return None
+    try:
+        return pd.read_parquet(ledger_path)
+    except Exception as e:
+        print(f"Could not read ledger {ledger_path}: {str(e)}")
+        return None
+
+def save_ledger(ledger, ledger_path=None):
+    """Atomically write the transaction ledger."""
+    ledger_path = Path(ledger_path or LEDGER_PATH)
+    ledger_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = ledger_path.with_suffix('.parquet.tmp')
+    ledger.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, ledger_path)
+
+def _in_chronological_order(df):
+    """Flip exports that list the newest transaction first (Lloyds, Barclays)."""
+    dates = df['Date'].dropna()
+    if len(dates) > 1 and dates.iloc[0] > dates.iloc[-1]:
+        return df.iloc[::-1].reset_index(drop=True)
+    return df.reset_index(drop=True)
+
+def _carried_balance(df):
+    """Running balance for every row, carrying the last printed balance through rows that lack one."""
+    has_balance = df['Balance'].notna()
+    since_balance = df['Amount'].where(~has_balance, 0).fillna(0).groupby(has_balance.cumsum()).cumsum()
+    return df['Balance'].ffill() + since_balance
+
+def find_balance_anchor(ledger, bank):
+    """Return the (Date, Balance) at the end of the bank's part of the ledger, or None."""
+    if ledger is None or ledger.empty:
+        return None
+    rows = ledger[ledger['Bank'] == bank]
+    if rows.empty:
+        return None
+    balance = _carried_balance(rows).iloc[-1]
+    if pd.isna(balance) or pd.isna(rows['Date'].iloc[-1]):
+        return None
+    return rows['Date'].iloc[-1], float(balance)
+
+def rows_after_balance_anchor(new_df, anchor, tolerance=LEDGER_BALANCE_TOLERANCE):
+    """Slice a statement down to the rows after the ledger anchor and check balance continuity.
+    
+    Args:
+        new_df (pd.DataFrame): Normalized transactions in chronological order
+        anchor (tuple): (Date, Balance) from find_balance_anchor
+        tolerance (float): Allowed rounding difference between balances
+        
+    Returns:
+        tuple: (rows, report) - The rows to append (None if continuity is broken)
+            and a dict describing what happened.
+    """
+    anchor_date, anchor_balance = anchor
+    report = {'anchor_date': anchor_date, 'anchor_balance': anchor_balance}
+    
+    # Where does the anchor row sit in the new statement?
+    carried = _carried_balance(new_df)
+    is_anchor = (new_df['Date'] == anchor_date) & np.isclose(carried, anchor_balance, atol=tolerance)
+    anchor_positions = np.flatnonzero(is_anchor.to_numpy())
+    
+    if len(anchor_positions):
+        rows = new_df.iloc[anchor_positions[-1] + 1:]
+    elif new_df['Date'].max() <= anchor_date:
+        rows = new_df.iloc[0:0]
+    else:
+        # No overlap - the statement has to start right where the ledger stopped
+        rows = new_df[new_df['Date'] >= anchor_date]
+    
+    if rows.empty:
+        report.update(status='up_to_date', new_rows=0, message="No transactions newer than the ledger.")
+        return rows, report
+    
+    # Every row's balance should equal the anchor balance plus the running total of amounts
+    expected = anchor_balance + rows['Amount'].fillna(0).cumsum()
+    has_balance = rows['Balance'].notna()
+    continuous = np.isclose(expected[has_balance], rows['Balance'][has_balance], atol=tolerance)
+    
+    if not continuous.all():
+        first_break = rows[has_balance].iloc[int(np.argmin(continuous))]
+        break_date = f"{first_break['Date']:%Y-%m-%d}" if pd.notna(first_break['Date']) else "an undated row"
+        report.update(
+            status='discontinuous',
+            new_rows=0,
+            message=(f"Running balance breaks on {break_date} "
+                     f"({first_break['Description']}): expected £{expected[has_balance].iloc[int(np.argmin(continuous))]:,.2f}, "
+                     f"statement says £{first_break['Balance']:,.2f}. Is a statement missing in between?")
+        )
+        return None, report
+    
+    report.update(status='appended', new_rows=len(rows), message=f"Added {len(rows)} new transactions.")
+    return rows, report
+
+LEDGER_DEDUPE_COLUMNS = ['Date', 'Description', 'Amount']
+
+def rows_not_in_ledger(new_df, bank_rows):
+    """Drop statement rows the bank's ledger rows already have, matching on date, description and amount.
+    
+    Used when there is no balance to anchor on (Barclays exports, say). Repeats
+    are matched one for one, so two identical coffees on the same day only
+    count as known if the ledger has both of them.
+    """
+    def occurrences(df):
+        keys = df[LEDGER_DEDUPE_COLUMNS].reset_index(drop=True)
+        keys['Occurrence'] = keys.groupby(LEDGER_DEDUPE_COLUMNS, dropna=False).cumcount()
+        return keys
+    
+    known = occurrences(bank_rows).merge(occurrences(new_df), how='right', indicator=True)
+    return new_df[(known['_merge'] == 'right_only').to_numpy()]
+
+def ingest_into_ledger(new_df, bank, ledger_path=None):
+    """Append only the transactions of a newly parsed statement that the ledger doesn't have yet.
+    
+    History already in the ledger is never re-parsed or re-categorized. When the
+    bank has no rows yet, the whole statement is appended; when it has rows but
+    none with a balance to anchor on, rows already in the ledger are skipped.
+    
+    Returns:
+        tuple: (ledger, report) - The updated ledger and a dict describing the update
+    """
+    ledger = load_ledger(ledger_path)
+    new_df = _in_chronological_order(new_df[TRANSACTION_COLUMNS])
+    anchor = find_balance_anchor(ledger, bank)
+    
+    bank_rows = ledger[ledger['Bank'] == bank] if ledger is not None else None
+    if bank_rows is None or bank_rows.empty:
+        rows = new_df
+        report = {'status': 'appended', 'new_rows': len(rows),
+                  'message': f"Started the {bank} ledger with {len(rows)} transactions."}
+    elif anchor is None:
+        rows = rows_not_in_ledger(new_df, bank_rows)
+        report = {'status': 'appended' if len(rows) else 'up_to_date', 'new_rows': len(rows),
+                  'message': (f"Added {len(rows)} transactions not already in the {bank} ledger "
+                              f"(no running balance to anchor on)." if len(rows)
+                              else "No transactions the ledger doesn't already have.")}
+    else:
+        rows, report = rows_after_balance_anchor(new_df, anchor)
+    
+    if rows is not None and not rows.empty:
+        ledger = rows if ledger is None else pd.concat([ledger, rows], ignore_index=True)
+        save_ledger(ledger, ledger_path)
+    
+    print(f"Ledger update for {bank}: {report['message']}")
+    return ledger, report
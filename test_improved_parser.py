@@ -1,10 +1,10 @@
-import generator
+import statement_parser
 
 # Test the improved PDF parser
 with open('Monzo_bank_statement_2025-11-01-2025-11-30_722.pdf', 'rb') as f:
     file_content = f.read()
     
-    df = generator.parse_monzo_statement(file_content)
+    df = statement_parser.parse_monzo_statement(file_content)
     
     if df is not None:
         print(f"✅ Successfully parsed {len(df)} transactions")
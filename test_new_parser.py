@@ -1,22 +1,23 @@
 #!/usr/bin/env python3
 
-import PyPDF2
 import re
+import sys
 import datetime
 
-def test_new_parser(file_path):
+from statement_parser import PDF_TEXT_BACKEND, iter_pdf_page_texts
+
+def test_new_parser(file_path, backend=None):
     """Test the new Monzo PDF parsing logic"""
-    print(f"=== TESTING NEW MONZO PDF PARSER ===")
+    print(f"=== TESTING NEW MONZO PDF PARSER ({backend or PDF_TEXT_BACKEND}) ===")
     
     try:
         # Read PDF
         with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
             text = ""
             
             # Extract text from all pages
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            for page_text in iter_pdf_page_texts(file, backend=backend):
+                text += page_text + "\n"
             
             print(f"Total extracted text length: {len(text)} characters")
             
@@ -104,4 +105,8 @@ def test_new_parser(file_path):
 if __name__ == "__main__":
     # Test with your Monzo statement
     pdf_path = "/Users/anthonygathukia/Desktop/Me/Finance Folder's/Finance Budget Script/Test Site/Monzo_bank_statement_2025-11-01-2025-11-30_722.pdf"
-    transactions = test_new_parser(pdf_path)
+    if len(sys.argv) > 1:
+        pdf_path = sys.argv[1]
+    # Optional second argument: text backend (pypdf2, pypdf, pdfminer, pdftotext)
+    backend = sys.argv[2] if len(sys.argv) > 2 else None
+    transactions = test_new_parser(pdf_path, backend)
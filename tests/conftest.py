@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+import pytest
+
+# Keep the statement, sheet and model caches out of the user's home directory.
+# Set before statement_parser is imported, since it reads this at import time.
+os.environ.setdefault('FINANCE_CACHE_DIR', tempfile.mkdtemp(prefix='finance-tests-'))
+
+
+@pytest.fixture
+def statement_files(tmp_path):
+    """Generated Monzo PDF, Lloyds CSV and Barclays CSV statements, as bank -> bytes."""
+    from generate_test_statements import generate_corpus
+    
+    paths = generate_corpus(str(tmp_path / 'statements'), 60)
+    return {name.split()[0]: open(path, 'rb').read() for name, path in paths.items()}
@@ -0,0 +1,41 @@
+import pytest
+
+import statement_parser
+
+
+def test_each_generated_statement_is_detected(statement_files):
+    for bank, content in statement_files.items():
+        assert statement_parser.detect_statement_bank(content) == bank
+
+
+def test_sniffer_reads_format_and_header_columns(statement_files):
+    assert statement_parser.sniff_statement_format(statement_files['Monzo']) == ('pdf', None)
+    assert statement_parser.sniff_statement_format(b'PK\x03\x04rest') == ('xlsx', None)
+    assert statement_parser.sniff_statement_format(b'\xd0\xcf\x11\xe0rest') == ('xls', None)
+    
+    file_format, columns = statement_parser.sniff_statement_format(statement_files['Barclays'])
+    assert file_format == 'csv'
+    assert columns == ['number', 'date', 'account', 'amount', 'subcategory', 'memo']
+
+
+def test_sniffer_only_reads_the_head_of_the_file():
+    header = b'\xef\xbb\xbfTransaction Date,Transaction Description,Debit Amount,Credit Amount\n'
+    padding = b'x' * (2 * statement_parser.STATEMENT_SNIFF_BYTES)
+    
+    assert statement_parser.detect_statement_bank(header + padding) == 'Lloyds'
+
+
+@pytest.mark.parametrize('header, expected', [
+    (b'Transaction ID,Date,Time,Type,Name,Emoji,Category,Amount,Local amount\n', 'Monzo'),
+    (b'Transaction Date,Transaction Type,Sort Code,Account Number,Transaction Description\n', 'Lloyds'),
+    (b'Number,Date,Account,Amount,Subcategory,Memo\n', 'Barclays'),
+    (b'Date,Description,Amount\n', None),
+])
+def test_csv_headers_pick_the_best_matching_bank(header, expected):
+    assert statement_parser.detect_statement_bank(header) == expected
+
+
+def test_detected_bank_wins_over_the_picked_one(statement_files):
+    assert statement_parser.resolve_statement_bank(statement_files['Lloyds'], 'Barclays') == ('Lloyds', 'Lloyds')
+    assert statement_parser.resolve_statement_bank(b'Date,Description,Amount\n', 'Barclays') == ('Barclays', None)
+    assert statement_parser.resolve_statement_bank(b'PK\x03\x04rest', None) == (None, None)
@@ -0,0 +1,64 @@
+import pytest
+
+import statement_parser
+from generate_test_statements import generate_transactions
+
+
+@pytest.mark.parametrize('description, key', [
+    ('TESCO STORES 2231 ON 03 JAN', 'tesco stores'),
+    ('TESCO STORES REF 12345', 'tesco stores'),
+    ('Tesco Stores ref: AB12C', 'tesco stores'),
+    ('CARD PAYMENT TO AMAZON ID 9X8Y7', 'card payment to amazon'),
+    ('Pret A Manger 15/01', 'pret a manger'),
+    ('AMAZON MKTPLACE 4f8a9c2', 'amazon mktplace'),
+    ('TESCO1234 LONDON', 'tesco london'),
+    ('DELIVEROO1234', 'deliveroo'),
+])
+def test_merchant_key_strips_dates_and_reference_codes(description, key):
+    assert statement_parser.merchant_key(description) == key
+
+
+@pytest.mark.parametrize('description, key', [
+    ('APPLE ID PAYMENT', 'apple id payment'),
+    ('TXN PAYMENT TO J SMITH', 'txn payment to j smith'),
+    ('AUTH Coffee shop', 'auth coffee shop'),
+    ('P2P PAYMENT', 'p2p payment'),
+    ('7ELEVEN', '7eleven'),
+    ('UBER5 TRIP', 'uber5 trip'),
+])
+def test_merchant_key_keeps_words_after_reference_labels(description, key):
+    assert statement_parser.merchant_key(description) == key
+
+
+@pytest.mark.parametrize('description, category', [
+    ('APPLE ID PAYMENT', 'Income'),
+    ('TXN PAYMENT TO J SMITH', 'Transfers & Payments'),
+    ('AUTH Coffee shop', 'Dining Out'),
+    ('TESCO STORES REF 12345', 'Groceries'),
+    ('DELIVEROO1234', 'Dining Out'),
+    ('TESCO1234 LONDON', 'Groceries'),
+    ('UBER5 TRIP', 'Transportation'),
+    ('BP FUEL1234', 'Car Expenses'),
+    ('PUREGYM2024', 'Health & Fitness'),
+    ('foodhub123', 'Groceries'),
+    ('tesco-express01', 'Groceries'),
+])
+def test_merchant_keys_categorize_like_the_raw_description(description, category):
+    assert statement_parser.categorize_transaction(description) == category
+    assert statement_parser.categorize_merchant_key(statement_parser.merchant_key(description)) == category
+
+
+def raw_description_category(description):
+    match = statement_parser.CATEGORY_MATCHER.match(description.lower())
+    if match:
+        return statement_parser.CATEGORY_MATCHER_LABELS[int(match.lastgroup[4:])]
+    return statement_parser.DEFAULT_CATEGORY
+
+
+def test_generated_descriptions_categorize_like_the_raw_text():
+    transactions = generate_transactions(2000)
+    descriptions = {t['description'] for t in transactions}
+    descriptions |= {f"{d}{store}" for d in list(descriptions)[:50] for store in ('', '1234', '07')}
+    
+    assert {d: statement_parser.categorize_transaction(d) for d in descriptions} == \
+        {d: raw_description_category(d) for d in descriptions}
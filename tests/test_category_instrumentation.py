@@ -0,0 +1,50 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import statement_parser
+
+DESCRIPTIONS = pd.Series(['TESCO STORES 2231', 'TESCO STORES 9999', 'Transfer to pot Savings',
+                          'Mystery merchant', 'Mystery merchant', 'Unknown shopfront 12', 'Deliveroo'])
+
+
+def test_instrumented_run_categorizes_like_a_normal_run_and_counts_every_row():
+    expected = statement_parser.categorize_series(DESCRIPTIONS)
+    
+    with statement_parser.category_instrumentation() as stats:
+        categories = statement_parser.categorize_series(DESCRIPTIONS)
+        statement_parser.categorize_series_parallel(DESCRIPTIONS, workers=2, min_uniques=1)
+    
+    pd.testing.assert_series_equal(categories, expected)
+    assert stats['rows'] == 2 * len(DESCRIPTIONS)
+    assert stats['hits'].sum() == stats['rows']
+    assert stats['hits'][stats['labels'].index('Groceries')] == 4
+    assert stats['hits'][-1] == 4
+    assert dict(stats['unmatched']) == {'mystery merchant': 4}
+
+
+def test_report_lists_rules_in_priority_order_and_top_unmatched():
+    with statement_parser.category_instrumentation() as stats:
+        statement_parser.categorize_series(DESCRIPTIONS)
+    
+    rules, unmatched = statement_parser.category_stats_report(stats, top=1)
+    
+    assert rules['Category'].tolist() == stats['labels'] + ['Other (no rule)']
+    assert rules['Priority'].tolist() == list(range(1, len(stats['labels']) + 2))
+    assert rules['Hits'].sum() == len(DESCRIPTIONS)
+    assert rules['Hit %'].sum() == pytest.approx(100, abs=0.1)
+    assert rules['Time (ms)'].iloc[:-1].notna().all()
+    assert unmatched.to_dict('records') == [{'Merchant': 'mystery merchant', 'Rows': 2}]
+
+
+def test_only_calls_inside_the_block_are_recorded():
+    with statement_parser.category_instrumentation() as stats:
+        # A Streamlit session on another thread keeps its own (empty) stats
+        thread = threading.Thread(target=statement_parser.categorize_series, args=(DESCRIPTIONS,))
+        thread.start()
+        thread.join()
+    statement_parser.categorize_series(DESCRIPTIONS)
+    
+    assert stats['rows'] == 0
+    assert stats['hits'].sum() == 0
@@ -0,0 +1,55 @@
+import re
+
+import statement_parser
+from generate_test_statements import generate_transactions
+
+RULES = [(category, keywords, None) for category, keywords in statement_parser.CATEGORY_RULES]
+
+
+def first_matching_rule(rules, description):
+    """The original one-rule-at-a-time priority loop."""
+    description = description.lower()
+    for category, keywords, regex in rules:
+        if any(keyword in description for keyword in keywords) or (regex and re.search(regex, description)):
+            return category
+    return statement_parser.DEFAULT_CATEGORY
+
+
+def compiled_category(matcher, labels, description):
+    match = matcher.match(description)
+    return labels[int(match.lastgroup[4:])] if match else statement_parser.DEFAULT_CATEGORY
+
+
+def test_compiled_rules_pick_the_same_category_as_the_priority_loop():
+    matcher, labels = statement_parser.compile_category_rules(RULES)
+    descriptions = {t['description'] for t in generate_transactions(2000)} | {
+        'TRANSFER TO POT SAVINGS PAYMENT', 'H&M Oxford St', 'Disney+ monthly', 'Council Tax DD',
+        'BP fuel and gas', 'Mystery merchant', '', 'payment\nto line break',
+    }
+    
+    for description in descriptions:
+        assert compiled_category(matcher, labels, description) == first_matching_rule(RULES, description), description
+
+
+def test_regex_rules_and_keyword_priority():
+    rules = [('Fees', [], r'\bfee\b'), ('Coffee', ['coffee'], None), ('Shops', ['shop'], r'store\s*\d+')]
+    matcher, labels = statement_parser.compile_category_rules(rules)
+    
+    assert labels == ['Fees', 'Coffee', 'Shops']
+    assert compiled_category(matcher, labels, 'Coffee shop fee') == 'Fees'
+    assert compiled_category(matcher, labels, 'Coffee feed shop') == 'Coffee'
+    assert compiled_category(matcher, labels, 'STORE 12') == 'Shops'
+
+
+def test_rules_without_keywords_or_regex_are_left_out():
+    matcher, labels = statement_parser.compile_category_rules([('Empty', [], None), ('Pub', ['pub'], None)])
+    
+    assert labels == ['Pub']
+    assert compiled_category(matcher, labels, 'The Crown Pub') == 'Pub'
+
+
+def test_no_rules_match_nothing():
+    matcher, labels = statement_parser.compile_category_rules([])
+    
+    assert matcher.match('anything') is None
+
@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import statement_parser
+
+TRAINING = [
+    ('WAITROSE 1234 LONDON', 'Groceries'),
+    ('Waitrose & Partners', 'Groceries'),
+    ('LIDL GB BRISTOL', 'Groceries'),
+    ('Lidl Store 88', 'Groceries'),
+    ('NANDOS SOHO', 'Dining Out'),
+    ("Nando's Leeds", 'Dining Out'),
+    ('WAGAMAMA 2231', 'Dining Out'),
+    ('Wagamama Ltd', 'Dining Out'),
+    ('Mystery merchant', 'Other'),
+    ('Blank label', ''),
+]
+
+
+@pytest.fixture
+def model_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(statement_parser, 'CATEGORY_MODEL_PATH', tmp_path / 'category_model.npz')
+    monkeypatch.setattr(statement_parser, '_category_model_cache', None)
+    return tmp_path / 'category_model.npz'
+
+
+@pytest.fixture
+def model():
+    descriptions, categories = zip(*TRAINING)
+    return statement_parser.train_category_model(descriptions, categories)
+
+
+def test_known_merchants_are_predicted_confidently(model):
+    predicted, confidence = statement_parser.predict_categories(
+        ['WAITROSE 9876 LONDON', 'NANDOS SOHO 01/02', 'Lidl GB Bristol ON 03 JAN'], model)
+    
+    assert predicted.tolist() == ['Groceries', 'Dining Out', 'Groceries']
+    assert (confidence >= statement_parser.CATEGORY_MODEL_THRESHOLD).all()
+
+
+def test_unseen_merchants_get_no_confidence(model):
+    _, confidence = statement_parser.predict_categories(['QQQQ', ''], model)
+    
+    assert confidence.tolist() == [0.0, 0.0]
+
+
+def test_other_and_blank_labels_are_not_learned(model):
+    assert sorted(model['classes'].tolist()) == ['Dining Out', 'Groceries']
+    assert statement_parser.train_category_model(['Waitrose', 'Mystery'], ['Groceries', 'Other']) is None
+
+
+def test_only_confident_predictions_replace_other(model_path, model):
+    statement_parser.save_category_model(model)
+    descriptions = pd.Series(['WAGAMAMA 77', 'QQQQ', 'TESCO STORES', 'WAGAMAMA 77'])
+    categories = pd.Series(['Other', 'Other', 'Groceries', 'Other'])
+    
+    applied = statement_parser.apply_category_model(descriptions, categories)
+    
+    assert applied.tolist() == ['Dining Out', 'Other', 'Groceries', 'Dining Out']
+    assert statement_parser.apply_category_model(descriptions, categories, threshold=1.01).tolist() == categories.tolist()
+
+
+def test_saved_model_loads_back_and_versions_the_cache(model_path, model):
+    key = statement_parser.statement_cache_key(b'statement', 'Lloyds')
+    assert statement_parser.load_category_model() is None
+    assert statement_parser.category_model_version() == 'none'
+    
+    statement_parser.save_category_model(model)
+    loaded = statement_parser.load_category_model()
+    
+    assert loaded is statement_parser.load_category_model()
+    assert loaded['version'] == model['version'] == statement_parser.category_model_version()
+    assert loaded['buckets'] == model['buckets']
+    for name in ('classes', 'log_prior', 'log_prob', 'seen'):
+        np.testing.assert_array_equal(loaded[name], model[name])
+    assert statement_parser.statement_cache_key(b'statement', 'Lloyds') != key
+
+
+def test_unreadable_model_is_ignored(model_path):
+    model_path.write_bytes(b'not a model')
+    
+    assert statement_parser.load_category_model() is None
+    assert statement_parser.apply_category_model(['WAITROSE'], ['Other']).tolist() == ['Other']
+
+
+def test_retrained_model_replaces_the_loaded_one(model_path, model):
+    statement_parser.save_category_model(model)
+    statement_parser.load_category_model()
+    mtime = model_path.stat().st_mtime_ns
+    retrained = statement_parser.train_category_model(['WAITROSE', 'NANDOS', 'BOOTS'],
+                                                      ['Groceries', 'Dining Out', 'Health & Pharmacy'])
+    
+    statement_parser.save_category_model(retrained)
+    # Same mtime as the first save, as on filesystems with coarse timestamps
+    os.utime(model_path, ns=(mtime, mtime))
+    
+    assert statement_parser.load_category_model()['version'] == retrained['version']
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+import statement_parser
+
+
+def test_merchants_sharing_a_town_keep_separate_overrides(tmp_path):
+    path = tmp_path / 'overrides.jsonl'
+    corrected = pd.DataFrame({
+        'Description': ['DELIVEROO1234 LONDON', 'TESCO5678 LONDON'],
+        'Category': ['Entertainment', 'Shopping'],
+    })
+    
+    assert statement_parser.import_category_overrides(corrected, path) == 2
+    
+    overrides = statement_parser.load_category_overrides(path)
+    looked_up = statement_parser.lookup_category_overrides(
+        ['DELIVEROO100 LONDON', 'DELIVEROO4321 LONDON', 'TESCO1111 LONDON', 'LONDON'], overrides)
+    assert looked_up.tolist()[:3] == ['Entertainment', 'Entertainment', 'Shopping']
+    assert pd.isna(looked_up.iloc[3])
+
+
+def test_descriptions_without_a_merchant_name_keep_their_own_override():
+    assert statement_parser.merchant_key('4f8a9c2 12345') == ''
+    assert statement_parser.override_key('4f8a9c2 12345') != statement_parser.override_key('ab12cd34 999')
+    assert statement_parser.override_key('TESCO1234  LONDON') == statement_parser.override_key('tesco9999 london')
+
+
+@pytest.fixture
+def overrides_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(statement_parser, 'CATEGORY_OVERRIDES_PATH', tmp_path / 'category_overrides.jsonl')
+    monkeypatch.setattr(statement_parser, '_category_overrides_cache', None)
+    return tmp_path / 'category_overrides.jsonl'
+
+
+def test_exported_csv_corrections_round_trip_into_parsed_statements(overrides_path, statement_files):
+    parsed = statement_parser.parse_barclays_statement(statement_files['Barclays'])
+    key = statement_parser.statement_cache_key(statement_files['Barclays'], 'Barclays')
+    exported = parsed[['Date', 'Description', 'Amount', 'Category']].copy()
+    is_netflix = exported['Description'].str.startswith('Netflix.com')
+    exported.loc[is_netflix, 'Category'] = 'Subscriptions'
+    
+    assert statement_parser.import_category_overrides(exported.to_csv(index=False).encode('utf-8')) == 1
+    
+    reparsed = statement_parser.parse_barclays_statement(statement_files['Barclays'])
+    assert (reparsed.loc[is_netflix, 'Category'] == 'Subscriptions').all()
+    assert reparsed.loc[~is_netflix, 'Category'].tolist() == parsed.loc[~is_netflix, 'Category'].tolist()
+    assert statement_parser.statement_cache_key(statement_files['Barclays'], 'Barclays') != key
+    # Importing the same file again changes nothing
+    assert statement_parser.import_category_overrides(exported) == 0
+
+
+def test_reverting_to_the_automatic_category_removes_the_override(overrides_path):
+    corrected = pd.DataFrame({'Description': ['Netflix.com ON 01 JAN'], 'Category': ['Subscriptions']})
+    statement_parser.import_category_overrides(corrected)
+    
+    corrected['Category'] = statement_parser.categorize_transaction('Netflix.com')
+    
+    assert statement_parser.import_category_overrides(corrected) == 1
+    assert statement_parser.load_category_overrides() == {}
+
+
+def test_bad_override_lines_are_skipped(overrides_path):
+    overrides_path.write_text('{"merchant": "netflix.com", "category": "Subscriptions"}\nnot json\n{"merchant": "x"}\n\n')
+    
+    assert statement_parser.load_category_overrides() == {'netflix.com': 'Subscriptions'}
+    assert statement_parser.lookup_category_overrides(['NETFLIX.COM 01/02']).tolist() == ['Subscriptions']
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+import statement_parser
+
+
+@pytest.fixture
+def rules_path(tmp_path, monkeypatch):
+    path = tmp_path / 'rules.json'
+    monkeypatch.setattr(statement_parser, 'CATEGORY_RULES_PATH', path)
+    yield path
+    monkeypatch.undo()
+    statement_parser.load_category_rules(force=True)
+
+
+def write_rules(path, rules, version=1, mtime=None):
+    path.write_text(json.dumps({'version': version, 'rules': rules}))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def category(description):
+    return statement_parser.categorize_series([description])[0]
+
+
+def test_edited_rule_file_is_picked_up_without_a_restart(rules_path):
+    write_rules(rules_path, [{'category': 'Coffee', 'keywords': ['pret']}], mtime=1_000_000_000)
+    assert statement_parser.load_category_rules()
+    assert category('Pret A Manger') == 'Coffee'
+    assert not statement_parser.load_category_rules()
+    
+    write_rules(rules_path, [{'category': 'Lunch', 'keywords': ['pret']}], mtime=2_000_000_000)
+    
+    assert category('Pret A Manger') == 'Lunch'
+
+
+def test_priority_orders_rules_and_regexes_match(rules_path):
+    write_rules(rules_path, [
+        {'category': 'Shopping', 'priority': 20, 'keywords': ['amazon']},
+        {'category': 'Subscriptions', 'priority': 10, 'regex': r'amazon\s+prime'},
+    ])
+    statement_parser.load_category_rules()
+    
+    assert statement_parser.CATEGORY_MATCHER_LABELS == ['Subscriptions', 'Shopping']
+    assert category('AMAZON PRIME') == 'Subscriptions'
+    assert category('AMAZON MARKETPLACE') == 'Shopping'
+    assert statement_parser.CATEGORY_LABELS[-2:] == [statement_parser.DEFAULT_CATEGORY, 'Pot Transfer']
+
+
+@pytest.mark.parametrize('contents', [
+    '{"rules": [',
+    '{"version": 1}',
+    '{"rules": [{"category": "Empty"}]}',
+    '{"rules": [{"category": "Bad", "regex": "("}]}',
+])
+def test_invalid_rule_file_keeps_the_current_rules(rules_path, contents):
+    write_rules(rules_path, [{'category': 'Coffee', 'keywords': ['pret']}], mtime=1_000_000_000)
+    statement_parser.load_category_rules()
+    version = statement_parser.CATEGORY_RULES_VERSION
+    
+    rules_path.write_text(contents)
+    os.utime(rules_path, ns=(2_000_000_000, 2_000_000_000))
+    
+    assert not statement_parser.load_category_rules()
+    assert category('Pret A Manger') == 'Coffee'
+    assert statement_parser.CATEGORY_RULES_VERSION == version
+
+
+def test_missing_file_falls_back_to_the_built_in_rules(rules_path):
+    statement_parser.load_category_rules()
+    
+    assert statement_parser.CATEGORY_RULES_VERSION == 'builtin'
+    assert statement_parser.CATEGORY_MATCHER_LABELS == [category for category, _ in statement_parser.CATEGORY_RULES]
+
+
+def test_rule_changes_change_the_statement_cache_key(rules_path):
+    write_rules(rules_path, [{'category': 'Coffee', 'keywords': ['pret']}], mtime=1_000_000_000)
+    key = statement_parser.statement_cache_key(b'statement', 'Lloyds')
+    
+    write_rules(rules_path, [{'category': 'Lunch', 'keywords': ['pret']}], mtime=2_000_000_000)
+    
+    assert statement_parser.statement_cache_key(b'statement', 'Lloyds') != key
+
+
+def test_shipped_rule_file_matches_the_built_in_rules():
+    rules, _ = statement_parser.read_category_rules(statement_parser.CATEGORY_RULES_PATH)
+    
+    assert rules == [(category, keywords, None) for category, keywords in statement_parser.CATEGORY_RULES]
@@ -0,0 +1,46 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+import statement_parser
+
+
+@pytest.mark.parametrize('bank', ['Lloyds', 'Barclays'])
+def test_small_chunks_match_a_whole_file_read(statement_files, bank):
+    whole = statement_parser.BANK_PARSERS[bank](statement_files[bank])
+    
+    chunks = list(statement_parser.iter_csv_statement_chunks(statement_files[bank], bank, chunksize=7))
+    
+    assert len(chunks) == -(-len(whole) // 7)
+    assert all(len(chunk) <= 7 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+
+def test_paths_and_file_objects_read_like_bytes(statement_files, tmp_path):
+    path = tmp_path / 'lloyds.csv'
+    path.write_bytes(statement_files['Lloyds'])
+    whole = statement_parser.parse_lloyds_statement(statement_files['Lloyds'])
+    
+    for source in (str(path), BytesIO(statement_files['Lloyds'])):
+        chunks = statement_parser.iter_csv_statement_chunks(source, 'Lloyds', chunksize=10)
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+
+def test_monzo_csv_is_categorized_from_its_category_column():
+    file_content = (b"Transaction ID,Date,Description,Category,Amount,Balance\n"
+                    b"tx_1,01/01/2025,Pret A Manger,Eating out,-4.50,95.50\n"
+                    b"tx_2,02/01/2025,Holiday,Savings pot,-50.00,45.50\n")
+    
+    chunks = list(statement_parser.iter_csv_statement_chunks(file_content, 'Monzo', chunksize=1))
+    df = pd.concat(chunks, ignore_index=True)
+    
+    assert len(chunks) == 2
+    assert df['Amount'].tolist() == [-4.5, -50.0]
+    assert df['Balance'].tolist() == [95.5, 45.5]
+    assert df['Category'].tolist() == ['Dining Out', 'Pot Transfer']
+
+
+def test_wrong_layout_stops_the_stream():
+    with pytest.raises(ValueError, match='Not a Barclays CSV layout'):
+        list(statement_parser.iter_csv_statement_chunks(b'Posted,Text\n01/01/2025,x\n', 'Barclays'))
@@ -0,0 +1,48 @@
+import pandas as pd
+
+import statement_parser
+
+
+def test_lloyds_layout_without_amount_columns_is_rejected():
+    file_content = (b"Transaction Date,Transaction Description,Sort Code,Balance\n"
+                    b"01/01/2025,TESCO STORES 2231,30-00-00,100.00\n")
+    
+    assert statement_parser.detect_statement_bank(file_content) == 'Lloyds'
+    assert statement_parser.parse_lloyds_statement(file_content) is None
+
+
+def test_lloyds_debit_and_credit_columns_make_the_amount():
+    file_content = (b"Transaction Date,Transaction Description,Debit Amount,Credit Amount,Balance\n"
+                    b"02/01/2025,SALARY,,2000.00,2100.00\n"
+                    b"01/01/2025,TESCO STORES 2231,12.50,,100.00\n")
+    
+    df = statement_parser.parse_lloyds_statement(file_content)
+    
+    assert df['Amount'].tolist() == [2000.0, -12.5]
+    assert df['Transaction Type'].tolist() == ['Income', 'Expense']
+
+
+def test_currency_strings_parse_to_signed_floats():
+    values = pd.Series(['£1,234.56', '(12.50)', '12.50 DR', '40.00CR', ' -3 ', 'n/a', None])
+    
+    parsed = statement_parser.parse_currency_series(values)
+    
+    assert parsed.tolist()[:5] == [1234.56, -12.5, -12.5, 40.0, -3.0]
+    assert parsed.iloc[5:].isna().all()
+
+
+def test_dates_outside_the_statement_format_fall_back_to_day_first():
+    dates = statement_parser.parse_date_series(pd.Series(['03/01/2025', '2025-01-04', '5 Jan 2025', 'soon', None]))
+    
+    assert dates.iloc[:3].tolist() == [pd.Timestamp(2025, 1, 3), pd.Timestamp(2025, 1, 4), pd.Timestamp(2025, 1, 5)]
+    assert dates.iloc[3:].isna().all()
+
+
+def test_every_bank_normalizes_to_the_shared_schema(statement_files):
+    for bank in ('Lloyds', 'Barclays'):
+        df = statement_parser.BANK_PARSERS[bank](statement_files[bank])
+        
+        assert df.columns.tolist() == statement_parser.TRANSACTION_COLUMNS
+        assert (df['Bank'] == bank).all()
+        assert pd.api.types.is_datetime64_dtype(df['Date'])
+        assert ((df['Amount'] > 0) == (df['Transaction Type'] == 'Income')).all()
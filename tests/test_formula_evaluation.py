@@ -0,0 +1,79 @@
+import io
+
+import openpyxl
+
+import workbook_reader
+
+
+def evaluate(rows, formulas, load_sheet=None):
+    grids = {'Sheet': [list(row) for row in rows]}
+    evaluated = workbook_reader.evaluate_workbook_formulas(grids, {'Sheet': formulas}, load_sheet)
+    return evaluated, grids
+
+
+def test_arithmetic_and_if():
+    evaluated, grids = evaluate([[1, 2, None], [3, 4, None]],
+                                [(1, 3, 'A1+B1'), (2, 3, 'IF(A2>2,"big","small")')])
+    
+    assert evaluated == 2
+    assert grids['Sheet'] == [[1, 2, 3], [3, 4, 'big']]
+
+
+def test_sumif_and_countif_criteria():
+    rows = [['Food', 200, None], ['Rent', 900, None], ['Food', 50, None], ['Fun', 100, None]]
+    evaluated, grids = evaluate(rows, [
+        (1, 3, 'SUMIF(A1:A4,"Food",B1:B4)'),
+        (2, 3, 'SUMIF(B1:B4,">=100")'),
+        (3, 3, 'COUNTIF(A1:A4,"<>Food")'),
+    ])
+    
+    assert evaluated == 3
+    assert [row[2] for row in grids['Sheet'][:3]] == [250, 1200, 2]
+
+
+def test_cycles_and_their_dependents_stay_empty():
+    evaluated, grids = evaluate([[None, None, 5, None, None]],
+                                [(1, 1, 'B1+1'), (1, 2, 'A1+1'), (1, 4, 'C1*2'), (1, 5, 'A1*2')])
+    
+    assert evaluated == 1
+    assert grids['Sheet'] == [[None, None, 5, 10, None]]
+
+
+def test_unsupported_functions_stay_empty():
+    evaluated, grids = evaluate([[None, None]], [(1, 1, 'VLOOKUP(1,B1:B2,1)'), (1, 2, 'A1')])
+    
+    assert evaluated == 0
+    assert grids['Sheet'] == [[None, None]]
+
+
+def test_other_sheets_are_loaded_and_evaluated_first():
+    def load_sheet(name):
+        return ([[1], [2], [None]], [(3, 1, 'A1+A2')]) if name == 'Data' else None
+    
+    evaluated, grids = evaluate([[None]], [(1, 1, 'SUM(Data!A1:A3)')], load_sheet)
+    
+    assert evaluated == 2
+    assert grids['Sheet'] == [[6]]
+    assert grids['Data'] == [[1], [2], [3]]
+
+
+def test_uncached_template_formulas_are_filled_in_when_reading():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Budget'
+    ws.append(['Category', 'Planned', 'Actual', 'Diff', 'Status'])
+    for row, (category, planned, actual) in enumerate([('Food', 200, 250), ('Rent', 900, 900),
+                                                       ('Fun', 100, 40), ('Food', 50, 20)], start=2):
+        ws.append([category, planned, actual, f'=C{row}-B{row}', f'=IF(C{row}>B{row},"Over","OK")'])
+    ws.append(['Food total', '=SUMIF(A2:A5,"Food",B2:B5)', '=SUMIF(A2:A5,"Food",C2:C5)', '=C6-B6',
+               '=COUNTIF(E2:E5,"Over")&" over"'])
+    ws.append(['Loop', '=C7+1', '=B7+1', '=B7', None])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    
+    df = workbook_reader.read_xlsx_sheets(buffer.getvalue(), workers=1, use_cache=False)['Budget']
+    
+    assert df['Diff'].iloc[:5].tolist() == [50, 0, -60, -30, 20]
+    assert df['Status'].iloc[:5].tolist() == ['Over', 'OK', 'OK', 'OK', '1 over']
+    assert df[['Planned', 'Actual']].iloc[4].tolist() == [250, 270]
+    assert df[['Planned', 'Actual', 'Diff']].iloc[5].isna().all()
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+import statement_parser
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(statement_parser, 'STATEMENT_CACHE_DIR', tmp_path / 'statements')
+
+
+def batch(statement_files):
+    # The picked bank is deliberately wrong; detection should route each file
+    return [(f'{bank}.statement', content, 'Barclays') for bank, content in statement_files.items()]
+
+
+def test_batch_ingest_merges_every_bank(statement_files):
+    ledger, report = statement_parser.ingest_statements(batch(statement_files), workers=1)
+    
+    assert report['Status'].tolist() == ['✅ Parsed'] * 3
+    assert report['Bank'].tolist() == ['Monzo', 'Lloyds', 'Barclays']
+    assert report['Rows'].sum() == len(ledger)
+    assert set(ledger['SourceFile']) == {'Monzo.statement', 'Lloyds.statement', 'Barclays.statement'}
+    for bank in statement_files:
+        assert (ledger.loc[ledger['SourceFile'] == f'{bank}.statement', 'Bank'] == bank).all()
+
+
+def test_worker_pool_matches_serial_ingest(statement_files):
+    serial, _ = statement_parser.ingest_statements(batch(statement_files), workers=1)
+    pooled, report = statement_parser.ingest_statements(batch(statement_files), workers=2)
+    
+    assert report['Status'].tolist() == ['✅ Parsed'] * 3
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_bad_file_is_reported_without_stopping_the_batch(statement_files):
+    files = [('notes.txt', b'not a statement\n', None),
+             ('Lloyds.statement', statement_files['Lloyds'], None)]
+    
+    ledger, report = statement_parser.ingest_statements(files, workers=1)
+    
+    assert report['Bank'].tolist() == ['Unknown', 'Lloyds']
+    assert report['Status'].tolist() == ['❌ Could not detect bank', '✅ Parsed']
+    assert set(ledger['SourceFile']) == {'Lloyds.statement'}
+
+
+def test_nothing_parsed_returns_no_ledger():
+    ledger, report = statement_parser.ingest_statements([('notes.txt', b'not a statement\n', None)])
+    
+    assert ledger is None
+    assert report['Rows'].tolist() == [0]
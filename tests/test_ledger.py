@@ -0,0 +1,50 @@
+import pandas as pd
+
+import statement_parser
+from generate_test_statements import generate_transactions, write_lloyds_csv
+
+
+def lloyds_statement(tmp_path, count=60):
+    path = tmp_path / 'lloyds.csv'
+    write_lloyds_csv(generate_transactions(count), str(path))
+    return statement_parser.parse_lloyds_statement(path.read_bytes())
+
+
+def test_reingesting_a_statement_adds_nothing(tmp_path):
+    ledger_path = tmp_path / 'ledger.parquet'
+    df = lloyds_statement(tmp_path)
+    
+    ledger, report = statement_parser.ingest_into_ledger(df, 'Lloyds', ledger_path)
+    assert report['new_rows'] == len(df)
+    
+    ledger, report = statement_parser.ingest_into_ledger(df, 'Lloyds', ledger_path)
+    assert report['status'] == 'up_to_date'
+    assert len(ledger) == len(df)
+    assert len(statement_parser.load_ledger(ledger_path)) == len(df)
+
+
+def test_overlapping_statement_appends_only_new_rows(tmp_path):
+    ledger_path = tmp_path / 'ledger.parquet'
+    df = statement_parser._in_chronological_order(lloyds_statement(tmp_path))
+    
+    statement_parser.ingest_into_ledger(df.iloc[:40], 'Lloyds', ledger_path)
+    ledger, report = statement_parser.ingest_into_ledger(df.iloc[20:], 'Lloyds', ledger_path)
+    
+    assert report['new_rows'] == 20
+    assert ledger['Amount'].tolist() == df['Amount'].tolist()
+
+
+def test_reingesting_without_balances_skips_known_rows(tmp_path):
+    ledger_path = tmp_path / 'ledger.parquet'
+    df = statement_parser._in_chronological_order(lloyds_statement(tmp_path)).assign(Balance=float('nan'))
+    # The same purchase twice on one day is two transactions, not a duplicate
+    twice = df.iloc[[-1]]
+    df = pd.concat([df, twice], ignore_index=True)
+    
+    statement_parser.ingest_into_ledger(df.iloc[:-1], 'Lloyds', ledger_path)
+    ledger, report = statement_parser.ingest_into_ledger(df, 'Lloyds', ledger_path)
+    assert report['new_rows'] == 1
+    
+    ledger, report = statement_parser.ingest_into_ledger(df, 'Lloyds', ledger_path)
+    assert report['status'] == 'up_to_date'
+    assert len(ledger) == len(df)
@@ -0,0 +1,42 @@
+import io
+
+import openpyxl
+
+import workbook_reader
+
+
+def test_whole_column_merge_is_indexed_only_up_to_the_last_row(monkeypatch):
+    built = []
+    original = workbook_reader.build_merged_cell_index
+    
+    def build(merged_ranges, max_row=None):
+        index = original(merged_ranges, max_row)
+        built.append(len(index))
+        return index
+    
+    monkeypatch.setattr(workbook_reader, 'build_merged_cell_index', build)
+    rows = [('Date', 'Item', 'Amount', 'Category', 'Type', None)] + \
+        [('2025-01-01', f'Item {i}', i, 'Food', 'Card', None) for i in range(10)]
+    
+    df = workbook_reader.rows_to_dataframe(rows, merged_ranges=[(6, 1, 6, 1048576)])
+    
+    assert built == [len(rows)]
+    assert len(df) == 10
+
+
+def test_merged_header_cells_and_banners():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws['A1'] = 'Weekly Stock'
+    ws.merge_cells('A1:E1')
+    ws.append(['Date', 'Item', 'Amount', 'Category', 'Type'])
+    ws.merge_cells('D2:E2')
+    ws.append(['2025-01-01', 'Rice', 2, 'Food', 'Dry'])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    
+    for sheets in (workbook_reader.read_xlsx_sheets(buffer.getvalue(), workers=1, use_cache=False),
+                   workbook_reader.read_openpyxl_sheets(buffer.getvalue())):
+        df = sheets['Sheet']
+        assert list(df.columns) == ['Date', 'Item', 'Amount', 'Category', 'Category.1']
+        assert df.iloc[0].tolist() == ['2025-01-01', 'Rice', 2, 'Food', 'Dry']
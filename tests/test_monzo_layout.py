@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+import statement_parser
+
+pytest.importorskip('pdfminer')
+
+HEADER = [(40, 60, 700, 690, 'Date'), (110, 160, 700, 690, 'Description'),
+          (400, 450, 700, 690, '(GBP) Amount'), (480, 530, 700, 690, '(GBP) Balance')]
+
+
+def parse_fragments(monkeypatch, pages):
+    monkeypatch.setattr(statement_parser, 'iter_pdf_page_texts', lambda *args, **kwargs: iter(pages))
+    return list(statement_parser.iter_monzo_layout_transactions(b''))
+
+
+def row(top, date, description, amount, balance):
+    cells = [(40, 'date', date), (110, 'description', description), (400, 'amount', amount), (480, 'balance', balance)]
+    return [(x0, x0 + 40, top, top - 9, text) for x0, _, text in cells if text]
+
+
+def test_layout_parser_matches_text_parser(statement_files):
+    text = statement_parser.parse_monzo_pdf_statement(statement_files['Monzo'], layout=False)
+    layout = statement_parser.parse_monzo_pdf_statement(statement_files['Monzo'], layout=True)
+    
+    pd.testing.assert_frame_equal(layout, text)
+    assert layout.attrs == text.attrs
+
+
+def test_fields_go_to_the_nearest_header_column(monkeypatch):
+    records = parse_fragments(monkeypatch, [
+        HEADER + row(680, '01/01/2025', 'Coffee shop', '-3.50', '96.50')
+               + row(664, '', 'Second coffee', '-£1,003.50', '£2,093.00'),
+    ])
+    
+    assert [(r['Date'], r['Description'], r['Amount'], r['Balance']) for r in records] == [
+        ('01/01/2025', 'Coffee shop', -3.5, 96.5),
+        ('01/01/2025', 'Second coffee', -1003.5, 2093.0),
+    ]
+
+
+def test_wrapped_description_joins_the_row_above(monkeypatch):
+    records = parse_fragments(monkeypatch, [
+        HEADER + row(680, '01/01/2025', 'Deliveroo', '-12.40', '84.10')
+               + [(110, 150, 670, 661, 'order 1234')]
+               + [(110, 150, 500, 491, 'Page footer')],
+    ])
+    
+    assert len(records) == 1
+    assert records[0]['Description'] == 'Deliveroo order 1234'
+
+
+def test_lines_before_the_header_are_ignored(monkeypatch):
+    records = parse_fragments(monkeypatch, [
+        [(40, 90, 760, 751, '01/01/2025'), (400, 450, 760, 751, '9.99')] + HEADER,
+    ])
+    
+    assert records == []
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('-12.00', -12.0), ('£1,234.56', 1234.56), ('+£5.00', 5.0), ('-£ 7.25', -7.25), ('12', None), ('Coffee', None),
+])
+def test_layout_amount_cells(text, expected):
+    assert statement_parser._parse_layout_amount(text) == expected
@@ -0,0 +1,72 @@
+import pytest
+
+import statement_parser
+from generate_test_statements import generate_transactions, write_monzo_pdf
+
+
+def parse_pages(monkeypatch, pages):
+    monkeypatch.setattr(statement_parser, 'iter_pdf_page_texts', lambda *args, **kwargs: iter(pages))
+    return list(statement_parser.iter_monzo_transactions(b''))
+
+
+def test_amounts_on_the_next_page_stay_with_their_record(monkeypatch):
+    records = parse_pages(monkeypatch, [
+        "Personal Account statement\n01/01/2025Coffee shop -3.50 96.50\n02/01/2025Deliveroo order",
+        "\n-12.40 84.10\n",
+        "03/01/2025Salary 2000.00 2084.10\n",
+    ])
+    
+    assert [(r['Date'], r['Description'], r['Amount'], r['Balance']) for r in records] == [
+        ('01/01/2025', 'Coffee shop', -3.5, 96.5),
+        ('02/01/2025', 'Deliveroo order', -12.4, 84.1),
+        ('03/01/2025', 'Salary', 2000.0, 2084.1),
+    ]
+
+
+def test_description_split_over_pages_without_dates(monkeypatch):
+    records = parse_pages(monkeypatch, [
+        "01/01/2025TESCO",
+        " STORES",
+        " 2231 -20.00 80.00",
+    ])
+    
+    assert len(records) == 1
+    assert records[0]['Amount'] == -20.0
+    assert records[0]['Balance'] == 80.0
+    assert records[0]['Description'].split() == ['TESCO', 'STORES', '2231']
+
+
+
+def test_descriptions_outside_the_strict_pattern_keep_their_balance(monkeypatch):
+    records = parse_pages(monkeypatch, [
+        "01/01/2025McDonald's & Co -4.99 95.01\n02/01/2025Coffee shop -3.50 91.51\n",
+    ])
+    
+    assert [(r['Description'], r['Amount'], r['Balance']) for r in records] == [
+        ("McDonald's & Co", -4.99, 95.01),
+        ('Coffee shop', -3.5, 91.51),
+    ]
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_generated_statement_round_trips(tmp_path, monkeypatch, workers):
+    transactions = generate_transactions(120)
+    path = tmp_path / 'monzo.pdf'
+    write_monzo_pdf(transactions, str(path))
+    monkeypatch.setattr(statement_parser, 'PDF_PARALLEL_MIN_PAGES', 1)
+    
+    df = statement_parser.parse_monzo_pdf_statement(path.read_bytes(), workers=workers)
+    
+    assert len(df) == len(transactions)
+    assert df['Amount'].round(2).tolist() == [round(t['amount'], 2) for t in transactions]
+
+
+@pytest.mark.parametrize('layout', [False, True])
+def test_page_pool_matches_serial_extraction(tmp_path, layout):
+    path = tmp_path / 'monzo.pdf'
+    write_monzo_pdf(generate_transactions(120), str(path))
+    file_content = path.read_bytes()
+    
+    pooled = list(statement_parser.iter_pdf_page_texts(file_content, workers=2, min_pages=1, layout=layout))
+    
+    assert len(pooled) > 1
+    assert pooled == list(statement_parser.iter_pdf_page_texts(file_content, workers=1, layout=layout))
@@ -0,0 +1,48 @@
+import concurrent.futures
+
+import pandas as pd
+
+import statement_parser
+from generate_test_statements import generate_transactions, write_barclays_csv
+
+
+class CountingExecutor(concurrent.futures.ProcessPoolExecutor):
+    started = 0
+    
+    def __init__(self, *args, **kwargs):
+        CountingExecutor.started += 1
+        super().__init__(*args, **kwargs)
+
+
+def test_csv_chunks_can_reach_the_pool():
+    assert statement_parser.CATEGORY_PARALLEL_MIN_UNIQUES <= statement_parser.STATEMENT_CSV_CHUNKSIZE
+
+
+def test_pool_matches_in_process_categorization(monkeypatch):
+    descriptions = pd.Series([t['description'] for t in generate_transactions(3000)] + [None, ''])
+    monkeypatch.setattr(statement_parser, 'ProcessPoolExecutor', CountingExecutor)
+    CountingExecutor.started = 0
+    
+    pooled = statement_parser.categorize_series_parallel(descriptions, workers=2, min_uniques=1, chunksize=100)
+    
+    assert CountingExecutor.started == 1
+    pd.testing.assert_series_equal(pooled, statement_parser.categorize_series_parallel(descriptions, workers=1))
+
+
+def test_csv_ingest_categorizes_chunks_in_the_pool(tmp_path, monkeypatch):
+    path = tmp_path / 'barclays.csv'
+    write_barclays_csv(generate_transactions(400), str(path))
+    file_content = path.read_bytes()
+    serial = statement_parser.parse_barclays_statement(file_content)
+    
+    monkeypatch.setattr(statement_parser, 'ProcessPoolExecutor', CountingExecutor)
+    monkeypatch.setattr(statement_parser, 'CATEGORY_WORKERS', 2)
+    monkeypatch.setattr(statement_parser, 'CATEGORY_PARALLEL_MIN_UNIQUES', 20)
+    monkeypatch.setattr(statement_parser, 'CATEGORY_PARALLEL_CHUNKSIZE', 10)
+    monkeypatch.setattr(statement_parser, 'STATEMENT_CSV_CHUNKSIZE', 150)
+    CountingExecutor.started = 0
+    
+    pooled = statement_parser.parse_barclays_statement(file_content)
+    
+    assert CountingExecutor.started == 3
+    pd.testing.assert_frame_equal(pooled, serial)
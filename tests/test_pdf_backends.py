@@ -0,0 +1,59 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+import statement_parser
+
+BACKENDS = [
+    pytest.param('pypdf2', marks=pytest.mark.filterwarnings('ignore::DeprecationWarning')),
+    'pypdf',
+    'pdfminer',
+    pytest.param('pdftotext', marks=pytest.mark.skipif(shutil.which('pdftotext') is None,
+                                                       reason='poppler-utils not installed')),
+]
+BACKEND_MODULES = {'pypdf2': 'PyPDF2', 'pypdf': 'pypdf', 'pdfminer': 'pdfminer'}
+
+
+@pytest.fixture
+def monzo_pdf(statement_files):
+    return statement_files['Monzo']
+
+
+def require_backend(backend):
+    if backend in BACKEND_MODULES:
+        pytest.importorskip(BACKEND_MODULES[backend])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_every_backend_parses_the_same_transactions(monzo_pdf, backend):
+    require_backend(backend)
+    expected = statement_parser.parse_monzo_pdf_statement(monzo_pdf, workers=1, backend='pypdf2')
+    
+    df = statement_parser.parse_monzo_pdf_statement(monzo_pdf, workers=1, backend=backend)
+    
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_page_counts_and_ranges_agree(monzo_pdf, backend):
+    require_backend(backend)
+    pages = list(statement_parser.PDF_TEXT_BACKENDS[backend](monzo_pdf))
+    
+    assert statement_parser.count_pdf_pages(monzo_pdf, backend=backend) == len(pages) == 2
+    assert list(statement_parser.PDF_TEXT_BACKENDS[backend](monzo_pdf, range(1, 2))) == pages[1:]
+
+
+def test_paths_and_file_objects_count_like_bytes(monzo_pdf, tmp_path):
+    path = tmp_path / 'monzo.pdf'
+    path.write_bytes(monzo_pdf)
+    
+    assert statement_parser.count_pdf_pages(path, backend='pypdf') == 2
+    with open(path, 'rb') as f:
+        assert statement_parser.count_pdf_pages(f, layout=True) == 2
+
+
+def test_unknown_backend_is_rejected(monzo_pdf):
+    with pytest.raises(ValueError, match="Unknown PDF text backend 'poppler'"):
+        statement_parser.count_pdf_pages(monzo_pdf, backend='poppler')
+    assert statement_parser.parse_monzo_pdf_statement(monzo_pdf, backend='poppler') is None
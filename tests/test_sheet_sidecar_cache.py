@@ -0,0 +1,103 @@
+import io
+import os
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import workbook_reader
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_reader, 'EXCEL_SHEET_CACHE_DIR', tmp_path / 'sheets')
+    return tmp_path / 'sheets'
+
+
+def workbook_bytes(extra_rows=0):
+    wb = openpyxl.Workbook()
+    wb.active.title = 'Expenses'
+    for i in range(extra_rows):
+        wb.active.append([f'New item {i}'])
+    wb.active.append(['Date', 'Item', 'Amount', 'Category', 'Type'])
+    wb.active.append(['01/01/2025', 'Coffee', 3.5, 'Food', 'Card'])
+    for title in ('Income', 'Savings'):
+        ws = wb.create_sheet(title)
+        ws.append(['Date', 'Source', 'Amount', 'Category', 'Notes'])
+        for day in range(1, 11):
+            ws.append([f'{day:02d}/01/2025', f'{title} {day}', day * 10, title, 'Coffee'])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def parsed_sheets(monkeypatch):
+    parsed = []
+    sheet_frame = workbook_reader._xlsx_sheet_frame
+    monkeypatch.setattr(workbook_reader, '_xlsx_sheet_frame',
+                        lambda zf, name, *args: parsed.append(name) or sheet_frame(zf, name, *args))
+    return parsed
+
+
+def test_only_changed_sheets_are_parsed_again(cache_dir, monkeypatch):
+    workbook_reader.read_xlsx_sheets(workbook_bytes(), workers=1, use_cache=True)
+    parsed = parsed_sheets(monkeypatch)
+    changed = workbook_bytes(extra_rows=2)
+    
+    sheets = workbook_reader.read_xlsx_sheets(changed, workers=1, use_cache=True)
+    
+    assert parsed == ['Expenses']
+    expected = workbook_reader.read_xlsx_sheets(changed, workers=1, use_cache=False)
+    for name in expected:
+        pd.testing.assert_frame_equal(sheets[name], expected[name], obj=name)
+
+
+def test_key_follows_shared_string_text_not_indices():
+    sheet_xml = b'<sheetData><row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row></sheetData>'
+    renumbered = b'<sheetData><row r="1"><c r="A1" t="s"><v>2</v></c><c r="B1" t="s"><v>0</v></c></row></sheetData>'
+    
+    def key(xml, shared_strings):
+        return workbook_reader.sheet_cache_key(xml, shared_strings, set(), set(), None)
+    
+    assert key(sheet_xml, ['Coffee', 'Food']) == key(renumbered, ['Food', 'New item', 'Coffee'])
+    assert key(sheet_xml, ['Coffee', 'Food']) != key(sheet_xml, ['Coffee', 'Drink'])
+    assert key(sheet_xml, ['Coffee', 'Food']) != workbook_reader.sheet_cache_key(
+        sheet_xml, ['Coffee', 'Food'], {14}, set(), None)
+
+
+def test_cache_is_off_by_default(cache_dir, monkeypatch):
+    monkeypatch.setattr(workbook_reader, 'EXCEL_SHEET_CACHE_ENABLED', False)
+    
+    workbook_reader.read_xlsx_sheets(workbook_bytes(), workers=1)
+    
+    assert not cache_dir.exists()
+
+
+def test_unreadable_sidecar_is_parsed_again(cache_dir, monkeypatch):
+    expected = workbook_reader.read_xlsx_sheets(workbook_bytes(), workers=1, use_cache=True)
+    for path in cache_dir.glob('*.arrow'):
+        path.write_bytes(b'not arrow')
+    parsed = parsed_sheets(monkeypatch)
+    
+    sheets = workbook_reader.read_xlsx_sheets(workbook_bytes(), workers=1, use_cache=True)
+    
+    assert sorted(parsed) == ['Expenses', 'Income', 'Savings']
+    for name in expected:
+        pd.testing.assert_frame_equal(sheets[name], expected[name], obj=name)
+
+
+def test_sidecars_past_the_size_cap_are_evicted_oldest_first(cache_dir, monkeypatch):
+    df = pd.DataFrame({'Amount': range(100)})
+    workbook_reader.store_cached_sheet('first', df)
+    entry_size = (cache_dir / 'first.arrow').stat().st_size
+    os.utime(cache_dir / 'first.arrow', (1, 1))
+    monkeypatch.setattr(workbook_reader, 'EXCEL_SHEET_CACHE_MAX_BYTES', 2 * entry_size)
+    
+    workbook_reader.store_cached_sheet('second', df)
+    workbook_reader.store_cached_sheet('third', df)
+    
+    assert sorted(path.stem for path in cache_dir.glob('*.arrow')) == ['second', 'third']
+    pd.testing.assert_frame_equal(workbook_reader.load_cached_sheet('third'), df)
+    assert workbook_reader.load_cached_sheet('first') is None
@@ -0,0 +1,59 @@
+import os
+import time
+
+import pytest
+
+import statement_parser
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(statement_parser, 'STATEMENT_CACHE_DIR', tmp_path / 'statements')
+    return tmp_path / 'statements'
+
+
+def counting_parser(monkeypatch, bank):
+    calls = []
+    parser = statement_parser.BANK_PARSERS[bank]
+    monkeypatch.setitem(statement_parser.BANK_PARSERS, bank,
+                        lambda file_content: calls.append(1) or parser(file_content))
+    return calls
+
+
+def test_second_parse_of_the_same_bytes_comes_from_the_cache(cache_dir, monkeypatch, statement_files):
+    calls = counting_parser(monkeypatch, 'Lloyds')
+    
+    first = statement_parser.parse_statement_cached(statement_files['Lloyds'], 'Lloyds')
+    second = statement_parser.parse_statement_cached(statement_files['Lloyds'], 'Lloyds')
+    
+    assert len(calls) == 1
+    assert first.equals(second)
+    assert len(list(cache_dir.glob('*.parquet'))) == 1
+
+
+def test_key_follows_content_bank_and_parser_version(statement_files, monkeypatch):
+    key = statement_parser.statement_cache_key(statement_files['Lloyds'], 'Lloyds')
+    
+    assert key == statement_parser.statement_cache_key(statement_files['Lloyds'], 'Lloyds')
+    assert key != statement_parser.statement_cache_key(statement_files['Lloyds'] + b'\n', 'Lloyds')
+    assert key != statement_parser.statement_cache_key(statement_files['Lloyds'], 'Barclays')
+    monkeypatch.setattr(statement_parser, 'STATEMENT_PARSER_VERSION', 'test')
+    assert key != statement_parser.statement_cache_key(statement_files['Lloyds'], 'Lloyds')
+
+
+def test_eviction_drops_least_recently_used_entries(cache_dir, statement_files):
+    df = statement_parser.BANK_PARSERS['Lloyds'](statement_files['Lloyds'])
+    for age, key in enumerate(['old', 'middle', 'new']):
+        statement_parser.store_cached_statement(key, df)
+        past = time.time() - 100 + age
+        os.utime(cache_dir / f'{key}.parquet', (past, past))
+    # Reading an entry makes it the most recently used
+    assert statement_parser.load_cached_statement('old') is not None
+    entry_size = (cache_dir / 'new.parquet').stat().st_size + (cache_dir / 'new.json').stat().st_size
+    
+    statement_parser.evict_statement_cache(max_bytes=2 * entry_size)
+    
+    assert sorted(path.stem for path in cache_dir.glob('*.parquet')) == ['new', 'old']
+    assert not (cache_dir / 'middle.json').exists()
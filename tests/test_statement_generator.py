@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+import statement_parser
+from benchmark_parsers import run_benchmark
+from generate_test_statements import generate_transactions
+
+
+def test_transactions_are_deterministic_with_running_balances():
+    transactions = generate_transactions(300)
+    
+    assert transactions == generate_transactions(300)
+    assert transactions != generate_transactions(300, seed=1)
+    balance = 1500.0
+    for t in transactions:
+        balance = round(balance + t['amount'], 2)
+        assert t['balance'] == balance
+    assert any(t['description'].startswith('Transfer to pot') for t in transactions)
+    assert any(t['description'] == 'Salary ACME Ltd' for t in transactions)
+
+
+@pytest.mark.parametrize('bank', ['Monzo', 'Lloyds', 'Barclays'])
+def test_every_generated_statement_parses_back(statement_files, bank):
+    expected = generate_transactions(60)
+    
+    df = statement_parser.BANK_PARSERS[bank](statement_files[bank])
+    # Lloyds exports run newest first
+    df = df[::-1].reset_index(drop=True) if bank == 'Lloyds' else df
+    
+    assert df['Date'].dt.date.tolist() == [t['date'] for t in expected]
+    assert df['Amount'].tolist() == [t['amount'] for t in expected]
+    if bank != 'Barclays':
+        assert df['Balance'].tolist() == [t['balance'] for t in expected]
+
+
+def test_benchmark_reports_every_parser(monkeypatch):
+    monkeypatch.setattr(statement_parser, 'PDF_EXTRACTION_WORKERS', statement_parser.PDF_EXTRACTION_WORKERS)
+    
+    report = run_benchmark([20])
+    
+    assert report['Parser'].tolist() == ['Monzo PDF', 'Lloyds CSV', 'Barclays CSV']
+    assert (report['Rows Parsed'] == 20).all()
+    assert isinstance(report, pd.DataFrame)
@@ -0,0 +1,55 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import workbook_reader
+
+
+def typed(values):
+    return workbook_reader._typed_column(pd.Series(values, dtype=object))
+
+
+def test_numbers_and_dates_keep_their_dtypes():
+    amounts = typed([12.5, 3, None, np.nan])
+    dates = typed([datetime.datetime(2025, 1, 1), datetime.date(2025, 1, 2), None])
+    
+    assert pd.api.types.is_float_dtype(amounts)
+    assert amounts.tolist()[:2] == [12.5, 3.0]
+    assert pd.api.types.is_datetime64_dtype(dates)
+    assert dates.iloc[1] == pd.Timestamp(2025, 1, 2)
+    assert pd.isna(dates.iloc[2])
+    assert pd.api.types.is_integer_dtype(typed([1, 2, 3]))
+
+
+@pytest.mark.parametrize('values, expected', [
+    (['  Coffee ', 'Lunch', '   ', None], ['Coffee', 'Lunch', None, None]),
+    ([datetime.datetime(2025, 1, 1), 'Total'], ['2025-01-01 00:00:00', 'Total']),
+    ([1, 'n/a', 2.5], ['1', 'n/a', '2.5']),
+])
+def test_text_and_mixed_columns_become_stripped_strings(values, expected):
+    column = typed(values)
+    
+    assert column.dtype == object
+    assert [None if pd.isna(value) else value for value in column] == expected
+
+
+def test_other_columns_are_left_alone():
+    flags = typed([True, False, None])
+    
+    assert flags.tolist() == [True, False, None]
+
+
+def test_worksheet_frames_are_typed_per_column():
+    rows = [('Date', 'Item', 'Amount', 'Category', 'Type'),
+            (datetime.datetime(2025, 1, 1), 'Coffee', 3.5, 'Food', 'Card'),
+            (datetime.datetime(2025, 1, 2), ' Lunch ', 8, 'Food', None),
+            ('Total', None, 11.5, None, None)]
+    
+    df = workbook_reader.rows_to_dataframe(rows)
+    
+    assert pd.api.types.is_float_dtype(df['Amount'])
+    assert df['Item'].tolist()[:2] == ['Coffee', 'Lunch']
+    assert df['Date'].tolist()[-1] == 'Total'
+    assert pd.api.types.is_datetime64_dtype(workbook_reader.rows_to_dataframe(rows[:-1])['Date'])
@@ -0,0 +1,52 @@
+import collections
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import openpyxl
+
+import workbook_reader
+
+
+def small_workbook(rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['Date', 'Item', 'Amount', 'Category', 'Type'])
+    for row in range(rows):
+        ws.append([f'2025-01-{row % 28 + 1:02d}', f'Item {row}', row, 'Groceries', 'Card'])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def test_repeat_reads_come_from_the_cache(monkeypatch):
+    monkeypatch.setattr(workbook_reader, '_workbook_cache', collections.OrderedDict())
+    monkeypatch.setattr(workbook_reader, '_workbook_cache_bytes', 0)
+    file_content = small_workbook(20)
+    
+    first = workbook_reader.read_workbook_sheets(file_content)
+    monkeypatch.setitem(workbook_reader.EXCEL_READ_ENGINES, workbook_reader.EXCEL_READ_ENGINE,
+                        lambda content: (_ for _ in ()).throw(AssertionError("read again")))
+    second = workbook_reader.read_workbook_sheets(file_content)
+    
+    assert list(first) == list(second)
+    assert all(first[name].equals(second[name]) for name in first)
+
+
+def test_concurrent_sessions_keep_the_size_accounting_right(monkeypatch):
+    monkeypatch.setattr(workbook_reader, '_workbook_cache', collections.OrderedDict())
+    monkeypatch.setattr(workbook_reader, '_workbook_cache_bytes', 0)
+    workbooks = [small_workbook(rows) for rows in range(5, 25)]
+    for file_content in workbooks:
+        workbook_reader.read_workbook_sheets(file_content)
+    sizes = [size for _, size in workbook_reader._workbook_cache.values()]
+    # Room for about a third of the workbooks, so sessions keep evicting each other
+    monkeypatch.setattr(workbook_reader, 'WORKBOOK_CACHE_MAX_BYTES', sum(sizes) // 3)
+    monkeypatch.setattr(workbook_reader, '_workbook_cache', collections.OrderedDict())
+    monkeypatch.setattr(workbook_reader, '_workbook_cache_bytes', 0)
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(workbook_reader.read_workbook_sheets, workbooks * 5))
+    
+    cached_sizes = [size for _, size in workbook_reader._workbook_cache.values()]
+    assert workbook_reader._workbook_cache_bytes == sum(cached_sizes)
+    assert workbook_reader._workbook_cache_bytes <= workbook_reader.WORKBOOK_CACHE_MAX_BYTES
@@ -0,0 +1,69 @@
+import datetime
+import io
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import workbook_reader
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def tracker_workbook():
+    """A two-sheet tracker with a merged banner, blanks and mixed value types."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Income'
+    ws['A1'] = 'Monthly Income'
+    ws.merge_cells('A1:E1')
+    ws.append(['Date', 'Source', 'Amount', 'Category', 'Notes'])
+    for day in range(1, 31):
+        ws.append([datetime.datetime(2025, 1, day), f'Client {day % 4}', day * 12.5,
+                   'Work' if day % 3 else 'Side', None if day % 5 else 'paid late'])
+    ws.append(['Total', None, 5812.5, None, None])
+    
+    ws = wb.create_sheet('Purchases')
+    ws.append(['Date', 'Item', 'Amount', 'Category', 'Type'])
+    for day in range(1, 16):
+        ws.append([datetime.date(2025, 2, day), f'Item {day}', day, 'Groceries', 'Card' if day % 2 else None])
+    
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def assert_same_sheets(left, right):
+    assert list(left) == list(right)
+    for name in right:
+        pd.testing.assert_frame_equal(left[name], right[name], obj=name)
+
+
+@pytest.mark.parametrize('workbook', [
+    pytest.param(tracker_workbook, id='generated'),
+    pytest.param(lambda: (REPO_DIR / 'Enhanced_Budget_Tracker.xlsx').read_bytes(), id='Enhanced_Budget_Tracker'),
+    pytest.param(lambda: (REPO_DIR / 'TempJan2025.xlsx').read_bytes(), id='TempJan2025'),
+])
+def test_xlsx_engine_matches_openpyxl(workbook):
+    file_content = workbook()
+    
+    assert_same_sheets(workbook_reader.read_xlsx_sheets(file_content, workers=1, use_cache=False),
+                       workbook_reader.read_openpyxl_sheets(file_content))
+
+
+def test_sheet_pool_matches_serial_read():
+    file_content = tracker_workbook()
+    
+    assert_same_sheets(workbook_reader.read_xlsx_sheets(file_content, workers=2, min_bytes=0, use_cache=False),
+                       workbook_reader.read_xlsx_sheets(file_content, workers=1, use_cache=False))
+
+
+def test_sheet_cache_round_trip(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(workbook_reader, 'EXCEL_SHEET_CACHE_DIR', tmp_path)
+    file_content = tracker_workbook()
+    
+    stored = workbook_reader.read_xlsx_sheets(file_content, workers=1, use_cache=True)
+    assert list(tmp_path.iterdir())
+    assert_same_sheets(workbook_reader.read_xlsx_sheets(file_content, workers=1, use_cache=True), stored)
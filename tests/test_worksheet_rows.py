@@ -0,0 +1,50 @@
+import io
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import workbook_reader
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.parametrize('name', ['Enhanced_Budget_Tracker.xlsx', 'TempJan2025.xlsx'])
+def test_read_only_worksheets_read_like_regular_ones(name):
+    file_content = (REPO_DIR / name).read_bytes()
+    regular = openpyxl.load_workbook(io.BytesIO(file_content), data_only=True)
+    streamed = openpyxl.load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+    
+    try:
+        for sheet in regular.worksheets:
+            pd.testing.assert_frame_equal(workbook_reader.worksheet_to_dataframe(streamed[sheet.title]),
+                                          workbook_reader.worksheet_to_dataframe(sheet), obj=sheet.title)
+    finally:
+        streamed.close()
+
+
+def test_header_search_skips_leading_rows_and_pads_ragged_rows():
+    rows = [('My budget',), (), ('Date', 'Item', 'Amount', 'Category', 'Type'),
+            ('01/01/2025', 'Coffee', 3.5), ('02/01/2025', 'Lunch', 8, 'Food', 'Card', 'extra')]
+    
+    df = workbook_reader.rows_to_dataframe(iter(rows))
+    
+    assert df.columns.tolist() == ['Date', 'Item', 'Amount', 'Category', 'Type', 'Column_6']
+    assert df['Amount'].tolist() == [3.5, 8.0]
+    assert df['Column_6'].tolist()[1] == 'extra'
+    assert pd.isna(df['Category'].iloc[0])
+
+
+def test_first_non_empty_row_is_the_header_when_none_looks_like_one():
+    rows = [(None, None), ('Week', 'Hours'), ('1', 40), (None, None), ('2', 38)]
+    
+    df = workbook_reader.rows_to_dataframe(rows)
+    
+    assert df.columns.tolist() == ['Week', 'Hours']
+    assert df['Hours'].tolist() == [40, 38]
+
+
+@pytest.mark.parametrize('rows', [[], [(None, None)], [('Date', 'Item', 'Amount', 'Category', 'Type')]])
+def test_sheets_without_data_are_empty(rows):
+    assert workbook_reader.rows_to_dataframe(rows).empty
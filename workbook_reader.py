@@ -0,0 +1,1252 @@
+"""Reading tracker workbooks into DataFrames.
+
+The worksheet-to-DataFrame conversion (typed columns, merged header cells),
+the direct zipfile/iterparse .xlsx reader and its sheet pool, the openpyxl
+fallback engine, the evaluator for formulas saved without cached values and
+the workbook and sheet caches. Nothing here imports Streamlit, so the reader's
+pool workers never run generator.py's page setup.
+"""
+
+import bisect
+import collections
+import datetime
+import hashlib
+import io
+import math
+import operator
+import os
+import re
+import threading
+import weakref
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string
+from openpyxl.utils.datetime import to_excel
+
+from statement_parser import FINANCE_CACHE_DIR, evict_statement_cache
+
+# Words that mark a tracker sheet's header row
+WORKSHEET_HEADER_KEYWORDS = ['date', 'amount', 'source', 'description', 'category', 'type', 'name', 'item']
+
+def _is_header_row(row):
+    """A header has its first 5 cells filled and at least one header keyword."""
+    if any(cell is None for cell in row[:5]):  # First 5 columns shouldn't be empty in a header
+        return False
+    return any(any(kw in str(cell).lower() for kw in WORKSHEET_HEADER_KEYWORDS) for cell in row if cell)
+
+# Inferred value kinds that become numeric / datetime columns
+NUMERIC_VALUE_KINDS = {'integer', 'floating', 'mixed-integer-float', 'decimal'}
+DATETIME_VALUE_KINDS = {'datetime', 'datetime64', 'date'}
+
+def _typed_column(column):
+    """Give a raw worksheet column its natural dtype.
+    
+    Numbers become numeric and dates datetime64. Text and mixed columns (a
+    date column with a "Total" label, say) become stripped strings, which
+    keeps them Arrow-friendly for st.dataframe; blank cells turn into missing
+    values. Anything else (booleans, times) is left as it is.
+    """
+    kind = pd.api.types.infer_dtype(column, skipna=True)
+    if kind in NUMERIC_VALUE_KINDS:
+        return pd.to_numeric(column, errors='coerce')
+    if kind in DATETIME_VALUE_KINDS:
+        return pd.to_datetime(column, errors='coerce')
+    if kind in ('string', 'mixed', 'mixed-integer'):
+        column = column.map(lambda value: str(value).strip(), na_action='ignore')
+        return column.where(column.ne(''))
+    return column
+
+def worksheet_to_dataframe(sheet):
+    """Converts an openpyxl worksheet to a pandas DataFrame.
+    
+    Works with regular and read-only (streaming) worksheets; see
+    rows_to_dataframe for how the rows are cleaned.
+    """
+    return rows_to_dataframe(sheet.iter_rows(values_only=True), sheet.title, worksheet_merged_ranges(sheet),
+                             sheet.max_row)
+
+def rows_to_dataframe(rows, title='sheet', merged_ranges=None, max_row=None):
+    """Converts a sheet's rows (tuples of cell values) to a pandas DataFrame.
+    
+    This function is designed to be robust and work with various Excel formats,
+    whichever reader produced the rows. It will:
+    1. Find the first row that looks like a header, stopping the search there.
+       Cells hidden under a merge take the merge's value, and title banners
+       (a single value merged across the row) are never taken as the header
+    2. Read all subsequent rows as data straight from the row iterator
+    3. Keep numbers and dates typed, stripping whitespace from text
+    4. Clean up empty rows and columns
+    5. Preserve all data (no aggressive filtering)
+    
+    Args:
+        rows: Iterable of row tuples, starting at row 1 column A
+        title (str): Sheet name, for error messages
+        merged_ranges (list, optional): (min_col, min_row, max_col, max_row)
+            of each merged range on the sheet
+        max_row (int, optional): The sheet's last row, so merges running to
+            the bottom of the sheet aren't indexed for a million rows.
+            Defaults to len(rows) when rows is a list.
+    """
+    try:
+        if max_row is None and hasattr(rows, '__len__'):
+            max_row = len(rows)
+        rows = iter(rows)
+        merge_index = build_merged_cell_index(merged_ranges or (), max_row)
+        anchor_values = {}
+
+        # 1. Find the header row by looking for common header keywords. Rows
+        # before it are only kept in case no header turns up at all.
+        header = None
+        leading_rows = []
+        for row_number, row in enumerate(rows, start=1):
+            if row_number in merge_index:
+                if _is_merged_banner(merge_index, row_number, row):
+                    continue
+                row = _fill_merged_cells(merge_index, row_number, row, anchor_values)
+            if _is_header_row(row):
+                header = row
+                break
+            leading_rows.append(row)
+        
+        if header is not None:
+            data = list(rows)
+        else:
+            # If no header found, try to use the first non-empty row as header
+            first = next((i for i, row in enumerate(leading_rows) if any(cell is not None for cell in row)), None)
+            if first is None:
+                return pd.DataFrame()  # No data found
+            header = leading_rows[first]
+            data = leading_rows[first + 1:]
+
+        if not data:
+            return pd.DataFrame()  # Header without any rows
+        
+        # 2. Get header, padding ragged rows (streamed sheets without a
+        # dimension record aren't padded by openpyxl)
+        width = max([len(header)] + [len(row) for row in data])
+        header = [str(cell) if cell is not None else f'Column_{i+1}'
+                  for i, cell in enumerate(tuple(header) + (None,) * (width - len(header)))]
+        if len(set(header)) < len(header):
+            # A header merged across columns names all of them; number the repeats
+            seen = collections.Counter()
+            for i, name in enumerate(header):
+                header[i] = f"{name}.{seen[name]}" if seen[name] else name
+                seen[name] += 1
+        if any(len(row) != width for row in data):
+            data = [tuple(row) + (None,) * (width - len(row)) for row in data]
+
+        # 3. Create DataFrame and type each column in a single pass
+        df = pd.DataFrame(data)
+        df = pd.DataFrame({i: _typed_column(df[i]) for i in df.columns})
+        df.columns = header
+        
+        # 4. Drop completely empty rows and columns with one null check
+        present = df.notna()
+        df = df.iloc[present.any(axis=1).to_numpy(), present.any(axis=0).to_numpy()]
+        
+        # Reset index after all filtering
+        df.reset_index(drop=True, inplace=True)
+        
+        return df
+        
+    except Exception as e:
+        print(f"Error processing sheet {title}: {str(e)}")
+        return pd.DataFrame()
+
+# Merged ranges are indexed by row: each row maps to the merges crossing it,
+# sorted by first column, so finding the merge (if any) that covers a cell is
+# a dict lookup plus one bisect instead of a scan over every merge.
+MERGE_CELL_REF_PATTERN = re.compile(rb'<(?:[\w.-]+:)?mergeCell\b[^>]*?\bref="([A-Z]+[0-9]+(?::[A-Z]+[0-9]+)?)"')
+# Indexes of live worksheets, with the merge count they were built from
+_sheet_merge_indexes = weakref.WeakKeyDictionary()
+
+def build_merged_cell_index(merged_ranges, max_row=None):
+    """Index merged ranges by row for merged_range_at.
+    
+    Args:
+        merged_ranges: Iterable of (min_col, min_row, max_col, max_row)
+        max_row (int, optional): Ignore rows past this (for merges that run
+            to the bottom of the sheet)
+    
+    Returns:
+        dict: Row -> (first columns, ranges), both sorted by first column
+    """
+    buckets = collections.defaultdict(list)
+    for min_col, min_row, max_col, range_max_row in merged_ranges:
+        last_row = range_max_row if max_row is None else min(range_max_row, max_row)
+        for row in range(min_row, last_row + 1):
+            buckets[row].append((min_col, min_row, max_col, range_max_row))
+    
+    index = {}
+    for row, ranges in buckets.items():
+        ranges.sort()
+        index[row] = ([merged[0] for merged in ranges], ranges)
+    return index
+
+def merged_range_at(index, row, col):
+    """The merged range covering a cell, as (min_col, min_row, max_col, max_row), or None.
+    
+    Its top-left cell (min_row, min_col) is the anchor that holds the value.
+    """
+    bucket = index.get(row)
+    if bucket is None:
+        return None
+    starts, ranges = bucket
+    i = bisect.bisect_right(starts, col) - 1
+    if i >= 0 and col <= ranges[i][2]:
+        return ranges[i]
+    return None
+
+def worksheet_merged_ranges(sheet):
+    """(min_col, min_row, max_col, max_row) of every merged range on an openpyxl worksheet.
+    
+    Read-only worksheets don't load merges, so they're read from the
+    sheet's <mergeCells> XML instead.
+    """
+    from openpyxl.utils.cell import range_boundaries
+    
+    if hasattr(sheet, 'merged_cells'):
+        return [merged.bounds for merged in sheet.merged_cells.ranges]
+    if not hasattr(sheet, '_get_source'):
+        return []
+    # A regex over the raw part is far cheaper than parsing the whole sheet
+    # again just for the <mergeCell> elements at its end
+    with sheet._get_source() as src:
+        return [range_boundaries(ref.decode('ascii')) for ref in MERGE_CELL_REF_PATTERN.findall(src.read())]
+
+def sheet_merged_cell_index(sheet):
+    """The merged cell index for a worksheet, rebuilt only when its merges change."""
+    count = len(sheet.merged_cells.ranges)
+    cached = _sheet_merge_indexes.get(sheet)
+    if cached is None or cached[0] != count:
+        cached = (count, build_merged_cell_index(worksheet_merged_ranges(sheet), sheet.max_row))
+        _sheet_merge_indexes[sheet] = cached
+    return cached[1]
+
+def is_merged_cell(sheet, row, col):
+    """Check if a cell is part of a merged range."""
+    return merged_range_at(sheet_merged_cell_index(sheet), row, col) is not None
+
+def _is_merged_banner(index, row_number, row):
+    """A title banner: the row's only value sits in a merge spanning several columns."""
+    filled = [col for col, cell in enumerate(row, start=1) if cell is not None]
+    if len(filled) != 1:
+        return False
+    merged = merged_range_at(index, row_number, filled[0])
+    return merged is not None and merged[2] > merged[0]
+
+def _fill_merged_cells(index, row_number, row, anchor_values):
+    """Give the cells hidden under a merge the value shown in the merge's anchor cell.
+    
+    anchor_values remembers anchors from earlier rows, for merges that span
+    several rows.
+    """
+    row = list(row)
+    for min_col, min_row, max_col, _ in index[row_number][1]:
+        if min_row == row_number:
+            anchor_values[(min_row, min_col)] = row[min_col - 1] if min_col <= len(row) else None
+        value = anchor_values.get((min_row, min_col))
+        for col in range(min_col, min(max_col, len(row)) + 1):
+            if row[col - 1] is None:
+                row[col - 1] = value
+    return tuple(row)
+
+# Formula evaluation for workbooks nobody has opened in Excel. openpyxl writes
+# the template's formulas without cached values, so a data_only read gives None
+# for every one of them. The subset the templates use (arithmetic, comparisons,
+# &, IF and the SUM/AVERAGE/COUNT/MIN/MAX/SUMIF/COUNTIF aggregates) is
+# evaluated here instead. Runs of rows in one column that share a formula
+# (=D2/C2, =D3/C3, ...) form a block evaluated as numpy column arrays, and the
+# blocks run in dependency order so totals see the values they add up.
+FORMULA_TOKEN_PATTERN = re.compile(r"""\s*(?:
+    (?P<string>"(?:[^"]|"")*")
+  | (?P<ref>(?:(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?
+        (?:\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?|\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}))(?![\w(])
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<bool>TRUE|FALSE)(?![\w(])
+  | (?P<function>[A-Za-z_][\w.]*)\(
+  | (?P<op><>|<=|>=|[-+*/^&%=<>(),])
+)""", re.VERBOSE | re.IGNORECASE)
+FORMULA_CELL_PATTERN = re.compile(r'(\$?)([A-Za-z]{1,3})(\$?)(\d*)')
+FORMULA_CRITERION_PATTERN = re.compile(r'(<=|>=|<>|<|>|=)?(.*)', re.DOTALL)
+FORMULA_COMPARISONS = {
+    '=': operator.eq, '<>': operator.ne, '<': operator.lt,
+    '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+}
+FORMULA_ARITHMETIC = {
+    '+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide, '^': np.power,
+}
+# Binary operators from loosest to tightest binding
+FORMULA_PRECEDENCE = [set(FORMULA_COMPARISONS), {'&'}, {'+', '-'}, {'*', '/'}, {'^'}]
+
+def _formula_tokens(text):
+    """Split a formula (without its leading '=') into (kind, text) tokens."""
+    tokens, position, text = [], 0, text.rstrip()
+    while position < len(text):
+        match = FORMULA_TOKEN_PATTERN.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Unsupported formula syntax at {text[position:]!r}")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+def _formula_ref(text, row):
+    """Parse a cell or range reference into a ('ref', ...) node.
+    
+    Relative rows are stored as offsets from the formula's own row, so the
+    same formula copied down a column parses to the same node.
+    """
+    sheet = None
+    if '!' in text:
+        sheet, _, text = text.rpartition('!')
+        if sheet.startswith("'"):
+            sheet = sheet[1:-1].replace("''", "'")
+    
+    ends = []
+    for part in text.split(':'):
+        _, letters, row_absolute, digits = FORMULA_CELL_PATTERN.fullmatch(part).groups()
+        if digits:
+            absolute = bool(row_absolute)
+            ends.append((column_index_from_string(letters.upper()),
+                         int(digits) if absolute else int(digits) - row, absolute))
+        else:
+            # Whole column: every row, whichever row the formula is on
+            ends.append((column_index_from_string(letters.upper()), None, True))
+    (c1, r1, abs1), (c2, r2, abs2) = ends[0], ends[-1]
+    if r1 is None:
+        r1 = 1
+    return ('ref', sheet, min(c1, c2), r1, max(c1, c2), r2, abs1, abs2, len(ends) > 1)
+
+def _parse_formula(text, row):
+    """Parse a formula into a tree of tuples.
+    
+    Nodes are ('num', value), ('str', text), ('bool', value), ('ref', ...)
+    from _formula_ref, ('neg', node), ('pct', node), ('op', symbol, left,
+    right) and ('call', NAME, args). Raises ValueError on anything outside
+    the supported subset.
+    """
+    tokens = _formula_tokens(text[1:] if text.startswith('=') else text)
+    position = 0
+    
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+    
+    def take(expected=None):
+        nonlocal position
+        kind, value = peek()
+        if kind is None or (expected is not None and value != expected):
+            raise ValueError(f"Expected {expected or 'a value'} in formula {text!r}")
+        position += 1
+        return kind, value
+    
+    def binary(level):
+        if level == len(FORMULA_PRECEDENCE):
+            return unary()
+        node = binary(level + 1)
+        while peek()[0] == 'op' and peek()[1] in FORMULA_PRECEDENCE[level]:
+            symbol = take()[1]
+            node = ('op', symbol, node, binary(level + 1))
+        return node
+    
+    def unary():
+        if peek() in (('op', '-'), ('op', '+')):
+            sign = take()[1]
+            operand = unary()
+            return ('neg', operand) if sign == '-' else operand
+        node = primary()
+        while peek() == ('op', '%'):
+            take()
+            node = ('pct', node)
+        return node
+    
+    def primary():
+        kind, value = take()
+        if kind == 'number':
+            return ('num', float(value))
+        if kind == 'string':
+            return ('str', value[1:-1].replace('""', '"'))
+        if kind == 'bool':
+            return ('bool', value.upper() == 'TRUE')
+        if kind == 'ref':
+            return _formula_ref(value, row)
+        if kind == 'function':
+            args = []
+            if peek() != ('op', ')'):
+                args.append(binary(0))
+                while peek() == ('op', ','):
+                    take()
+                    args.append(binary(0))
+            take(')')
+            return ('call', value.upper(), tuple(args))
+        if (kind, value) == ('op', '('):
+            node = binary(0)
+            take(')')
+            return node
+        raise ValueError(f"Unexpected {value!r} in formula {text!r}")
+    
+    node = binary(0)
+    if position != len(tokens):
+        raise ValueError(f"Unexpected {tokens[position][1]!r} in formula {text!r}")
+    return node
+
+def _formula_is_number(value):
+    """Whether a cell counts as a number in SUM, COUNT and friends (dates do)."""
+    return (isinstance(value, (int, float, datetime.date, datetime.time, datetime.timedelta))
+            and not isinstance(value, bool))
+
+def _formula_number(value):
+    """Coerce a value for arithmetic the way Excel does; nan stands in for #VALUE!."""
+    if value is None:
+        return 0.0
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+        return float(to_excel(value))
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _formula_text(value):
+    """Coerce a value for & the way Excel displays it."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return math.nan
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+def _formula_truth(value):
+    """Coerce an IF condition; nan for text that isn't TRUE/FALSE."""
+    if isinstance(value, str):
+        return {'true': True, 'false': False}.get(value.lower(), math.nan)
+    value = _formula_number(value)
+    return value if math.isnan(value) else value != 0
+
+def _formula_compare(left, right, symbol):
+    """Compare two values with Excel's ordering: numbers < text < booleans."""
+    values = []
+    for value, other in ((left, right), (right, left)):
+        if value is None:
+            # Blanks compare as whatever the other side is empty of
+            value = '' if isinstance(other, str) else False if isinstance(other, bool) else 0.0
+        elif isinstance(value, str):
+            value = value.lower()
+        elif not isinstance(value, bool):
+            value = _formula_number(value)
+            if math.isnan(value):
+                return math.nan
+        values.append((2 if isinstance(value, bool) else 1 if isinstance(value, str) else 0, value))
+    return FORMULA_COMPARISONS[symbol](*values)
+
+def _formula_numbers(value):
+    """Coerce a scalar or column array to float64 for arithmetic."""
+    if isinstance(value, np.ndarray):
+        return value if value.dtype == np.float64 else np.frompyfunc(_formula_number, 1, 1)(value).astype(np.float64)
+    return np.float64(_formula_number(value))
+
+def _formula_objects(value, length):
+    """A scalar or column array as an object array of the block's length."""
+    values = np.empty(length, dtype=object)
+    values[:] = value if isinstance(value, np.ndarray) else [value] * length
+    return values
+
+def _formula_criterion(criterion):
+    """Turn a SUMIF/COUNTIF criterion (5, ">100", "One-Time", "Sub*") into a predicate."""
+    if isinstance(criterion, str):
+        symbol, operand = FORMULA_CRITERION_PATTERN.fullmatch(criterion).groups()
+        symbol = symbol or '='
+        try:
+            operand = float(operand)
+        except ValueError:
+            pass
+    else:
+        symbol, operand = '=', criterion
+    
+    if isinstance(operand, bool):
+        return lambda value: isinstance(value, bool) and FORMULA_COMPARISONS[symbol](value, operand)
+    if isinstance(operand, (int, float)):
+        def matches(value):
+            if not _formula_is_number(value):
+                return symbol == '<>'
+            return FORMULA_COMPARISONS[symbol](_formula_number(value), operand)
+        return matches
+    if operand in ('', None):
+        if symbol in ('=', '<>'):
+            return lambda value: (value is None or value == '') == (symbol == '=')
+        return lambda value: False
+    if symbol in ('=', '<>'):
+        # * and ? are wildcards, ~ escapes them
+        pattern = re.compile(re.sub(r'~([*?~])|([*?])|([^*?~]+|~)',
+                                    lambda m: re.escape(m.group(1)) if m.group(1)
+                                    else ('.*' if m.group(2) == '*' else '.') if m.group(2)
+                                    else re.escape(m.group(3)), operand), re.IGNORECASE | re.DOTALL)
+        return lambda value: (isinstance(value, str) and pattern.fullmatch(value) is not None) == (symbol == '=')
+    return lambda value: isinstance(value, str) and FORMULA_COMPARISONS[symbol](value.lower(), operand.lower())
+
+def _formula_aggregate_numbers(args):
+    """Numbers from aggregate arguments: ranges skip text and blanks, direct values are coerced."""
+    numbers = []
+    for arg in args:
+        if isinstance(arg, list):
+            numbers.extend(_formula_number(value) for value in arg if _formula_is_number(value))
+        else:
+            numbers.append(_formula_number(arg))
+    return numbers
+
+def _formula_average(*args):
+    numbers = _formula_aggregate_numbers(args)
+    return math.fsum(numbers) / len(numbers) if numbers else math.nan
+
+def _formula_count(*args):
+    return float(sum(sum(map(_formula_is_number, arg)) if isinstance(arg, list) else _formula_is_number(arg)
+                     for arg in args))
+
+def _formula_sumif(cells, criterion, sum_cells=None):
+    if not isinstance(cells, list):
+        raise ValueError("SUMIF needs a range")
+    if isinstance(criterion, list):
+        criterion = criterion[0]
+    matches = _formula_criterion(criterion)
+    return math.fsum(_formula_number(value) for cell, value in zip(cells, sum_cells if sum_cells is not None else cells)
+                     if matches(cell) and _formula_is_number(value))
+
+def _formula_countif(cells, criterion):
+    if not isinstance(cells, list):
+        raise ValueError("COUNTIF needs a range")
+    if isinstance(criterion, list):
+        criterion = criterion[0]
+    return float(sum(map(_formula_criterion(criterion), cells)))
+
+# Functions take each argument as a list of cell values (for references) or a scalar
+FORMULA_FUNCTIONS = {
+    'SUM': lambda *args: math.fsum(_formula_aggregate_numbers(args)),
+    'AVERAGE': _formula_average,
+    'COUNT': _formula_count,
+    'MIN': lambda *args: min(_formula_aggregate_numbers(args), default=0.0),
+    'MAX': lambda *args: max(_formula_aggregate_numbers(args), default=0.0),
+    'SUMIF': _formula_sumif,
+    'COUNTIF': _formula_countif,
+}
+
+def _formula_box(grids, sheet, node, row):
+    """The cells a reference covers for a formula on `row`, as (sheet, min_col, min_row, max_col, max_row)."""
+    _, ref_sheet, c1, r1, c2, r2, abs1, abs2, _ = node
+    sheet = ref_sheet or sheet
+    first = r1 if abs1 else row + r1
+    last = len(grids[sheet]) if r2 is None else r2 if abs2 else row + r2
+    return sheet, c1, first, c2, last
+
+def _formula_box_values(grids, box):
+    """Cell values in a box, row by row; cells past the sheet's edge are blank."""
+    sheet, c1, r1, c2, r2 = box
+    grid = grids[sheet]
+    return [grid[r - 1][c - 1] if 0 < r <= len(grid) and c <= len(grid[r - 1]) else None
+            for r in range(max(r1, 1), r2 + 1) for c in range(c1, c2 + 1)]
+
+def _formula_call(node, grids, sheet, rows):
+    """Evaluate a function call for every row of a block."""
+    _, name, args = node
+    if name == 'IF':
+        if not 2 <= len(args) <= 3:
+            raise ValueError("IF takes 2 or 3 arguments")
+        condition = np.frompyfunc(_formula_truth, 1, 1)(_formula_eval(args[0], grids, sheet, rows))
+        # Both branches are evaluated; errors in the one not taken are dropped
+        branches = [_formula_eval(arg, grids, sheet, rows) for arg in args[1:]] + [False]
+        if not isinstance(condition, np.ndarray):
+            return condition if isinstance(condition, float) else branches[0] if condition else branches[1]
+        chosen = np.array([value is True for value in condition], dtype=bool)
+        values = np.where(chosen, _formula_objects(branches[0], len(rows)), _formula_objects(branches[1], len(rows)))
+        values[np.array([isinstance(value, float) for value in condition], dtype=bool)] = math.nan
+        return values
+    if name not in FORMULA_FUNCTIONS:
+        raise ValueError(f"Unsupported formula function {name}")
+    
+    prepared, moving = [], False
+    for arg in args:
+        if arg[0] == 'ref':
+            prepared.append(('ref', arg))
+            # A range moves with the row unless both of its rows are absolute
+            moving = moving or not (arg[6] and arg[7])
+        else:
+            value = _formula_eval(arg, grids, sheet, rows)
+            prepared.append(('value', value))
+            moving = moving or isinstance(value, np.ndarray)
+    
+    def call(index, row):
+        values, boxes = [], []
+        for kind, arg in prepared:
+            if kind == 'ref':
+                box = _formula_box(grids, sheet, arg, row)
+                if name == 'SUMIF' and len(boxes) == 1:
+                    # The sum range takes the criteria range's shape from its top-left cell
+                    first = boxes[0]
+                    box = box[:3] + (box[1] + first[3] - first[1], box[2] + first[4] - first[2])
+                boxes.append(box)
+                values.append(_formula_box_values(grids, box))
+            else:
+                boxes.append(None)
+                values.append(arg[index] if isinstance(arg, np.ndarray) else arg)
+        return FORMULA_FUNCTIONS[name](*values)
+    
+    if not moving:
+        return call(0, rows[0])
+    values = np.empty(len(rows), dtype=object)
+    for index, row in enumerate(rows):
+        values[index] = call(index, int(row))
+    return values
+
+def _formula_eval(node, grids, sheet, rows):
+    """Evaluate a parsed formula for a block of rows.
+    
+    Returns a scalar when the result is the same for every row (constants,
+    absolute references), otherwise an array with one value per row.
+    """
+    kind = node[0]
+    if kind in ('num', 'str', 'bool'):
+        return node[1]
+    if kind == 'ref':
+        _, ref_sheet, column, row, _, _, absolute, _, is_range = node
+        if is_range:
+            raise ValueError("Ranges are only supported inside functions")
+        grid = grids[ref_sheet or sheet]
+        
+        def cell(r):
+            return grid[r - 1][column - 1] if 0 < r <= len(grid) and column <= len(grid[r - 1]) else None
+        
+        if absolute:
+            return cell(row)
+        values = np.empty(len(rows), dtype=object)
+        values[:] = [cell(int(r) + row) for r in rows]
+        return values
+    if kind == 'neg':
+        return -_formula_numbers(_formula_eval(node[1], grids, sheet, rows))
+    if kind == 'pct':
+        return _formula_numbers(_formula_eval(node[1], grids, sheet, rows)) / 100
+    if kind == 'call':
+        return _formula_call(node, grids, sheet, rows)
+    
+    _, symbol, left, right = node
+    left, right = _formula_eval(left, grids, sheet, rows), _formula_eval(right, grids, sheet, rows)
+    if symbol in FORMULA_ARITHMETIC:
+        with np.errstate(all='ignore'):
+            return FORMULA_ARITHMETIC[symbol](_formula_numbers(left), _formula_numbers(right))
+    if symbol == '&':
+        join = np.frompyfunc(lambda a, b: a + b if isinstance(a, str) and isinstance(b, str) else math.nan, 2, 1)
+        text = np.frompyfunc(_formula_text, 1, 1)
+        return join(text(left), text(right))
+    return np.frompyfunc(lambda a, b: _formula_compare(a, b, symbol), 2, 1)(left, right)
+
+def _formula_result(value):
+    """A computed value as a data_only read would give it (errors become None)."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None:
+        return 0  # =A1 on a blank cell shows 0
+    if isinstance(value, float) and not isinstance(value, bool):
+        if not math.isfinite(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+def _formula_refs(node):
+    """Every reference node in a parsed formula."""
+    if node[0] == 'ref':
+        yield node
+    elif node[0] in ('neg', 'pct'):
+        yield from _formula_refs(node[1])
+    elif node[0] == 'op':
+        yield from _formula_refs(node[2])
+        yield from _formula_refs(node[3])
+    elif node[0] == 'call':
+        for arg in node[2]:
+            yield from _formula_refs(arg)
+
+def _formula_blocks(sheet, formulas):
+    """Group a sheet's formulas into blocks of consecutive rows in one column sharing a formula.
+    
+    Returns:
+        list: [sheet, column, first row, last row, parsed formula] per block;
+        the formula is None when it couldn't be parsed
+    """
+    blocks = []
+    for row, column, text in sorted(formulas, key=lambda formula: (formula[1], formula[0])):
+        try:
+            node = _parse_formula(text, row)
+        except (ValueError, AttributeError):
+            node = None
+        last = blocks[-1] if blocks else None
+        if (last is not None and node is not None and last[1] == column
+                and last[3] == row - 1 and last[4] == node):
+            last[3] = row
+        else:
+            blocks.append([sheet, column, row, row, node])
+    return blocks
+
+def evaluate_workbook_formulas(grids, formulas, load_sheet=None):
+    """Fill in formula cells that have no cached value.
+    
+    Args:
+        grids (dict): Sheet name -> list of row lists, as read with data_only.
+            Formula results are written into these in place.
+        formulas (dict): Sheet name -> [(row, column, formula text)] for the
+            formula cells to evaluate
+        load_sheet (callable, optional): Called with the name of a sheet that
+            a formula refers to but isn't in grids; returns (rows, formulas)
+            for it, or None if there is no such sheet
+    
+    Returns:
+        int: Number of formula cells given a value. Formulas outside the
+        supported subset, circular ones and ones that depend on those are
+        left as None.
+    """
+    formulas = dict(formulas)
+    blocks, queue = [], list(formulas)
+    while queue:
+        sheet = queue.pop()
+        sheet_blocks = _formula_blocks(sheet, formulas[sheet])
+        blocks.extend(sheet_blocks)
+        # Other sheets the formulas read need their own formulas worked out first
+        for block in sheet_blocks:
+            for ref in _formula_refs(block[4]) if block[4] is not None else ():
+                if ref[1] is None or ref[1] in grids or load_sheet is None:
+                    continue
+                loaded = load_sheet(ref[1])
+                if loaded is None:
+                    continue
+                rows, sheet_formulas = loaded
+                grids[ref[1]] = [list(row) for row in rows]
+                formulas[ref[1]] = sheet_formulas
+                queue.append(ref[1])
+    
+    # Blocks that read their own cells (running totals) go row by row
+    def reads_itself(block):
+        sheet, column, first, last, node = block
+        for ref in _formula_refs(node) if node is not None else ():
+            _, ref_sheet, c1, r1, c2, r2, abs1, abs2, _ = ref
+            low = r1 if abs1 else first + r1
+            high = math.inf if r2 is None else r2 if abs2 else last + r2
+            if (ref_sheet or sheet) == sheet and c1 <= column <= c2 and low <= last and high >= first:
+                return True
+        return False
+    
+    blocks = [split for block in blocks
+              for split in ([[*block[:2], row, row, block[4]] for row in range(block[2], block[3] + 1)]
+                            if reads_itself(block) else [block])]
+    
+    # (sheet, column) -> blocks in row order, to find the blocks a range overlaps
+    columns = collections.defaultdict(list)
+    for index, (sheet, column, first, last, _) in enumerate(blocks):
+        columns[sheet, column].append((first, last, index))
+    for column_blocks in columns.values():
+        column_blocks.sort()
+    starts = {key: [first for first, _, _ in column_blocks] for key, column_blocks in columns.items()}
+    sheet_columns = collections.defaultdict(list)
+    for sheet, column in columns:
+        sheet_columns[sheet].append(column)
+    
+    dependencies = [set() for _ in blocks]
+    dependents = [[] for _ in blocks]
+    for index, (sheet, column, first, last, node) in enumerate(blocks):
+        for ref in _formula_refs(node) if node is not None else ():
+            _, ref_sheet, c1, r1, c2, r2, abs1, abs2, _ = ref
+            ref_sheet = ref_sheet or sheet
+            low = r1 if abs1 else first + r1
+            high = math.inf if r2 is None else r2 if abs2 else last + r2
+            for ref_column in sheet_columns.get(ref_sheet, ()):
+                if not c1 <= ref_column <= c2:
+                    continue
+                column_blocks = columns[ref_sheet, ref_column]
+                position = max(bisect.bisect_right(starts[ref_sheet, ref_column], low) - 1, 0)
+                for block_first, block_last, other in column_blocks[position:]:
+                    if block_first > high:
+                        break
+                    if block_last >= low and other not in dependencies[index]:
+                        dependencies[index].add(other)
+                        dependents[other].append(index)
+    
+    # Kahn's algorithm; blocks on a cycle never become ready and stay None
+    waiting = [len(block_dependencies) for block_dependencies in dependencies]
+    ready = collections.deque(index for index, count in enumerate(waiting) if count == 0)
+    failed, filled = set(), 0
+    while ready:
+        index = ready.popleft()
+        sheet, column, first, last, node = blocks[index]
+        if node is None or dependencies[index] & failed:
+            failed.add(index)
+        else:
+            rows = np.arange(first, last + 1)
+            try:
+                values = _formula_eval(node, grids, sheet, rows)
+            except (ValueError, KeyError, TypeError, IndexError, OverflowError):
+                failed.add(index)
+            else:
+                grid = grids[sheet]
+                for offset, row in enumerate(range(first, last + 1)):
+                    value = _formula_result(values[offset] if isinstance(values, np.ndarray) else values)
+                    grid.extend([] for _ in range(row - len(grid)))
+                    cells = grid[row - 1]
+                    cells.extend([None] * (column - len(cells)))
+                    cells[column - 1] = value
+                    filled += value is not None
+        for other in dependents[index]:
+            waiting[other] -= 1
+            if waiting[other] == 0:
+                ready.append(other)
+    return filled
+
+# Direct .xlsx reader. The tracker workbooks are plain SpreadsheetML, so each
+# worksheet part is streamed out of the zip with iterparse into row tuples,
+# skipping openpyxl's cell objects entirely. Values come out exactly as
+# openpyxl's data_only read gives them: shared strings resolved, numbers cast
+# the same way, and cells whose style has a date format turned into datetimes.
+# Large workbooks have their sheets parsed in a process pool; each worker gets
+# the file and the resolved shared strings once, through the pool initializer.
+XLSX_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+XLSX_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+XLSX_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+# None means one worker per CPU core
+XLSX_READ_WORKERS = None
+# Below this much (uncompressed) sheet XML the pool start-up costs more than it saves
+XLSX_PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+# Set in pool workers by _init_xlsx_worker
+_xlsx_worker_state = None
+# A formula cell closed without a <v>: the file was never recalculated by Excel
+UNCACHED_FORMULA_PATTERN = re.compile(rb'(?:</(?:[\w.-]+:)?f>|<(?:[\w.-]+:)?f\b[^>]*/>)\s*(?:<(?:[\w.-]+:)?v\s*/>|<(?:[\w.-]+:)?v>\s*</(?:[\w.-]+:)?v>)?\s*</(?:[\w.-]+:)?c>')
+
+def _xlsx_part_path(base, target):
+    """Resolve a relationship target against the folder of the part that refers to it."""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return os.path.normpath(os.path.join(os.path.dirname(base), target)).replace(os.sep, '/')
+
+def _xlsx_relationships(zf, part):
+    """Relationship id -> (type, target part path) for one package part."""
+    rels_path = f"{os.path.dirname(part)}/_rels/{os.path.basename(part)}.rels".lstrip('/')
+    if rels_path not in zf.namelist():
+        return {}
+    with zf.open(rels_path) as f:
+        return {rel.get('Id'): (rel.get('Type', ''), _xlsx_part_path(part, rel.get('Target', '')))
+                for _, rel in iterparse(f) if rel.tag == f'{XLSX_PACKAGE_REL_NS}Relationship'}
+
+def _xlsx_workbook_info(zf):
+    """Worksheets (name, part path) in workbook order, plus the date epoch."""
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+    
+    workbook_part = next((target for rel_type, target in _xlsx_relationships(zf, '').values()
+                          if rel_type.endswith('/officeDocument')), 'xl/workbook.xml')
+    relationships = _xlsx_relationships(zf, workbook_part)
+    
+    sheets, epoch = [], CALENDAR_WINDOWS_1900
+    with zf.open(workbook_part) as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f'{XLSX_MAIN_NS}workbookPr' and elem.get('date1904') in ('1', 'true'):
+                epoch = CALENDAR_MAC_1904
+            elif elem.tag == f'{XLSX_MAIN_NS}sheet':
+                rel_type, target = relationships.get(elem.get(f'{XLSX_REL_NS}id'), ('', None))
+                # Chartsheets and dialog sheets have no cells to read
+                if rel_type.endswith('/worksheet'):
+                    sheets.append((elem.get('name'), target))
+    return sheets, epoch
+
+def _xlsx_shared_strings(zf):
+    """The shared string table, read once per workbook."""
+    strings = []
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return strings
+    with zf.open('xl/sharedStrings.xml') as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f'{XLSX_MAIN_NS}si':
+                strings.append(_xlsx_text(elem).replace('x005F_', ''))
+                elem.clear()
+    return strings
+
+def _xlsx_text(elem):
+    """Plain text of a string item: its <t> plus any rich text runs, without phonetic hints."""
+    plain = elem.findtext(f'{XLSX_MAIN_NS}t')
+    runs = [run.findtext(f'{XLSX_MAIN_NS}t') or '' for run in elem.findall(f'{XLSX_MAIN_NS}r')]
+    return (plain or '') + ''.join(runs)
+
+def _xlsx_date_styles(zf):
+    """Indices of the cell styles whose number format is a date, and of those that are durations."""
+    from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+    
+    date_styles, timedelta_styles = set(), set()
+    if 'xl/styles.xml' not in zf.namelist():
+        return date_styles, timedelta_styles
+    
+    custom_formats, in_cell_xfs, index = {}, False, 0
+    with zf.open('xl/styles.xml') as f:
+        for event, elem in iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == f'{XLSX_MAIN_NS}cellXfs':
+                    in_cell_xfs = True
+                elif elem.tag == f'{XLSX_MAIN_NS}numFmt':
+                    custom_formats[int(elem.get('numFmtId'))] = elem.get('formatCode')
+                elif elem.tag == f'{XLSX_MAIN_NS}xf' and in_cell_xfs:
+                    format_id = int(elem.get('numFmtId', 0))
+                    fmt = custom_formats.get(format_id, BUILTIN_FORMATS.get(format_id))
+                    if fmt and is_date_format(fmt):
+                        date_styles.add(index)
+                    if fmt and is_timedelta_format(fmt):
+                        timedelta_styles.add(index)
+                    index += 1
+            elif elem.tag == f'{XLSX_MAIN_NS}cellXfs':
+                in_cell_xfs = False
+    return date_styles, timedelta_styles
+
+def _xlsx_sheet_rows(zf, part, shared_strings, date_styles, timedelta_styles, epoch):
+    """Stream one worksheet part into row tuples, padded to the sheet width.
+    
+    Mirrors openpyxl's read-only, data_only iter_rows(values_only=True):
+    rows are sized by the sheet's <dimension> record (or the widest row when
+    there is none), missing rows come back empty and formulas give their
+    cached value.
+    
+    Returns:
+        tuple: (rows, merged ranges, formulas), where formulas lists
+        (row, column, formula text) for formula cells with no cached value
+    """
+    from openpyxl.formula.translate import Translator
+    from openpyxl.utils.cell import column_index_from_string, range_boundaries
+    from openpyxl.utils.datetime import from_excel, from_ISO8601
+    
+    cell_tag, row_tag = f'{XLSX_MAIN_NS}c', f'{XLSX_MAIN_NS}row'
+    value_tag, inline_tag, formula_tag = f'{XLSX_MAIN_NS}v', f'{XLSX_MAIN_NS}is', f'{XLSX_MAIN_NS}f'
+    dimension_tag, merge_tag = f'{XLSX_MAIN_NS}dimension', f'{XLSX_MAIN_NS}mergeCell'
+    
+    rows, cells, merged_ranges, formulas = [], [], [], []
+    # Shared formula index -> (formula, cell it was written for)
+    shared_formulas = {}
+    column = 0
+    max_column = max_row = None
+    with zf.open(part) as f:
+        for _, elem in iterparse(f):
+            tag = elem.tag
+            if tag == cell_tag:
+                ref = elem.get('r')
+                column = column_index_from_string(ref.rstrip('0123456789')) if ref else column + 1
+                data_type = elem.get('t', 'n')
+                
+                if data_type == 'inlineStr':
+                    inline = elem.find(inline_tag)
+                    value = _xlsx_text(inline) if inline is not None else None
+                else:
+                    value = elem.findtext(value_tag) or None
+                    if value is not None:
+                        if data_type == 'n':
+                            value = float(value) if '.' in value or 'E' in value or 'e' in value else int(value)
+                            style = int(elem.get('s', 0))
+                            if style in date_styles:
+                                try:
+                                    value = from_excel(value, epoch, timedelta=style in timedelta_styles)
+                                except (OverflowError, ValueError):
+                                    value = '#VALUE!'
+                        elif data_type == 's':
+                            value = shared_strings[int(value)]
+                        elif data_type == 'b':
+                            value = bool(int(value))
+                        elif data_type == 'd':
+                            value = from_ISO8601(value)
+                
+                formula = elem.find(formula_tag)
+                if formula is not None:
+                    row_number = len(rows) + 1 if ref is None else int(ref[len(ref.rstrip('0123456789')):])
+                    text = formula.text
+                    if formula.get('t') == 'shared':
+                        # Copies of a shared formula only carry its index
+                        if text:
+                            shared_formulas[formula.get('si')] = (text, f"{get_column_letter(column)}{row_number}")
+                        elif formula.get('si') in shared_formulas:
+                            text, origin = shared_formulas[formula.get('si')]
+                            text = Translator(f"={text}", origin).translate_formula(
+                                f"{get_column_letter(column)}{row_number}")[1:]
+                    if value is None and text:
+                        formulas.append((row_number, column, text))
+                cells.append((column, value))
+            elif tag == row_tag:
+                row_number = int(elem.get('r', len(rows) + 1))
+                # Rows with no cells at all aren't in the XML
+                rows.extend(() for _ in range(row_number - 1 - len(rows)))
+                row = [None] * max((cell_column for cell_column, _ in cells), default=0)
+                for cell_column, value in cells:
+                    row[cell_column - 1] = value
+                rows.append(row)
+                cells, column = [], 0
+                elem.clear()
+            elif tag == merge_tag and elem.get('ref'):
+                merged_ranges.append(range_boundaries(elem.get('ref')))
+            elif tag == dimension_tag:
+                try:
+                    _, _, max_column, max_row = range_boundaries(elem.get('ref', ''))
+                except (TypeError, ValueError):
+                    pass
+    
+    if max_row is not None:
+        rows = rows[:max_row] + [()] * (max_row - len(rows))
+    width = max_column if max_column is not None else max((len(row) for row in rows), default=0)
+    return [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows], merged_ranges, formulas
+
+def _init_xlsx_worker(file_content, shared_strings, date_styles, timedelta_styles, epoch):
+    """Open the parent's workbook in a sheet-reading worker."""
+    global _xlsx_worker_state
+    _xlsx_worker_state = (zipfile.ZipFile(io.BytesIO(file_content)), shared_strings,
+                          date_styles, timedelta_styles, epoch)
+
+def _xlsx_sheet_frame(zf, name, part, shared_strings, date_styles, timedelta_styles, epoch):
+    """Read one worksheet into a DataFrame.
+    
+    Sheets with formulas still to evaluate come back raw, as (rows, merged
+    ranges, formulas), since their values can depend on other sheets.
+    """
+    rows, merged_ranges, formulas = _xlsx_sheet_rows(zf, part, shared_strings, date_styles, timedelta_styles, epoch)
+    if formulas:
+        return rows, merged_ranges, formulas
+    return rows_to_dataframe(rows, name, merged_ranges)
+
+def _read_xlsx_sheet(name, part):
+    """Read one worksheet inside a worker (see _xlsx_sheet_frame)."""
+    zf, shared_strings, date_styles, timedelta_styles, epoch = _xlsx_worker_state
+    return _xlsx_sheet_frame(zf, name, part, shared_strings, date_styles, timedelta_styles, epoch)
+
+def read_xlsx_sheets(file_content, workers=None, min_bytes=None, use_cache=None):
+    """Read every worksheet of an .xlsx file straight from its XML.
+    
+    Sheets whose XML matches a sidecar in EXCEL_SHEET_CACHE_DIR are loaded
+    from it; only the others are parsed (and then stored there). Formulas
+    saved without a cached value (templates never opened in Excel) are
+    evaluated with evaluate_workbook_formulas.
+    
+    Args:
+        file_content (bytes): The .xlsx file
+        workers (int, optional): Worker processes. Defaults to XLSX_READ_WORKERS,
+            or the CPU count if that is None.
+        min_bytes (int, optional): Uncompressed sheet XML needed before a pool
+            is used. Defaults to XLSX_PARALLEL_MIN_BYTES.
+        use_cache (bool, optional): Use the sheet sidecar cache. Defaults to
+            EXCEL_SHEET_CACHE_ENABLED.
+    
+    Returns:
+        dict: Sheet name -> DataFrame (from rows_to_dataframe), in workbook order
+    """
+    if workers is None:
+        workers = XLSX_READ_WORKERS or os.cpu_count() or 1
+    if min_bytes is None:
+        min_bytes = XLSX_PARALLEL_MIN_BYTES
+    if use_cache is None:
+        use_cache = EXCEL_SHEET_CACHE_ENABLED
+    
+    frames, keys = {}, {}
+    with zipfile.ZipFile(io.BytesIO(file_content)) as zf:
+        sheets, epoch = _xlsx_workbook_info(zf)
+        parts = dict(sheets)
+        shared_strings = _xlsx_shared_strings(zf)
+        date_styles, timedelta_styles = _xlsx_date_styles(zf)
+        
+        if use_cache:
+            sheet_xml = {name: zf.read(part) for name, part in sheets}
+            keys = {name: sheet_cache_key(xml, shared_strings, date_styles, timedelta_styles, epoch)
+                    for name, xml in sheet_xml.items()}
+            # Evaluated formulas can read any sheet, so those sheets' keys cover the whole workbook
+            workbook_key = hashlib.sha256(''.join(keys.values()).encode('utf-8')).hexdigest()
+            for name, xml in sheet_xml.items():
+                # Any sheet with formulas has a closing f tag; the substring test skips the rest cheaply
+                if b'f>' in xml and UNCACHED_FORMULA_PATTERN.search(xml):
+                    keys[name] = hashlib.sha256(f"{keys[name]}:{workbook_key}".encode('utf-8')).hexdigest()
+                cached = load_cached_sheet(keys[name])
+                if cached is not None:
+                    frames[name] = cached
+            del sheet_xml
+        
+        pending = [(name, part) for name, part in sheets if name not in frames]
+        sheet_bytes = sum(zf.getinfo(part).file_size for _, part in pending)
+        workers = min(workers, len(pending))
+        if workers <= 1 or sheet_bytes < min_bytes:
+            results = [_xlsx_sheet_frame(zf, name, part, shared_strings, date_styles, timedelta_styles, epoch)
+                       for name, part in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_xlsx_worker,
+                                     initargs=(file_content, shared_strings, date_styles, timedelta_styles,
+                                               epoch)) as executor:
+                results = list(executor.map(_read_xlsx_sheet, [name for name, _ in pending],
+                                            [part for _, part in pending]))
+        
+        unevaluated = {name: result for (name, _), result in zip(pending, results) if isinstance(result, tuple)}
+        if unevaluated:
+            def load_sheet(name):
+                if name not in parts:
+                    return None
+                rows, _, formulas = _xlsx_sheet_rows(zf, parts[name], shared_strings, date_styles,
+                                                     timedelta_styles, epoch)
+                return rows, formulas
+            
+            grids = {name: [list(row) for row in rows] for name, (rows, _, _) in unevaluated.items()}
+            evaluate_workbook_formulas(grids, {name: formulas for name, (_, _, formulas) in unevaluated.items()},
+                                       load_sheet)
+            results = [rows_to_dataframe(grids[name], name, unevaluated[name][1]) if name in unevaluated else df
+                       for (name, _), df in zip(pending, results)]
+    
+    frames.update((name, df) for (name, _), df in zip(pending, results))
+    if use_cache:
+        for (name, _), df in zip(pending, results):
+            # Empty sheets are cheap to parse again and have no columns to store
+            if not df.empty:
+                store_cached_sheet(keys[name], df)
+    
+    return {name: frames[name] for name, _ in sheets}
+
+def read_openpyxl_sheets(file_content):
+    """Read every worksheet of a workbook through openpyxl's read-only mode."""
+    # Read-only mode streams rows from the XML instead of building every cell object
+    wb = openpyxl.load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+    try:
+        return {sheet.title: worksheet_to_dataframe(sheet) for sheet in wb.worksheets}
+    finally:
+        # Read-only workbooks keep the file open until closed
+        wb.close()
+
+# Workbook readers for read_workbook_sheets. Both take the file bytes and
+# return sheet name -> DataFrame in workbook order.
+EXCEL_READ_ENGINE = 'xlsx'
+EXCEL_READ_ENGINES = {
+    'xlsx': read_xlsx_sheets,
+    'openpyxl': read_openpyxl_sheets,
+}
+
+# Sheets read from uploaded workbooks, keyed by the upload's content hash.
+# Streamlit reruns the whole script on every widget change, so without this
+# each rerun (even just changing the category selection) reopened the file.
+WORKBOOK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# "content hash:engine" -> (sheet name -> DataFrame, size in bytes), least recently used first
+_workbook_cache = collections.OrderedDict()
+_workbook_cache_bytes = 0
+# Every Streamlit session runs on its own thread and they all share the cache,
+# so the dict and its byte count are only touched with this held
+_workbook_cache_lock = threading.Lock()
+
+def read_workbook_sheets(source, engine=None):
+    """Read every sheet of a workbook into DataFrames, reusing earlier reads of the same content.
+    
+    Args:
+        source: Path to the Excel file, or its raw bytes
+        engine (str, optional): Key of EXCEL_READ_ENGINES to read with.
+            Defaults to EXCEL_READ_ENGINE.
+        
+    Returns:
+        dict: Sheet name -> DataFrame (from worksheet_to_dataframe), in workbook
+        order. Empty sheets are left out. The frames are shared with the cache,
+        so replace columns rather than editing values in place.
+    """
+    global _workbook_cache_bytes
+    
+    if isinstance(source, (bytes, bytearray)):
+        file_content = bytes(source)
+    else:
+        with open(source, 'rb') as f:
+            file_content = f.read()
+    engine = engine or EXCEL_READ_ENGINE
+    key = f"{hashlib.sha256(file_content).hexdigest()}:{engine}"
+    
+    with _workbook_cache_lock:
+        cached = _workbook_cache.get(key)
+        if cached is not None:
+            _workbook_cache.move_to_end(key)
+    if cached is not None:
+        return {name: df.copy(deep=False) for name, df in cached[0].items()}
+    
+    # Parsed without the lock, so one session's upload never stalls the others
+    sheets = {name: df for name, df in EXCEL_READ_ENGINES[engine](file_content).items() if not df.empty}
+    size = int(sum(df.memory_usage(index=True, deep=True).sum() for df in sheets.values()))
+    
+    with _workbook_cache_lock:
+        # Another session may have read the same workbook in the meantime
+        if key in _workbook_cache:
+            _workbook_cache_bytes -= _workbook_cache.pop(key)[1]
+        _workbook_cache[key] = (sheets, size)
+        _workbook_cache_bytes += size
+        
+        # Evict least recently used workbooks, always keeping the one just read
+        while _workbook_cache_bytes > WORKBOOK_CACHE_MAX_BYTES and len(_workbook_cache) > 1:
+            _, (_, evicted_size) = _workbook_cache.popitem(last=False)
+            _workbook_cache_bytes -= evicted_size
+    
+    return {name: df.copy(deep=False) for name, df in sheets.items()}
+
+# Parsed tracker sheets are also kept as sidecar files, one per worksheet,
+# keyed by a hash of that sheet's XML part (plus the shared strings it uses
+# and the workbook's date styles). A workbook uploaded again with a few new
+# rows only re-parses the sheets that changed; the rest are memory-mapped
+# back from uncompressed Arrow IPC (Feather) files. Bump the version whenever
+# rows_to_dataframe's output changes. The sidecars hold copies of the
+# uploaded financial data on disk, so the cache is off unless
+# FINANCE_EXCEL_SHEET_CACHE=1 is set.
+EXCEL_SHEET_CACHE_ENABLED = os.environ.get('FINANCE_EXCEL_SHEET_CACHE', '0') == '1'
+EXCEL_SHEET_CACHE_VERSION = "2"
+EXCEL_SHEET_CACHE_DIR = FINANCE_CACHE_DIR / 'sheets'
+EXCEL_SHEET_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Splits sheet XML around the index of every shared-string cell value
+SHARED_STRING_REF_PATTERN = re.compile(rb'(<(?:[\w.-]+:)?c\b[^>]*?\bt="s"[^>]*>\s*<(?:[\w.-]+:)?v>)(\d+)(?=<)')
+
+def sheet_cache_key(sheet_xml, shared_strings, date_styles, timedelta_styles, epoch):
+    """Content-addressed sidecar key for one worksheet part."""
+    digest = hashlib.sha256()
+    # Saving renumbers the shared string table, so an unchanged sheet can come
+    # back with different indices. Hash the text each index points at instead.
+    parts = SHARED_STRING_REF_PATTERN.split(sheet_xml)
+    for i in range(0, len(parts) - 1, 3):
+        digest.update(parts[i])
+        digest.update(parts[i + 1])
+        index = int(parts[i + 2])
+        digest.update(shared_strings[index].encode('utf-8', 'surrogatepass') if index < len(shared_strings) else b'')
+        digest.update(b'\0')
+    digest.update(parts[-1])
+    digest.update(f"{EXCEL_SHEET_CACHE_VERSION}:{sorted(date_styles)}:{sorted(timedelta_styles)}:{epoch}".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_cached_sheet(key):
+    """Memory-map a cached sheet back into a DataFrame, or None on a miss."""
+    path = EXCEL_SHEET_CACHE_DIR / f"{key}.arrow"
+    if not path.exists():
+        return None
+    
+    try:
+        import pyarrow.feather as feather
+        df = feather.read_table(path, memory_map=True).to_pandas()
+        
+        # Touch the entry so eviction treats it as recently used
+        os.utime(path, None)
+        return df
+    except ImportError:
+        return None
+    except Exception as e:
+        print(f"Could not read cached sheet {key}: {str(e)}")
+        return None
+
+def store_cached_sheet(key, df):
+    """Write a parsed sheet to the sidecar cache and evict old entries past the size cap."""
+    try:
+        import pyarrow.feather as feather
+        EXCEL_SHEET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = EXCEL_SHEET_CACHE_DIR / f"{key}.arrow"
+        
+        # Uncompressed so reads can map the file instead of decoding it
+        tmp_path = path.with_suffix('.arrow.tmp')
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        
+        evict_statement_cache(EXCEL_SHEET_CACHE_MAX_BYTES, EXCEL_SHEET_CACHE_DIR, '*.arrow')
+    except ImportError:
+        print("pyarrow not installed, sheet cache disabled. Install with: pip install pyarrow")
+    except Exception as e:
+        print(f"Could not cache sheet {key}: {str(e)}")